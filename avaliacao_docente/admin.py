@@ -24,6 +24,13 @@ from .models import (
     # Sistema de lembretes
     JobLembreteCicloTurma,
     NotificacaoLembrete,
+    # Resumos de resultados
+    ResumoAvaliacao,
+    ResumoCiclo,
+    ResultadoCicloCongelado,
+    SubmissaoAvaliacao,
+    # Observabilidade do cache
+    EstatisticaCache,
 )
 
 
@@ -620,3 +627,169 @@ class NotificacaoLembreteAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         """Não permite deletar notificações (auditoria)"""
         return False
+
+
+# ============ RESUMOS DE RESULTADOS ============
+
+
+@admin.register(ResumoAvaliacao)
+class ResumoAvaliacaoAdmin(admin.ModelAdmin):
+    """
+    Admin somente leitura dos resumos mantidos pelos signals de respostas.
+    Use o comando reconstruir_resumos_avaliacao para recalculá-los.
+    """
+
+    list_display = (
+        "avaliacao",
+        "total_respondentes",
+        "total_respostas",
+        "media_geral",
+        "classificacao",
+        "data_atualizacao",
+    )
+    list_filter = (
+        "classificacao",
+        ("avaliacao__ciclo", admin.RelatedOnlyFieldListFilter),
+    )
+    readonly_fields = (
+        "avaliacao",
+        "contagens_por_pergunta",
+        "total_respondentes",
+        "total_respostas",
+        "media_geral",
+        "classificacao",
+        "data_criacao",
+        "data_atualizacao",
+    )
+
+    def has_add_permission(self, request):
+        """Resumos são criados automaticamente"""
+        return False
+
+
+@admin.register(ResumoCiclo)
+class ResumoCicloAdmin(admin.ModelAdmin):
+    """
+    Admin somente leitura do snapshot de KPIs usado pelo dashboard de gestão.
+    Use o comando reconstruir_resumos_ciclos para recalculá-lo.
+    """
+
+    list_display = (
+        "ciclo",
+        "total_turmas",
+        "total_respondentes",
+        "taxa_media_resposta",
+        "jobs_com_erro",
+        "desatualizado",
+        "data_atualizacao",
+    )
+    list_filter = ("desatualizado",)
+    readonly_fields = (
+        ["ciclo"] + ResumoCiclo.CAMPOS_KPIS + ["desatualizado", "data_atualizacao"]
+    )
+
+    def has_add_permission(self, request):
+        """Snapshots são criados automaticamente"""
+        return False
+
+
+@admin.register(ResultadoCicloCongelado)
+class ResultadoCicloCongeladoAdmin(admin.ModelAdmin):
+    """
+    Admin somente leitura dos resultados congelados no encerramento do ciclo.
+    São descartados automaticamente quando o ciclo é reativado.
+    """
+
+    list_display = ("ciclo", "data_criacao")
+    readonly_fields = ("ciclo", "avaliacoes", "professores", "data_criacao")
+
+    def has_add_permission(self, request):
+        """Resultados são congelados automaticamente"""
+        return False
+
+
+@admin.register(SubmissaoAvaliacao)
+class SubmissaoAvaliacaoAdmin(admin.ModelAdmin):
+    """
+    Admin somente leitura dos registros de envio das avaliações.
+    Use o comando reconstruir_submissoes_avaliacao para reconstruí-los.
+    """
+
+    list_display = ("avaliacao", "aluno", "session_key", "data_criacao")
+    list_filter = (("avaliacao__ciclo", admin.RelatedOnlyFieldListFilter),)
+    search_fields = ("aluno__user__username", "aluno__user__first_name")
+    readonly_fields = ("avaliacao", "aluno", "session_key", "data_criacao")
+
+    def has_add_permission(self, request):
+        """Submissões são criadas automaticamente"""
+        return False
+
+
+# ============ OBSERVABILIDADE DO CACHE ============
+
+
+@admin.register(EstatisticaCache)
+class EstatisticaCacheAdmin(admin.ModelAdmin):
+    """
+    Admin somente leitura dos acertos, faltas e recálculos do cache por
+    prefixo de chave. Também disponível no comando estatisticas_cache.
+    """
+
+    list_display = (
+        "prefixo",
+        "hits",
+        "misses",
+        "taxa_acerto_display",
+        "recalculos",
+        "tempo_recalculo_medio_display",
+        "tempo_recalculo_max_display",
+        "bytes_medio",
+        "bytes_max",
+        "data_atualizacao",
+    )
+    readonly_fields = (
+        "prefixo",
+        "hits",
+        "misses",
+        "recalculos",
+        "tempo_recalculo_total",
+        "tempo_recalculo_max",
+        "bytes_total",
+        "bytes_max",
+        "data_criacao",
+        "data_atualizacao",
+    )
+    actions = ["zerar_estatisticas"]
+
+    def changelist_view(self, request, extra_context=None):
+        # Inclui os contadores ainda acumulados neste processo
+        EstatisticaCache.gravar_pendentes()
+        return super().changelist_view(request, extra_context)
+
+    def taxa_acerto_display(self, obj):
+        taxa = obj.taxa_acerto
+        return "N/A" if taxa is None else f"{taxa}%"
+
+    taxa_acerto_display.short_description = "Taxa de Acerto"
+
+    def tempo_recalculo_medio_display(self, obj):
+        tempo = obj.tempo_recalculo_medio
+        return "N/A" if tempo is None else f"{tempo * 1000:.1f} ms"
+
+    tempo_recalculo_medio_display.short_description = "Recálculo Médio"
+
+    def tempo_recalculo_max_display(self, obj):
+        return f"{obj.tempo_recalculo_max * 1000:.1f} ms"
+
+    tempo_recalculo_max_display.short_description = "Maior Recálculo"
+
+    def zerar_estatisticas(self, request, queryset):
+        """Action para recomeçar a contagem de todos os prefixos"""
+        EstatisticaCache.zerar()
+        self.message_user(request, "Estatísticas de cache zeradas.")
+
+    zerar_estatisticas.short_description = "🔄 Zerar estatísticas (todos os prefixos)"
+
+    def has_add_permission(self, request):
+        """Estatísticas são registradas automaticamente"""
+        return False
@@ -77,11 +77,11 @@ def apply_suap_user_type(
     if backend.name != "suap" or not user:
         return
 
+    from .utils import invalidar_roles_usuario, usuario_tem_role
+
     # Admin prevalece: não altera roles/perfis de administradores automaticamente
     try:
-        from rolepermissions.checkers import has_role
-
-        if has_role(user, "admin"):
+        if usuario_tem_role(user, "admin"):
             return
     except Exception:
         pass
@@ -93,7 +93,7 @@ def apply_suap_user_type(
         # Verificar se já tem alguma role definida (que não seja a padrão do SUAP)
         current_roles = []
         for role_name in ["coordenador", "professor", "aluno"]:
-            if has_role(user, role_name):
+            if usuario_tem_role(user, role_name):
                 current_roles.append(role_name)
 
         # Se já tem role definida, verificar se deve manter
@@ -153,6 +153,7 @@ def apply_suap_user_type(
 
     # Aplica a nova role
     assign_role(user, role_target)
+    invalidar_roles_usuario(user)
 
     # Gerencia perfis
     try:
@@ -0,0 +1,231 @@
+"""
+Backend de cache em duas camadas.
+
+Uma camada local (LRU em memória do processo, limitada em tamanho e em
+tempo de vida) fica na frente do DatabaseCache compartilhado. Leituras
+repetidas de chaves quentes deixam de fazer um round trip ao banco.
+
+Coerência: as chaves dos resultados embutem os contadores de versão (ver
+cache_versionado), então uma invalidação muda a chave consultada e as
+entradas locais antigas apenas envelhecem até sair do LRU. Os próprios
+contadores também ficam na camada local, mas só por LOCAL_VERSION_TIMEOUT
+segundos: uma leitura quente não vai ao banco, e em troca uma invalidação
+feita por outro processo leva até LOCAL_VERSION_TIMEOUT segundos para ser
+vista (no processo que invalidou ela vale na hora). Com 0, os contadores
+voltam a ser lidos do banco em toda leitura. Chaves não versionadas ficam
+no máximo LOCAL_TIMEOUT segundos defasadas em relação a escritas de outros
+processos.
+
+Configuração (settings.CACHES["default"]["OPTIONS"]):
+    - LOCAL_MAX_ENTRIES: entradas mantidas por processo (padrão: 500)
+    - LOCAL_TIMEOUT: tempo de vida local em segundos (padrão: 60)
+    - LOCAL_VERSION_TIMEOUT: tempo de vida local dos contadores de versão
+      em segundos (padrão: 5)
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.db import DatabaseCache
+
+from .cache_versionado import PREFIXO_VERSAO
+
+
+class CacheLocalLRU:
+    """
+    LRU thread-safe com expiração por entrada.
+
+    Os valores são guardados serializados (pickle), como no LocMemCache,
+    para que alterações no objeto devolvido não contaminem o cache.
+    """
+
+    def __init__(self, max_entradas, timeout):
+        self.max_entradas = max_entradas
+        self.timeout = timeout
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._dados)
+
+    def obter(self, chave):
+        """Retorna (encontrado, valor)."""
+        with self._lock:
+            entrada = self._dados.get(chave)
+            if entrada is None:
+                return False, None
+
+            expira_em, valor = entrada
+            if expira_em <= time.monotonic():
+                del self._dados[chave]
+                return False, None
+
+            self._dados.move_to_end(chave)
+
+        return True, pickle.loads(valor)
+
+    def definir(self, chave, valor, timeout=None):
+        """Armazena o valor por no máximo `timeout` (limitado ao timeout local)."""
+        if timeout is None:
+            timeout = self.timeout
+        timeout = min(timeout, self.timeout)
+        if timeout <= 0 or self.max_entradas <= 0:
+            self.remover(chave)
+            return
+
+        valor = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + timeout, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+
+    def remover(self, chave):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+
+# Camadas locais e contadores compartilhados entre as threads do processo
+# (o Django cria uma instância de backend por thread), por LOCATION.
+_camadas_locais = {}
+_estatisticas = {}
+_lock_registro = threading.Lock()
+
+
+class DatabaseCacheComCamadaLocal(DatabaseCache):
+    """
+    DatabaseCache com uma camada LRU local na frente.
+
+    Expõe contadores de acerto local, acerto no banco e falta em
+    estatisticas().
+    """
+
+    def __init__(self, table, params):
+        super().__init__(table, params)
+        options = params.get("OPTIONS", {})
+        max_entradas = int(options.get("LOCAL_MAX_ENTRIES", 500))
+        timeout_local = int(options.get("LOCAL_TIMEOUT", 60))
+        self._timeout_versoes = float(options.get("LOCAL_VERSION_TIMEOUT", 5))
+
+        with _lock_registro:
+            self._local = _camadas_locais.setdefault(
+                table, CacheLocalLRU(max_entradas, timeout_local)
+            )
+            self._contadores = _estatisticas.setdefault(
+                table,
+                {"hits_locais": 0, "hits_compartilhados": 0, "misses": 0},
+            )
+
+    # ------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------
+
+    def _timeout_local(self, key, timeout=None):
+        """Contadores de versão ficam no máximo LOCAL_VERSION_TIMEOUT segundos."""
+        if str(key).startswith(PREFIXO_VERSAO):
+            if timeout is None:
+                return self._timeout_versoes
+            return min(timeout, self._timeout_versoes)
+        return timeout
+
+    def _contar(self, campo, quantidade=1):
+        if quantidade:
+            with _lock_registro:
+                self._contadores[campo] += quantidade
+
+    def estatisticas(self):
+        """Retorna os contadores de acertos/faltas e o tamanho da camada local."""
+        with _lock_registro:
+            dados = dict(self._contadores)
+        dados["entradas_locais"] = len(self._local)
+        return dados
+
+    def zerar_estatisticas(self):
+        with _lock_registro:
+            for campo in self._contadores:
+                self._contadores[campo] = 0
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def get_many(self, keys, version=None):
+        resultado = {}
+        pendentes = []
+
+        for key in keys:
+            chave = self.make_and_validate_key(key, version=version)
+            encontrado, valor = self._local.obter(chave)
+            if encontrado:
+                resultado[key] = valor
+            else:
+                pendentes.append(key)
+
+        self._contar("hits_locais", len(resultado))
+        if not pendentes:
+            return resultado
+
+        compartilhados = super().get_many(pendentes, version=version)
+        self._contar("hits_compartilhados", len(compartilhados))
+        self._contar("misses", len(pendentes) - len(compartilhados))
+
+        for key, valor in compartilhados.items():
+            self._local.definir(
+                self.make_and_validate_key(key, version=version),
+                valor,
+                self._timeout_local(key),
+            )
+
+        resultado.update(compartilhados)
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def _atualizar_local(self, key, value, timeout, version):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        self._local.definir(
+            self.make_and_validate_key(key, version=version),
+            value,
+            self._timeout_local(key, timeout),
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        super().set(key, value, timeout, version)
+        self._atualizar_local(key, value, timeout, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        adicionado = super().add(key, value, timeout, version)
+        if adicionado:
+            self._atualizar_local(key, value, timeout, version)
+        else:
+            # Outro processo gravou a chave: a cópia local pode estar defasada
+            self._local.remover(self.make_and_validate_key(key, version=version))
+        return adicionado
+
+    def incr(self, key, delta=1, version=None):
+        self._local.remover(self.make_and_validate_key(key, version=version))
+        return super().incr(key, delta, version)
+
+    def delete(self, key, version=None):
+        self._local.remover(self.make_and_validate_key(key, version=version))
+        return super().delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._local.remover(self.make_and_validate_key(key, version=version))
+        return super().delete_many(keys, version)
+
+    def clear(self):
+        self._local.limpar()
+        return super().clear()
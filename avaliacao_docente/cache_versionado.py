@@ -0,0 +1,438 @@
+"""
+Namespaces versionados de cache.
+
+Em vez de apagar chave por chave, cada resultado cacheado embute na sua
+chave os carimbos de versão dos escopos de que depende (global, professor,
+ciclo). Invalidar um escopo é uma única troca da versão (sempre nova, ver
+incrementar_versao): as chaves antigas deixam de ser consultadas e expiram
+sozinhas pelo timeout. Com a camada local de cache_backends, os demais
+processos passam a ver a nova versão em até LOCAL_VERSION_TIMEOUT segundos.
+
+Escopos:
+    - global: mudanças que afetam todos os resultados (ex.: questionários)
+    - professor: respostas, avaliações e matrículas das turmas do professor
+    - ciclo: respostas, avaliações, matrículas e estado do ciclo
+    - configuracao: a ConfiguracaoSite (singleton)
+    - relatorios: qualquer alteração que afete professores ou ciclos
+      (incrementado junto com esses escopos)
+    - cadastros: nomes e listas exibidos nos relatórios (ciclos,
+      professores, cursos, disciplinas e turmas)
+    - questionario: perguntas de um questionário (questionário compilado)
+
+obter_ou_calcular() protege os resultados caros contra stampede: apenas um
+processo recalcula cada chave (lock curto no cache), os demais aguardam
+brevemente ou recebem o último valor conhecido, e chaves quentes são
+renovadas antecipadamente de forma probabilística antes de expirar.
+
+As respostas de avaliação não invalidam linha a linha: as avaliações
+alteradas na transação são acumuladas e invalidadas uma única vez no
+commit (ver invalidar_cache_avaliacoes_ao_confirmar).
+
+Com `prefixo`, obter_ou_calcular() também registra acertos, faltas,
+duração dos recálculos e tamanho dos valores em EstatisticaCache
+(ver registrar_estatistica_cache).
+"""
+
+import hashlib
+import math
+import pickle
+import random
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+ESCOPO_GLOBAL = "global"
+ESCOPO_PROFESSOR = "professor"
+ESCOPO_CICLO = "ciclo"
+ESCOPO_CONFIGURACAO = "configuracao"
+ESCOPO_RELATORIOS = "relatorios"
+ESCOPO_CADASTROS = "cadastros"
+ESCOPO_QUESTIONARIO = "questionario"
+
+# Prefixo das chaves dos contadores (lidas sempre do cache compartilhado)
+PREFIXO_VERSAO = "versao_cache:"
+
+
+def get_cache_key(prefix, *args):
+    """
+    Gera chave de cache única baseada nos argumentos.
+
+    Args:
+        prefix: Prefixo identificador do tipo de cache
+        *args: Argumentos variáveis para compor a chave
+
+    Returns:
+        str: Hash SHA256 da chave (evita chaves muito longas e é seguro)
+    """
+    key_parts = [str(arg) for arg in args if arg is not None]
+    key_string = f"{prefix}:{'_'.join(key_parts)}"
+    # Usar SHA256 ao invés de MD5 por questões de segurança
+    return hashlib.sha256(key_string.encode()).hexdigest()
+
+
+def _chave_versao(escopo, identificador=""):
+    """Chave (não hasheada) do contador de versão de um escopo."""
+    return f"{PREFIXO_VERSAO}{escopo}:{identificador}"
+
+
+def _versao_inicial():
+    """
+    Versão usada quando o contador não existe (ou foi removido pelo cull
+    do cache): baseada no relógio em nanossegundos, fica à frente de
+    qualquer versão já emitida.
+    """
+    return time.time_ns()
+
+
+def obter_versoes(escopos):
+    """
+    Retorna as versões atuais de vários escopos com uma única leitura.
+
+    Args:
+        escopos: Lista de tuplas (escopo, identificador)
+
+    Returns:
+        list de versões (int), na mesma ordem de `escopos`
+    """
+    chaves = [_chave_versao(escopo, identificador) for escopo, identificador in escopos]
+    versoes = cache.get_many(chaves)
+
+    for chave in chaves:
+        if chave not in versoes:
+            # add() não sobrescreve um contador criado em paralelo
+            cache.add(chave, _versao_inicial(), None)
+            versoes[chave] = cache.get(chave, _versao_inicial())
+
+    return [versoes[chave] for chave in chaves]
+
+
+def obter_versao(escopo, identificador=""):
+    """Retorna a versão atual de um escopo."""
+    return obter_versoes([(escopo, identificador)])[0]
+
+
+def incrementar_versao(escopo, identificador=""):
+    """
+    Invalida todos os resultados cacheados que dependem do escopo.
+
+    Returns:
+        int: Nova versão do escopo
+    """
+    chave = _chave_versao(escopo, identificador)
+    versao_atual = cache.get(chave)
+
+    # A leitura e a gravação não são atômicas: dois incrementos que leem a
+    # mesma versão gravariam o mesmo v+1, e um resultado calculado entre
+    # eles sobreviveria ao segundo. Usar o relógio em nanossegundos torna
+    # cada versão emitida única. Não usa cache.incr(): no DatabaseCache ele
+    # regrava a chave com o timeout padrão, e o contador expiraria.
+    versao = _versao_inicial()
+    if versao_atual is not None:
+        versao = max(versao_atual + 1, versao)
+    cache.set(chave, versao, None)
+    return versao
+
+
+def invalidar_cache_global():
+    """Invalida todos os resultados cacheados."""
+    return incrementar_versao(ESCOPO_GLOBAL)
+
+
+def invalidar_cache_professores(professor_ids):
+    """Invalida os resultados cacheados dos professores informados."""
+    professor_ids = set(professor_ids) - {None}
+    for professor_id in professor_ids:
+        incrementar_versao(ESCOPO_PROFESSOR, professor_id)
+    if professor_ids:
+        incrementar_versao(ESCOPO_RELATORIOS)
+
+
+def invalidar_cache_ciclos(ciclo_ids):
+    """Invalida os resultados cacheados dos ciclos informados."""
+    ciclo_ids = set(ciclo_ids) - {None}
+    for ciclo_id in ciclo_ids:
+        incrementar_versao(ESCOPO_CICLO, ciclo_id)
+    if ciclo_ids:
+        incrementar_versao(ESCOPO_RELATORIOS)
+
+
+def invalidar_cache_avaliacoes(avaliacoes):
+    """
+    Invalida os resultados dos professores e ciclos de várias avaliações,
+    com um único incremento por escopo (pares repetidos são ignorados).
+
+    Args:
+        avaliacoes: Iterável de tuplas (professor_id, ciclo_id)
+    """
+    avaliacoes = set(avaliacoes)
+    professor_ids = {professor_id for professor_id, _ in avaliacoes} - {None}
+    ciclo_ids = {ciclo_id for _, ciclo_id in avaliacoes} - {None}
+
+    for professor_id in professor_ids:
+        incrementar_versao(ESCOPO_PROFESSOR, professor_id)
+    for ciclo_id in ciclo_ids:
+        incrementar_versao(ESCOPO_CICLO, ciclo_id)
+    if professor_ids or ciclo_ids:
+        incrementar_versao(ESCOPO_RELATORIOS)
+
+
+# Invalidação de avaliações pendente até o commit (por thread, como as
+# conexões do banco)
+_pendentes_commit = threading.local()
+
+
+class _InvalidacaoAoConfirmar:
+    """Avaliações alteradas em uma transação; executada no commit."""
+
+    def __init__(self):
+        self.avaliacao_ids = set()
+        self.executada = False
+
+    def __call__(self):
+        from .models import AvaliacaoDocente
+
+        self.executada = True
+        invalidar_cache_avaliacoes(
+            AvaliacaoDocente.all_objects.filter(id__in=self.avaliacao_ids)
+            .values_list("professor_id", "ciclo_id")
+            .order_by()
+        )
+
+    def agendada(self, conexao):
+        """Indica se ainda está na fila do commit da conexão."""
+        return not self.executada and any(
+            agendado[1] is self for agendado in conexao.run_on_commit
+        )
+
+
+def invalidar_cache_avaliacoes_ao_confirmar(avaliacao_ids):
+    """
+    Agenda a invalidação do cache das avaliações para o commit da transação
+    corrente (imediata fora de transação).
+
+    As avaliações são acumuladas sem repetição: todas as respostas gravadas
+    ou excluídas na transação resultam em uma única consulta dos pares
+    (professor, ciclo) e uma única invalidação por escopo.
+
+    Args:
+        avaliacao_ids: Iterável de ids de AvaliacaoDocente
+    """
+    conexao = transaction.get_connection()
+    if not conexao.in_atomic_block:
+        pendente = _InvalidacaoAoConfirmar()
+        pendente.avaliacao_ids.update(avaliacao_ids)
+        pendente()
+        return
+
+    # Reaproveita a invalidação agendada enquanto ela estiver na fila do
+    # commit; se a transação (ou o savepoint em que foi agendada) foi
+    # desfeita, o Django a descartou e uma nova é agendada
+    pendente = getattr(_pendentes_commit, "invalidacao", None)
+    if pendente is None or not pendente.agendada(conexao):
+        pendente = _InvalidacaoAoConfirmar()
+        _pendentes_commit.invalidacao = pendente
+        transaction.on_commit(pendente, robust=True)
+    pendente.avaliacao_ids.update(avaliacao_ids)
+
+
+def invalidar_cache_cadastros():
+    """Invalida o que depende dos cadastros exibidos nos relatórios."""
+    return incrementar_versao(ESCOPO_CADASTROS)
+
+
+def chave_versionada(prefix, *args, professor_id=None, ciclo_id=None):
+    """
+    Gera chave de cache com os carimbos de versão dos escopos envolvidos.
+
+    O escopo global entra sempre; professor e ciclo entram quando
+    informados.
+
+    Args:
+        prefix: Prefixo identificador do tipo de cache
+        *args: Argumentos que compõem a chave
+        professor_id: Professor de que o resultado depende (opcional)
+        ciclo_id: Ciclo de que o resultado depende (opcional)
+
+    Returns:
+        str: Hash SHA256 da chave versionada
+    """
+    escopos = [(ESCOPO_GLOBAL, "")]
+    if professor_id is not None:
+        escopos.append((ESCOPO_PROFESSOR, professor_id))
+    if ciclo_id is not None:
+        escopos.append((ESCOPO_CICLO, ciclo_id))
+
+    versoes = obter_versoes(escopos)
+    carimbo = ".".join(str(versao) for versao in versoes)
+    return get_cache_key(prefix, *args, f"v{carimbo}")
+
+
+def carimbos_dados(pares):
+    """
+    Carimbos de versão dos dados de vários pares (professor, ciclo), com
+    uma única leitura de versões.
+
+    Usados como chave dos fragmentos de template dos relatórios: o
+    carimbo muda quando respostas, avaliações ou matrículas do professor
+    (ou do ciclo) mudam, e também com os escopos global e de cadastros
+    (questionários e nomes exibidos).
+
+    Args:
+        pares: Iterável de tuplas (professor_id, ciclo_id); ciclo_id pode
+            ser None quando o fragmento não depende de um ciclo
+
+    Returns:
+        dict {(professor_id, ciclo_id): str}
+    """
+    pares = list(dict.fromkeys(pares))
+    escopos = [(ESCOPO_GLOBAL, ""), (ESCOPO_CADASTROS, "")]
+    for professor_id, ciclo_id in pares:
+        escopos.append((ESCOPO_PROFESSOR, professor_id))
+        if ciclo_id is not None:
+            escopos.append((ESCOPO_CICLO, ciclo_id))
+    escopos = list(dict.fromkeys(escopos))
+    versoes = dict(zip(escopos, obter_versoes(escopos)))
+
+    base = f"{versoes[(ESCOPO_GLOBAL, '')]}.{versoes[(ESCOPO_CADASTROS, '')]}"
+    carimbos = {}
+    for professor_id, ciclo_id in pares:
+        carimbo = f"{base}.{versoes[(ESCOPO_PROFESSOR, professor_id)]}"
+        if ciclo_id is not None:
+            carimbo += f".{versoes[(ESCOPO_CICLO, ciclo_id)]}"
+        carimbos[(professor_id, ciclo_id)] = carimbo
+    return carimbos
+
+
+# ============================================================================
+# PROTEÇÃO CONTRA STAMPEDE
+# ============================================================================
+
+# Tempo máximo (s) que um lock de recálculo pode ficar preso
+TIMEOUT_LOCK = 30
+# Espera máxima (s) pelo recálculo de outro processo quando não há valor antigo
+ESPERA_MAXIMA_LOCK = 2.0
+INTERVALO_ESPERA_LOCK = 0.05
+# Peso da renovação antecipada probabilística (quanto maior, mais cedo)
+BETA_RENOVACAO = 1.0
+
+
+def _deve_renovar(entrada, agora):
+    """
+    Decide se a entrada deve ser recalculada.
+
+    Entradas vencidas sempre são renovadas; as demais são renovadas
+    antecipadamente com probabilidade crescente perto do vencimento,
+    proporcional ao tempo que o cálculo levou (XFetch).
+    """
+    sorteio = 1.0 - random.random()  # (0, 1]
+    antecipacao = -entrada["duracao"] * BETA_RENOVACAO * math.log(sorteio)
+    return agora + antecipacao >= entrada["expira_em"]
+
+
+def registrar_estatistica_cache(prefixo, hits=0, misses=0, duracao=None, valor=None):
+    """
+    Registra eventos de um consumidor do cache em EstatisticaCache.
+
+    Args:
+        prefixo: Prefixo da chave (ex.: "metricas_prof"); None não registra
+        hits: Leituras atendidas pelo cache
+        misses: Leituras sem valor no cache
+        duracao: Duração (s) de um recálculo, se houve
+        valor: Valor recalculado (para medir o tamanho serializado)
+    """
+    if prefixo is None:
+        return
+
+    from .models import EstatisticaCache
+
+    tamanho = None
+    if valor is not None:
+        tamanho = len(pickle.dumps(valor, pickle.HIGHEST_PROTOCOL))
+    EstatisticaCache.registrar(
+        prefixo, hits=hits, misses=misses, duracao=duracao, tamanho=tamanho
+    )
+
+
+def _calcular_e_gravar(chave, calcular, timeout, prefixo=None, hit=False):
+    """Calcula o valor e grava a entrada (com metadados) na chave."""
+    inicio = time.time()
+    valor = calcular()
+    fim = time.time()
+
+    entrada = {"valor": valor, "expira_em": fim + timeout, "duracao": fim - inicio}
+    # A entrada física dura o dobro: a segunda metade serve como valor antigo
+    cache.set(chave, entrada, timeout * 2)
+    registrar_estatistica_cache(
+        prefixo,
+        hits=int(hit),
+        misses=int(not hit),
+        duracao=fim - inicio,
+        valor=valor,
+    )
+    return valor
+
+
+def _aguardar_recalculo(chave):
+    """Aguarda brevemente a entrada gravada por outro processo."""
+    limite = time.monotonic() + ESPERA_MAXIMA_LOCK
+    while time.monotonic() < limite:
+        time.sleep(INTERVALO_ESPERA_LOCK)
+        entrada = cache.get(chave)
+        if entrada is not None:
+            return entrada
+    return None
+
+
+def obter_ou_calcular(chave, calcular, timeout, prefixo=None):
+    """
+    Retorna o valor cacheado em `chave`, recalculando com proteção contra
+    stampede.
+
+    - Apenas o processo que obtém o lock da chave recalcula; os demais
+      devolvem o valor vencido da mesma chave ou aguardam até
+      ESPERA_MAXIMA_LOCK segundos pelo novo valor.
+    - Antes de vencer, a entrada pode ser renovada antecipadamente
+      (renovação probabilística), de modo que chaves quentes raramente
+      vencem sob carga.
+
+    Valores de versões anteriores nunca são servidos: uma nova versão só
+    surge quando uma escrita invalida o escopo, e os números antigos já
+    não valem.
+
+    Args:
+        chave: Chave (versionada) do resultado
+        calcular: Função sem argumentos que produz o valor
+        timeout: Validade do valor em segundos
+        prefixo: Prefixo da chave para as estatísticas de uso (opcional).
+            Conta como acerto toda leitura que encontrou a entrada da
+            chave, mesmo vencida ou renovada antecipadamente
+
+    Returns:
+        Valor cacheado ou recém-calculado
+    """
+    entrada = cache.get(chave)
+
+    if entrada is not None and not _deve_renovar(entrada, time.time()):
+        registrar_estatistica_cache(prefixo, hits=1)
+        return entrada["valor"]
+
+    chave_lock = f"lock:{chave}"
+    if cache.add(chave_lock, 1, TIMEOUT_LOCK):
+        try:
+            return _calcular_e_gravar(
+                chave, calcular, timeout, prefixo=prefixo, hit=entrada is not None
+            )
+        finally:
+            cache.delete(chave_lock)
+
+    # Outro processo está recalculando esta chave
+    if entrada is not None:
+        registrar_estatistica_cache(prefixo, hits=1)
+        return entrada["valor"]
+    registrar_estatistica_cache(prefixo, misses=1)
+    entrada = _aguardar_recalculo(chave)
+    if entrada is not None:
+        return entrada["valor"]
+    return calcular()
@@ -0,0 +1,141 @@
+"""
+Pré-calcula e grava no cache os resultados dos relatórios.
+
+Para cada ciclo escolhido: atualiza os KPIs (ResumoCiclo), congela os
+resultados de ciclos fechados e calcula as métricas (do ciclo e gerais)
+e o histórico de cada professor avaliado. As tarefas de professor rodam
+em processos paralelos (--workers).
+
+Deve ser executado todas as noites via cron, por exemplo:
+
+    0 3 * * * cd /path/to/project && python manage.py aquecer_cache_relatorios
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from avaliacao_docente.models import CicloAvaliacao, EstatisticaCache
+from avaliacao_docente.services import (
+    aquecer_cache_professor,
+    aquecer_resumos_ciclos,
+    listar_tarefas_aquecimento,
+)
+
+
+def _inicializar_worker():
+    """Prepara o processo filho (conexões herdadas não podem ser reusadas)."""
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Pré-calcula o cache dos relatórios (métricas, histórico por ciclo e "
+        "KPIs) dos ciclos escolhidos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ciclo-id",
+            type=int,
+            action="append",
+            help="Aquece apenas este ciclo (pode ser repetido)",
+        )
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=180,
+            help=(
+                "Sem --ciclo-id, aquece os ciclos iniciados nos últimos N dias "
+                "(padrão: 180)"
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Quantidade de processos paralelos (padrão: 4)",
+        )
+
+    def handle(self, *args, **options):
+        ciclo_ids = options.get("ciclo_id")
+        workers = max(options.get("workers") or 1, 1)
+
+        ciclos = CicloAvaliacao.objects.all()
+        if ciclo_ids:
+            ciclos = ciclos.filter(id__in=ciclo_ids)
+        else:
+            inicio = timezone.now() - timedelta(days=options["dias"])
+            ciclos = ciclos.filter(data_inicio__gte=inicio)
+
+        ciclos = list(ciclos.order_by("id"))
+        if not ciclos:
+            self.stdout.write(self.style.WARNING("Nenhum ciclo encontrado."))
+            return
+
+        self.stdout.write(f"Atualizando KPIs de {len(ciclos)} ciclo(s)...")
+        aquecer_resumos_ciclos(ciclos)
+
+        tarefas = listar_tarefas_aquecimento(ciclos)
+        total = len(tarefas)
+        self.stdout.write(
+            f"Aquecendo {total} resultado(s) de professores com {workers} worker(s)..."
+        )
+
+        concluidas = 0
+        erros = 0
+        if workers == 1:
+            for professor_id, ciclo_id in tarefas:
+                try:
+                    aquecer_cache_professor(professor_id, ciclo_id)
+                except Exception as e:
+                    erros += 1
+                    self.stderr.write(
+                        f"  ❌ Professor {professor_id} / ciclo {ciclo_id}: {e}"
+                    )
+                concluidas += 1
+                self._progresso(concluidas, total)
+        else:
+            # Conexões abertas não podem ser compartilhadas com os filhos
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_inicializar_worker
+            ) as executor:
+                futuros = {
+                    executor.submit(aquecer_cache_professor, professor_id, ciclo_id): (
+                        professor_id,
+                        ciclo_id,
+                    )
+                    for professor_id, ciclo_id in tarefas
+                }
+                for futuro in as_completed(futuros):
+                    try:
+                        futuro.result()
+                    except Exception as e:
+                        erros += 1
+                        professor_id, ciclo_id = futuros[futuro]
+                        self.stderr.write(
+                            f"  ❌ Professor {professor_id} / ciclo {ciclo_id}: {e}"
+                        )
+                    concluidas += 1
+                    self._progresso(concluidas, total)
+
+        # Recálculos feitos neste processo (os dos workers não são contados)
+        EstatisticaCache.gravar_pendentes()
+
+        mensagem = f"✅ Cache aquecido: {concluidas - erros}/{total} resultado(s)."
+        if erros:
+            self.stdout.write(self.style.WARNING(f"{mensagem} {erros} com erro."))
+        else:
+            self.stdout.write(self.style.SUCCESS(mensagem))
+
+    def _progresso(self, concluidas, total):
+        # Evita uma linha por tarefa em execuções grandes
+        if concluidas == total or concluidas % 10 == 0:
+            self.stdout.write(f"  {concluidas}/{total} tarefas concluídas")
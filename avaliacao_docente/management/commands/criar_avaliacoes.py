@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from avaliacao_docente.models import CicloAvaliacao, AvaliacaoDocente
@@ -51,54 +52,73 @@ class Command(BaseCommand):
                 )
                 continue
 
-            with transaction.atomic():
-                for turma in ciclo.turmas.all():
-                    # Verificar se já existe uma avaliação
-                    existe_avaliacao = AvaliacaoDocente.objects.filter(
-                        ciclo=ciclo,
-                        turma=turma,
-                        professor=turma.disciplina.professor,
-                        disciplina=turma.disciplina,
-                    ).exists()
+            # Avaliações existentes do ciclo (inclusive inativas) em uma query
+            existentes = set(
+                AvaliacaoDocente.all_objects.filter(ciclo=ciclo).values_list(
+                    "turma_id", "professor_id", "disciplina_id"
+                )
+            )
+
+            novas = []
+            remover = []
+            for turma in ciclo.turmas.select_related(
+                "disciplina__professor__user"
+            ).all():
+                professor = turma.disciplina.professor
+                if professor is None:
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"  Erro ao criar avaliação para turma {turma.codigo_turma}: "
+                            "disciplina sem professor"
+                        )
+                    )
+                    continue
 
-                    if existe_avaliacao and not force:
+                chave = (turma.id, professor.id, turma.disciplina_id)
+                if chave in existentes:
+                    if not force:
                         self.stdout.write(
                             f"  Avaliação já existe para turma {turma.codigo_turma} - pulando"
                         )
                         continue
+                    remover.append(chave)
+                    self.stdout.write(
+                        f"  Avaliação existente removida para turma {turma.codigo_turma}"
+                    )
+
+                novas.append(
+                    AvaliacaoDocente(
+                        ciclo=ciclo,
+                        turma=turma,
+                        professor=professor,
+                        disciplina=turma.disciplina,
+                        status="pendente",
+                    )
+                )
 
-                    if existe_avaliacao and force:
-                        # Remover avaliação existente
-                        AvaliacaoDocente.objects.filter(
+            # Remoções e criação em lote (validação única, sem full_clean por linha)
+            try:
+                with transaction.atomic():
+                    for turma_id, professor_id, disciplina_id in remover:
+                        AvaliacaoDocente.all_objects.filter(
                             ciclo=ciclo,
-                            turma=turma,
-                            professor=turma.disciplina.professor,
-                            disciplina=turma.disciplina,
+                            turma_id=turma_id,
+                            professor_id=professor_id,
+                            disciplina_id=disciplina_id,
                         ).delete()
-                        self.stdout.write(
-                            f"  Avaliação existente removida para turma {turma.codigo_turma}"
-                        )
+                    AvaliacaoDocente.criar_em_lote(novas)
+            except ValidationError as e:
+                for mensagem in e.messages:
+                    self.stdout.write(
+                        self.style.ERROR(f"  Erro ao criar avaliações: {mensagem}")
+                    )
+                continue
 
-                    # Criar nova avaliação
-                    try:
-                        avaliacao = AvaliacaoDocente.objects.create(
-                            ciclo=ciclo,
-                            turma=turma,
-                            professor=turma.disciplina.professor,
-                            disciplina=turma.disciplina,
-                            status="pendente",
-                        )
-                        avaliacoes_criadas += 1
-                        self.stdout.write(
-                            f"  ✓ Avaliação criada: {avaliacao.professor.user.get_full_name()} - {avaliacao.disciplina.disciplina_nome} ({avaliacao.turma.codigo_turma})"
-                        )
-                    except Exception as e:
-                        self.stdout.write(
-                            self.style.ERROR(
-                                f"  Erro ao criar avaliação para turma {turma.codigo_turma}: {e}"
-                            )
-                        )
-                        continue
+            for avaliacao in novas:
+                avaliacoes_criadas += 1
+                self.stdout.write(
+                    f"  ✓ Avaliação criada: {avaliacao.professor.user.get_full_name()} - {avaliacao.disciplina.disciplina_nome} ({avaliacao.turma.codigo_turma})"
+                )
 
             total_avaliacoes_criadas += avaliacoes_criadas
             total_ciclos_processados += 1
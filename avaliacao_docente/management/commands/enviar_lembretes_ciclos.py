@@ -4,7 +4,7 @@ Management command para enviar lembretes automáticos de avaliação.
 Este comando deve ser executado periodicamente (via cron/celery) para:
 1. Identificar turmas que não atingiram o limiar mínimo de respostas (10%)
 2. Selecionar alunos elegíveis que ainda não responderam
-3. Enviar e-mails de lembrete em lote
+3. Enviar e-mails de lembrete em lote (e os avisos de novas avaliações)
 4. Atualizar contadores e status dos jobs
 5. Parar automaticamente quando limiar for atingido
 
@@ -21,12 +21,17 @@ from datetime import timedelta
 import logging
 
 from avaliacao_docente.models import (
+    CicloAvaliacao,
     JobLembreteCicloTurma,
     NotificacaoLembrete,
     ConfiguracaoSite,
 )
 from avaliacao_docente.services import (
+    atualizar_resumos_ciclos,
     calcular_taxa_resposta_turma,
+    congelar_ciclos_fechados,
+    enviar_notificacoes_pendentes,
+    garantir_resumos_ciclos,
     obter_alunos_pendentes_lembrete,
 )
 
@@ -75,6 +80,22 @@ class Command(BaseCommand):
         self.stdout.write(f"   - Max lembretes/aluno: {config.max_lembretes_por_aluno}")
         self.stdout.write(f"   - Tamanho do lote: {batch_size}\n")
 
+        # Congelar resultados de ciclos que passaram da data de fim,
+        # recalcular os KPIs marcados como desatualizados pelas respostas e
+        # avisar os alunos das avaliações recém-criadas
+        if not dry_run:
+            congelados = congelar_ciclos_fechados()
+            if congelados:
+                self.stdout.write(
+                    f"🧊 Resultados congelados de {congelados} ciclo(s) fechado(s)"
+                )
+            garantir_resumos_ciclos(CicloAvaliacao.objects.all())
+            notificados = enviar_notificacoes_pendentes()
+            if notificados:
+                self.stdout.write(
+                    f"📨 {notificados} aviso(s) de nova avaliação enviado(s)"
+                )
+
         # Buscar jobs pendentes
         if force_job_id:
             jobs = JobLembreteCicloTurma.objects.filter(id=force_job_id)
@@ -100,8 +121,10 @@ class Command(BaseCommand):
         total_emails_enviados = 0
         total_jobs_concluidos = 0
         total_jobs_com_erro = 0
+        ciclos_processados = {}
 
         for job in jobs:
+            ciclos_processados[job.ciclo_id] = job.ciclo
             self.stdout.write(f'\n{"="*80}')
             self.stdout.write(
                 f"🔄 Processando: {job.ciclo.nome} - {job.turma.codigo_turma}"
@@ -223,6 +246,10 @@ class Command(BaseCommand):
 
                 total_jobs_com_erro += 1
 
+        # Atualizar snapshot de KPIs dos ciclos processados (dashboard de gestão)
+        if not dry_run and ciclos_processados:
+            atualizar_resumos_ciclos(list(ciclos_processados.values()))
+
         # Resumo final
         self.stdout.write(f'\n{"="*80}')
         self.stdout.write(self.style.SUCCESS("\n📊 RESUMO DA EXECUÇÃO:"))
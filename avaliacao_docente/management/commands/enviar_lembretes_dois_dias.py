@@ -18,7 +18,7 @@ from avaliacao_docente.models import (
     CicloAvaliacao,
     LembreteAvaliacao,
     MatriculaTurma,
-    RespostaAvaliacao,
+    SubmissaoAvaliacao,
 )
 
 
@@ -93,14 +93,17 @@ class Command(BaseCommand):
                     f"👥 Total de alunos matriculados: {total_matriculados}"
                 )
 
-                # Filtrar alunos que já responderam
-                alunos_responderam = (
-                    RespostaAvaliacao.objects.filter(avaliacao__ciclo=ciclo)
+                # Filtrar alunos que já responderam (submissões anônimas,
+                # sem aluno, não identificam ninguém)
+                alunos_responderam = set(
+                    SubmissaoAvaliacao.objects.filter(
+                        avaliacao__ciclo=ciclo, aluno__isnull=False
+                    )
                     .values_list("aluno_id", flat=True)
                     .distinct()
                 )
 
-                total_responderam = alunos_responderam.count()
+                total_responderam = len(alunos_responderam)
                 self.stdout.write(f"✅ Alunos que já responderam: {total_responderam}")
 
                 alunos_sem_resposta = [
@@ -0,0 +1,95 @@
+"""
+Exibe as estatísticas de uso do cache por prefixo de chave.
+
+Para cada prefixo (metricas_prof, historico_prof_ciclo, ...): acertos,
+faltas, taxa de acerto, recálculos com tempo médio/máximo e tamanho
+médio/máximo dos valores gravados. Mostra também a ocupação da tabela
+do cache em relação a MAX_ENTRIES. Serve para ajustar TTLs e limites
+com dados reais:
+
+    python manage.py estatisticas_cache
+    python manage.py estatisticas_cache --zerar
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from avaliacao_docente.models import EstatisticaCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Exibe acertos, faltas, tempo de recálculo e tamanho dos valores do "
+        "cache por prefixo de chave"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--zerar",
+            action="store_true",
+            help="Zera as estatísticas após exibi-las",
+        )
+
+    def handle(self, *args, **options):
+        EstatisticaCache.gravar_pendentes()
+        estatisticas = list(EstatisticaCache.objects.all())
+
+        if not estatisticas:
+            self.stdout.write(self.style.WARNING("Nenhuma estatística registrada."))
+        else:
+            self.stdout.write(
+                f"{'Prefixo':<28}{'Acertos':>10}{'Faltas':>10}{'Acerto':>9}"
+                f"{'Recálc.':>9}{'Médio':>11}{'Máximo':>11}"
+                f"{'Tam. médio':>12}{'Tam. máx.':>12}"
+            )
+            for estatistica in estatisticas:
+                self.stdout.write(self._linha(estatistica))
+
+        self._ocupacao()
+
+        if options["zerar"]:
+            EstatisticaCache.zerar()
+            self.stdout.write(self.style.SUCCESS("✅ Estatísticas zeradas."))
+
+    def _linha(self, estatistica):
+        taxa = estatistica.taxa_acerto
+        medio = estatistica.tempo_recalculo_medio
+        bytes_medio = estatistica.bytes_medio
+        return (
+            f"{estatistica.prefixo:<28}"
+            f"{estatistica.hits:>10}"
+            f"{estatistica.misses:>10}"
+            f"{'N/A' if taxa is None else f'{taxa:.1f}%':>9}"
+            f"{estatistica.recalculos:>9}"
+            f"{'N/A' if medio is None else f'{medio * 1000:.1f} ms':>11}"
+            f"{f'{estatistica.tempo_recalculo_max * 1000:.1f} ms':>11}"
+            f"{'N/A' if bytes_medio is None else _tamanho(bytes_medio):>12}"
+            f"{_tamanho(estatistica.bytes_max):>12}"
+        )
+
+    def _ocupacao(self):
+        """Entradas da tabela do cache compartilhado em relação a MAX_ENTRIES."""
+        tabela = getattr(cache, "_table", None)
+        if tabela is None:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(tabela)}")
+            entradas = cursor.fetchone()[0]
+
+        opcoes = settings.CACHES["default"].get("OPTIONS", {})
+        maximo = opcoes.get("MAX_ENTRIES", 300)
+        self.stdout.write(
+            f"\nTabela do cache: {entradas}/{maximo} entrada(s) (MAX_ENTRIES)"
+        )
+
+
+def _tamanho(total_bytes):
+    """Formata um tamanho em bytes (B, KB ou MB)."""
+    if total_bytes < 1024:
+        return f"{total_bytes} B"
+    if total_bytes < 1024 * 1024:
+        return f"{total_bytes / 1024:.1f} KB"
+    return f"{total_bytes / 1024 / 1024:.1f} MB"
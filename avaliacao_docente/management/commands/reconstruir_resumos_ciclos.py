@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from avaliacao_docente.models import CicloAvaliacao
+from avaliacao_docente.services import atualizar_resumos_ciclos
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói o snapshot de KPIs (ResumoCiclo) usado pelo dashboard "
+        "de gestão de ciclos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ciclo-id", type=int, help="Reconstrói apenas o snapshot deste ciclo"
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=50,
+            help="Quantidade de ciclos processados por lote (padrão: 50)",
+        )
+
+    def handle(self, *args, **options):
+        ciclo_id = options.get("ciclo_id")
+        lote = max(options.get("lote") or 50, 1)
+
+        ciclos = CicloAvaliacao.all_objects.all()
+        if ciclo_id:
+            ciclos = ciclos.filter(id=ciclo_id)
+
+        ciclos = list(ciclos.order_by("id"))
+        total = len(ciclos)
+
+        if not total:
+            self.stdout.write(self.style.WARNING("Nenhum ciclo encontrado."))
+            return
+
+        self.stdout.write(f"Reconstruindo KPIs de {total} ciclo(s)...")
+
+        processados = 0
+        for inicio in range(0, total, lote):
+            ciclos_lote = ciclos[inicio : inicio + lote]
+            atualizar_resumos_ciclos(ciclos_lote)
+            processados += len(ciclos_lote)
+            self.stdout.write(f"  {processados}/{total} ciclos processados")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {processados} snapshot(s) de KPIs reconstruído(s).")
+        )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from avaliacao_docente.models import AvaliacaoDocente, SubmissaoAvaliacao
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói os registros de submissão (SubmissaoAvaliacao) "
+        "a partir das respostas registradas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ciclo-id", type=int, help="Reconstrói apenas as avaliações deste ciclo"
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=500,
+            help="Quantidade de avaliações processadas por lote (padrão: 500)",
+        )
+
+    def handle(self, *args, **options):
+        ciclo_id = options.get("ciclo_id")
+        lote = max(options.get("lote") or 500, 1)
+
+        avaliacoes = AvaliacaoDocente.all_objects.all()
+        if ciclo_id:
+            avaliacoes = avaliacoes.filter(ciclo_id=ciclo_id)
+
+        avaliacao_ids = list(avaliacoes.order_by("id").values_list("id", flat=True))
+        total = len(avaliacao_ids)
+
+        if not total:
+            self.stdout.write(self.style.WARNING("Nenhuma avaliação encontrada."))
+            return
+
+        self.stdout.write(f"Reconstruindo submissões de {total} avaliação(ões)...")
+
+        total_criadas = 0
+        total_removidas = 0
+        processadas = 0
+        for inicio in range(0, total, lote):
+            ids_lote = avaliacao_ids[inicio : inicio + lote]
+            criadas, removidas = SubmissaoAvaliacao.reconstruir(ids_lote)
+            total_criadas += criadas
+            total_removidas += removidas
+            processadas += len(ids_lote)
+            self.stdout.write(f"  {processadas}/{total} avaliações processadas")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {total_criadas} submissão(ões) criada(s) e "
+                f"{total_removidas} removida(s)."
+            )
+        )
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.6 on 2025-11-20 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avaliacao_docente", "0017_adicionar_indices_performance_relatorios"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumoAvaliacao",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Data e hora de criação do registro",
+                        verbose_name="Data de Criação",
+                    ),
+                ),
+                (
+                    "data_atualizacao",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Data e hora da última atualização",
+                        verbose_name="Data de Atualização",
+                    ),
+                ),
+                (
+                    "contagens_por_pergunta",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Mapa pergunta_id -> {opção: quantidade} do questionário padrão",
+                        verbose_name="Contagens por Pergunta",
+                    ),
+                ),
+                (
+                    "total_respondentes",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Alunos (ou sessões anônimas) distintos que responderam",
+                        verbose_name="Total de Respondentes",
+                    ),
+                ),
+                (
+                    "total_respostas",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Quantidade de linhas de resposta ativas",
+                        verbose_name="Total de Respostas",
+                    ),
+                ),
+                (
+                    "media_geral",
+                    models.FloatField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Média Geral (questionário padrão)",
+                    ),
+                ),
+                (
+                    "classificacao",
+                    models.CharField(
+                        default="Sem dados", max_length=20, verbose_name="Classificação"
+                    ),
+                ),
+                (
+                    "avaliacao",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumo",
+                        to="avaliacao_docente.avaliacaodocente",
+                        verbose_name="Avaliação",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumo de Avaliação",
+                "verbose_name_plural": "Resumos de Avaliação",
+            },
+        ),
+    ]
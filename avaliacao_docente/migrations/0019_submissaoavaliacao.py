@@ -0,0 +1,127 @@
+# Generated by Django 5.2.6 on 2025-11-20 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def preencher_submissoes(apps, schema_editor):
+    """Cria as submissões a partir das respostas ativas já existentes."""
+    RespostaAvaliacao = apps.get_model("avaliacao_docente", "RespostaAvaliacao")
+    SubmissaoAvaliacao = apps.get_model("avaliacao_docente", "SubmissaoAvaliacao")
+
+    respostas = RespostaAvaliacao.objects.filter(ativo=True)
+    submissoes = [
+        SubmissaoAvaliacao(avaliacao_id=avaliacao_id, aluno_id=aluno_id)
+        for avaliacao_id, aluno_id in respostas.filter(aluno__isnull=False)
+        .values_list("avaliacao_id", "aluno_id")
+        .distinct()
+        .order_by()
+    ] + [
+        SubmissaoAvaliacao(avaliacao_id=avaliacao_id, session_key=session_key)
+        for avaliacao_id, session_key in respostas.filter(aluno__isnull=True)
+        .exclude(session_key="")
+        .values_list("avaliacao_id", "session_key")
+        .distinct()
+        .order_by()
+    ]
+    SubmissaoAvaliacao.objects.bulk_create(
+        submissoes, batch_size=1000, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avaliacao_docente", "0018_resumoavaliacao"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissaoAvaliacao",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Data e hora de criação do registro",
+                        verbose_name="Data de Criação",
+                    ),
+                ),
+                (
+                    "data_atualizacao",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Data e hora da última atualização",
+                        verbose_name="Data de Atualização",
+                    ),
+                ),
+                (
+                    "session_key",
+                    models.CharField(
+                        blank=True,
+                        help_text="Identifica o respondente anônimo quando não há aluno",
+                        max_length=40,
+                        verbose_name="Sessão",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Submissão de Avaliação",
+                "verbose_name_plural": "Submissões de Avaliação",
+            },
+        ),
+        migrations.AddField(
+            model_name="submissaoavaliacao",
+            name="aluno",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="submissoes",
+                to="avaliacao_docente.perfilaluno",
+                verbose_name="Aluno",
+            ),
+        ),
+        migrations.AddField(
+            model_name="submissaoavaliacao",
+            name="avaliacao",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="submissoes",
+                to="avaliacao_docente.avaliacaodocente",
+                verbose_name="Avaliação",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submissaoavaliacao",
+            index=models.Index(
+                fields=["aluno", "avaliacao"], name="idx_submissao_aluno"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="submissaoavaliacao",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("aluno__isnull", False)),
+                fields=("avaliacao", "aluno"),
+                name="uniq_submissao_avaliacao_aluno",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="submissaoavaliacao",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("aluno__isnull", True)),
+                fields=("avaliacao", "session_key"),
+                name="uniq_submissao_avaliacao_sessao",
+            ),
+        ),
+        migrations.RunPython(preencher_submissoes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.6 on 2025-11-20 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avaliacao_docente", "0019_submissaoavaliacao"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumoCiclo",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Data e hora de criação do registro",
+                        verbose_name="Data de Criação",
+                    ),
+                ),
+                (
+                    "data_atualizacao",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Data e hora da última atualização",
+                        verbose_name="Data de Atualização",
+                    ),
+                ),
+                ("total_turmas", models.PositiveIntegerField(default=0)),
+                ("total_alunos_aptos", models.PositiveIntegerField(default=0)),
+                ("total_respondentes", models.PositiveIntegerField(default=0)),
+                (
+                    "taxa_media_resposta",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=5,
+                        verbose_name="Taxa Média de Resposta (%)",
+                    ),
+                ),
+                ("jobs_total", models.PositiveIntegerField(default=0)),
+                ("jobs_pendentes", models.PositiveIntegerField(default=0)),
+                ("jobs_em_execucao", models.PositiveIntegerField(default=0)),
+                ("jobs_completos", models.PositiveIntegerField(default=0)),
+                ("jobs_pausados", models.PositiveIntegerField(default=0)),
+                ("jobs_com_erro", models.PositiveIntegerField(default=0)),
+                ("ultimo_envio_em", models.DateTimeField(blank=True, null=True)),
+                ("proximo_envio_em", models.DateTimeField(blank=True, null=True)),
+                (
+                    "limiar_configurado",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=5,
+                        verbose_name="Limiar (%)",
+                    ),
+                ),
+                (
+                    "status_saude",
+                    models.CharField(
+                        choices=[("ok", "OK"), ("alerta", "Alerta"), ("erro", "Erro")],
+                        default="ok",
+                        max_length=10,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumo de KPIs do Ciclo",
+                "verbose_name_plural": "Resumos de KPIs dos Ciclos",
+            },
+        ),
+        migrations.AddField(
+            model_name="resumociclo",
+            name="ciclo",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="resumo_kpis",
+                to="avaliacao_docente.cicloavaliacao",
+                verbose_name="Ciclo de Avaliação",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resumociclo",
+            index=models.Index(
+                fields=["taxa_media_resposta"], name="idx_resumo_ciclo_taxa"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resumociclo",
+            index=models.Index(fields=["status_saude"], name="idx_resumo_ciclo_saude"),
+        ),
+    ]
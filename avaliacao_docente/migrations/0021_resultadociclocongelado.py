@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2025-11-20 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avaliacao_docente", "0020_resumociclo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResultadoCicloCongelado",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Data e hora de criação do registro",
+                        verbose_name="Data de Criação",
+                    ),
+                ),
+                (
+                    "data_atualizacao",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Data e hora da última atualização",
+                        verbose_name="Data de Atualização",
+                    ),
+                ),
+                (
+                    "avaliacoes",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Mapa avaliacao_id -> totais, média, classificação e lista ordenada de perguntas ({id, enunciado, contagens})",
+                        verbose_name="Resultados por Avaliação",
+                    ),
+                ),
+                (
+                    "professores",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Mapa professor_id -> métricas do professor no ciclo",
+                        verbose_name="Métricas por Professor",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resultado Congelado de Ciclo",
+                "verbose_name_plural": "Resultados Congelados de Ciclos",
+            },
+        ),
+        migrations.AddField(
+            model_name="resultadociclocongelado",
+            name="ciclo",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="resultado_congelado",
+                to="avaliacao_docente.cicloavaliacao",
+                verbose_name="Ciclo de Avaliação",
+            ),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.6 on 2025-11-20 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avaliacao_docente", "0021_resultadociclocongelado"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EstatisticaCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_criacao",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Data e hora de criação do registro",
+                        verbose_name="Data de Criação",
+                    ),
+                ),
+                (
+                    "data_atualizacao",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Data e hora da última atualização",
+                        verbose_name="Data de Atualização",
+                    ),
+                ),
+                (
+                    "prefixo",
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name="Prefixo"
+                    ),
+                ),
+                (
+                    "hits",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Acertos"),
+                ),
+                (
+                    "misses",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Faltas"),
+                ),
+                (
+                    "recalculos",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Recálculos"
+                    ),
+                ),
+                (
+                    "tempo_recalculo_total",
+                    models.FloatField(
+                        default=0, verbose_name="Tempo Total de Recálculo (s)"
+                    ),
+                ),
+                (
+                    "tempo_recalculo_max",
+                    models.FloatField(
+                        default=0, verbose_name="Maior Tempo de Recálculo (s)"
+                    ),
+                ),
+                (
+                    "bytes_total",
+                    models.PositiveBigIntegerField(
+                        default=0,
+                        help_text="Soma do tamanho (serializado) dos valores recalculados",
+                        verbose_name="Bytes Gravados",
+                    ),
+                ),
+                (
+                    "bytes_max",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Maior Valor (bytes)"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Estatística de Cache",
+                "verbose_name_plural": "Estatísticas de Cache",
+                "ordering": ["prefixo"],
+            },
+        ),
+    ]
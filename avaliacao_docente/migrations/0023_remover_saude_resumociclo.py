@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2025-11-20 10:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avaliacao_docente", "0022_estatisticacache"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="resumociclo",
+            name="idx_resumo_ciclo_saude",
+        ),
+        migrations.RemoveField(
+            model_name="resumociclo",
+            name="limiar_configurado",
+        ),
+        migrations.RemoveField(
+            model_name="resumociclo",
+            name="status_saude",
+        ),
+    ]
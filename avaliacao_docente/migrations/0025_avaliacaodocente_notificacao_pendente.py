@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2025-11-20 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("avaliacao_docente", "0024_resumociclo_desatualizado"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="avaliacaodocente",
+            name="notificacao_pendente",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -6,6 +6,10 @@ Estrutura:
     - mixins.py: Mixins reutilizáveis (Timestamp, SoftDelete, etc)
     - managers.py: Custom managers (SoftDeleteManager, etc)
     - models_originais.py: Models concretos do sistema
+    - resumos.py: Resumos persistidos dos resultados de avaliação, KPIs de ciclo
+      e resultados congelados de ciclos encerrados
+    - submissoes.py: Registro de envio (um por respondente) das avaliações
+    - estatisticas_cache.py: Acertos, faltas e recálculos do cache por prefixo
 
 Importações conveniência:
     from avaliacao_docente.models import BaseModel, TimestampMixin, Turma
@@ -22,6 +26,7 @@ from .mixins import (
 from .managers import (
     SoftDeleteManager,
     ActiveManager,
+    ConfiguracaoSiteQuerySet,
 )
 
 # Models concretos (existentes)
@@ -45,6 +50,9 @@ from .models_originais import (
 )
 
 from .lembretes import JobLembreteCicloTurma, NotificacaoLembrete, LembreteAvaliacao
+from .resumos import ResumoAvaliacao, ResumoCiclo, ResultadoCicloCongelado
+from .submissoes import SubmissaoAvaliacao
+from .estatisticas_cache import EstatisticaCache
 
 __all__ = [
     # Base classes
@@ -55,6 +63,7 @@ __all__ = [
     "OrderingMixin",
     "SoftDeleteManager",
     "ActiveManager",
+    "ConfiguracaoSiteQuerySet",
     # Models originais
     "ConfiguracaoSite",
     "CicloAvaliacao",
@@ -76,4 +85,12 @@ __all__ = [
     "JobLembreteCicloTurma",
     "NotificacaoLembrete",
     "LembreteAvaliacao",
+    # Resumos
+    "ResumoAvaliacao",
+    "ResumoCiclo",
+    "ResultadoCicloCongelado",
+    # Submissões
+    "SubmissaoAvaliacao",
+    # Observabilidade do cache
+    "EstatisticaCache",
 ]
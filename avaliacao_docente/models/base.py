@@ -1,9 +1,22 @@
 """
 Classe base abstrata para todos os models do sistema.
 Implementa comportamento padrão e métodos utilitários.
+
+Escrita em lote: criar_em_lote() e atualizar_em_lote() validam o lote
+inteiro de uma vez e gravam com bulk_create/bulk_update. No lugar do
+post_save de cada linha, disparam o signal `lote_salvo` uma vez por lote.
 """
 
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q, UniqueConstraint
+from django.dispatch import Signal
+from django.utils import timezone
+
+# Disparado por criar_em_lote/atualizar_em_lote (um envio por lote).
+# Argumentos: sender (classe do model), objetos (lista gravada),
+# criados (True na criação) e campos (campos atualizados ou None).
+lote_salvo = Signal()
 
 
 class BaseModel(models.Model):
@@ -15,6 +28,7 @@ class BaseModel(models.Model):
     - clean: Validação customizada (pode ser sobrescrita)
     - delete: Suporte a soft delete (se modelo tiver campo 'ativo')
     - save: Validação automática via full_clean()
+    - criar_em_lote / atualizar_em_lote: Escrita validada em lote
 
     Todos os models concretos devem herdar desta classe para
     garantir comportamento consistente.
@@ -85,3 +99,205 @@ class BaseModel(models.Model):
             self.full_clean()
 
         super().save(*args, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Escrita em lote
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _conjuntos_unicos(cls):
+        """
+        Conjuntos de campos únicos do model: unique=True, unique_together e
+        UniqueConstraint sem condição (as condicionais ficam com o banco).
+        """
+        meta = cls._meta
+        conjuntos = [
+            (campo.name,)
+            for campo in meta.concrete_fields
+            if campo.unique and not campo.primary_key
+        ]
+        conjuntos.extend(tuple(conjunto) for conjunto in meta.unique_together)
+        conjuntos.extend(
+            tuple(restricao.fields)
+            for restricao in meta.constraints
+            if isinstance(restricao, UniqueConstraint)
+            and restricao.fields
+            and restricao.condition is None
+        )
+        return list(dict.fromkeys(conjuntos))
+
+    @classmethod
+    def validar_lote(cls, objetos, campos=None, unicidade=True):
+        """
+        Valida um lote de instâncias antes de uma escrita em lote.
+
+        Cada objeto passa por clean_fields() e clean(), sem a consulta de
+        existência das chaves estrangeiras (garantida pelo banco). A
+        unicidade é verificada dentro do lote e contra o banco com uma
+        única consulta para o lote inteiro.
+
+        Args:
+            objetos: Lista de instâncias do model
+            campos: Valida apenas estes campos (atualização); None valida todos
+            unicidade: Verifica os conjuntos de campos únicos
+
+        Raises:
+            ValidationError: Com as mensagens de todas as linhas inválidas
+                (prefixadas pelo número da linha no lote)
+        """
+        meta = cls._meta
+        relacoes = [campo for campo in meta.concrete_fields if campo.is_relation]
+        excluir = {campo.name for campo in relacoes}
+        if campos is not None:
+            excluir |= {
+                campo.name
+                for campo in meta.concrete_fields
+                if campo.name not in campos and campo.attname not in campos
+            }
+
+        erros = {}
+        for indice, objeto in enumerate(objetos):
+            mensagens = [
+                f"{campo.verbose_name}: este campo não pode ser nulo."
+                for campo in relacoes
+                if (campos is None or campo.name in campos or campo.attname in campos)
+                and not campo.null
+                and getattr(objeto, campo.attname) is None
+            ]
+            try:
+                objeto.clean_fields(exclude=excluir)
+                objeto.clean()
+            except ValidationError as e:
+                mensagens.extend(e.messages)
+            if mensagens:
+                erros[indice] = mensagens
+
+        if unicidade:
+            cls._validar_unicidade_lote(objetos, campos, erros)
+
+        if erros:
+            raise ValidationError(
+                [
+                    f"Linha {indice + 1}: {mensagem}"
+                    for indice, mensagens in sorted(erros.items())
+                    for mensagem in mensagens
+                ]
+            )
+
+    @classmethod
+    def _validar_unicidade_lote(cls, objetos, campos, erros):
+        """Acumula em `erros` as violações de unicidade do lote."""
+        meta = cls._meta
+        conjuntos = [
+            [meta.get_field(nome).attname for nome in conjunto]
+            for conjunto in cls._conjuntos_unicos()
+            if campos is None
+            or any(
+                nome in campos or meta.get_field(nome).attname in campos
+                for nome in conjunto
+            )
+        ]
+
+        chaves_lote = {}
+        filtro = Q()
+        for atributos in conjuntos:
+            for indice, objeto in enumerate(objetos):
+                valores = tuple(getattr(objeto, atributo) for atributo in atributos)
+                if None in valores:
+                    continue  # Nulos não conflitam no banco
+                chave = (tuple(atributos), valores)
+                if chave in chaves_lote:
+                    erros.setdefault(indice, []).append(
+                        f"duplicada no lote ({', '.join(atributos)})."
+                    )
+                    continue
+                chaves_lote[chave] = indice
+                filtro |= Q(**dict(zip(atributos, valores)))
+
+        if not chaves_lote:
+            return
+
+        consultados = {atributo for atributos in conjuntos for atributo in atributos}
+        for linha in cls._base_manager.filter(filtro).values("pk", *consultados):
+            for atributos in conjuntos:
+                valores = tuple(linha[atributo] for atributo in atributos)
+                indice = chaves_lote.get((tuple(atributos), valores))
+                if indice is not None and objetos[indice].pk != linha["pk"]:
+                    erros.setdefault(indice, []).append(
+                        f"já existe {meta.verbose_name} com estes valores "
+                        f"({', '.join(atributos)})."
+                    )
+
+    @classmethod
+    def criar_em_lote(
+        cls, objetos, validar=True, batch_size=None, ignore_conflicts=False
+    ):
+        """
+        Cria as instâncias com bulk_create, sem full_clean() por linha.
+
+        Use em caminhos internos que montam muitas linhas (signals,
+        comandos, matrículas em massa). Os signals post_save não são
+        disparados: `lote_salvo` é enviado uma vez para o lote.
+
+        Args:
+            objetos: Instâncias não salvas do model
+            validar: Valida o lote antes (validar_lote); False apenas para
+                linhas já validadas pelo chamador
+            batch_size: Tamanho dos INSERTs (padrão do banco)
+            ignore_conflicts: Ignora linhas que violam unicidade no banco
+                (a unicidade não é validada antes)
+
+        Returns:
+            list das instâncias criadas (sem pk com ignore_conflicts)
+        """
+        objetos = list(objetos)
+        if not objetos:
+            return []
+
+        if validar:
+            cls.validar_lote(objetos, unicidade=not ignore_conflicts)
+
+        with transaction.atomic():
+            criados = cls._default_manager.bulk_create(
+                objetos, batch_size=batch_size, ignore_conflicts=ignore_conflicts
+            )
+            lote_salvo.send(sender=cls, objetos=criados, criados=True, campos=None)
+        return criados
+
+    @classmethod
+    def atualizar_em_lote(cls, objetos, campos, validar=True, batch_size=None):
+        """
+        Atualiza os campos informados com bulk_update, sem full_clean() por
+        linha. Campos auto_now (ex.: data_atualizacao) são preenchidos aqui.
+
+        Args:
+            objetos: Instâncias já salvas do model
+            campos: Nomes dos campos a atualizar
+            validar: Valida os campos alterados (validar_lote)
+            batch_size: Tamanho dos UPDATEs (padrão do banco)
+
+        Returns:
+            int: Quantidade de linhas atualizadas
+        """
+        objetos = list(objetos)
+        if not objetos:
+            return 0
+
+        campos = list(campos)
+        agora = timezone.now()
+        for campo in cls._meta.concrete_fields:
+            if getattr(campo, "auto_now", False):
+                for objeto in objetos:
+                    setattr(objeto, campo.attname, agora)
+                if campo.name not in campos:
+                    campos.append(campo.name)
+
+        if validar:
+            cls.validar_lote(objetos, campos=campos)
+
+        with transaction.atomic():
+            total = cls._base_manager.bulk_update(
+                objetos, campos, batch_size=batch_size
+            )
+            lote_salvo.send(sender=cls, objetos=objetos, criados=False, campos=campos)
+        return total
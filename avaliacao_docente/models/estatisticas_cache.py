@@ -0,0 +1,190 @@
+"""
+Estatísticas de uso do cache por prefixo de chave.
+
+Os consumidores do cache (métricas de professor, histórico por ciclo,
+questionário compilado, ...) registram acertos, faltas, duração dos
+recálculos e tamanho dos valores gravados. Os contadores são acumulados
+em memória no processo e gravados no banco (uma linha por prefixo) ao fim
+das requisições, no máximo a cada INTERVALO_GRAVACAO segundos (ver
+signals.py), somando com incrementos atômicos os números de todos os
+processos. Comandos gravam os seus ao terminar.
+
+Consulta: admin (somente leitura) e comando `estatisticas_cache`.
+"""
+
+import threading
+import time
+
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .base import BaseModel
+from .mixins import TimestampMixin
+
+# Contadores ainda não gravados no banco: {prefixo: {campo: valor}}
+_pendentes = {}
+_lock_pendentes = threading.Lock()
+_ultima_gravacao = [time.monotonic()]
+
+
+def _contadores_vazios():
+    return {
+        "hits": 0,
+        "misses": 0,
+        "recalculos": 0,
+        "tempo_recalculo_total": 0.0,
+        "tempo_recalculo_max": 0.0,
+        "bytes_total": 0,
+        "bytes_max": 0,
+    }
+
+
+class EstatisticaCache(BaseModel, TimestampMixin):
+    """
+    Contadores acumulados de um prefixo de chave do cache.
+    """
+
+    # Intervalo (s) entre gravações dos contadores acumulados no processo
+    INTERVALO_GRAVACAO = 60
+
+    prefixo = models.CharField(max_length=100, unique=True, verbose_name="Prefixo")
+
+    hits = models.PositiveBigIntegerField(default=0, verbose_name="Acertos")
+    misses = models.PositiveBigIntegerField(default=0, verbose_name="Faltas")
+    recalculos = models.PositiveBigIntegerField(default=0, verbose_name="Recálculos")
+    tempo_recalculo_total = models.FloatField(
+        default=0, verbose_name="Tempo Total de Recálculo (s)"
+    )
+    tempo_recalculo_max = models.FloatField(
+        default=0, verbose_name="Maior Tempo de Recálculo (s)"
+    )
+    bytes_total = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Bytes Gravados",
+        help_text="Soma do tamanho (serializado) dos valores recalculados",
+    )
+    bytes_max = models.PositiveBigIntegerField(
+        default=0, verbose_name="Maior Valor (bytes)"
+    )
+
+    class Meta:
+        verbose_name = "Estatística de Cache"
+        verbose_name_plural = "Estatísticas de Cache"
+        ordering = ["prefixo"]
+
+    def __str__(self):
+        return f"Cache {self.prefixo}"
+
+    # ------------------------------------------------------------------
+    # Indicadores
+    # ------------------------------------------------------------------
+
+    @property
+    def taxa_acerto(self):
+        """Percentual de leituras atendidas pelo cache (None sem leituras)."""
+        leituras = self.hits + self.misses
+        if not leituras:
+            return None
+        return round(self.hits / leituras * 100, 2)
+
+    @property
+    def tempo_recalculo_medio(self):
+        if not self.recalculos:
+            return None
+        return self.tempo_recalculo_total / self.recalculos
+
+    @property
+    def bytes_medio(self):
+        if not self.recalculos:
+            return None
+        return self.bytes_total // self.recalculos
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def registrar(cls, prefixo, hits=0, misses=0, duracao=None, tamanho=None):
+        """
+        Acumula no processo os eventos de um prefixo.
+
+        Args:
+            prefixo: Prefixo da chave (ex.: "metricas_prof")
+            hits: Leituras atendidas pelo cache
+            misses: Leituras sem valor válido no cache
+            duracao: Duração (s) de um recálculo, se houve
+            tamanho: Tamanho (bytes) do valor recalculado, se houve
+        """
+        with _lock_pendentes:
+            contadores = _pendentes.setdefault(prefixo, _contadores_vazios())
+            contadores["hits"] += hits
+            contadores["misses"] += misses
+            if duracao is not None:
+                contadores["recalculos"] += 1
+                contadores["tempo_recalculo_total"] += duracao
+                contadores["tempo_recalculo_max"] = max(
+                    contadores["tempo_recalculo_max"], duracao
+                )
+            if tamanho is not None:
+                contadores["bytes_total"] += tamanho
+                contadores["bytes_max"] = max(contadores["bytes_max"], tamanho)
+
+    @classmethod
+    def gravar_se_necessario(cls):
+        """Grava os contadores pendentes se o intervalo de gravação passou."""
+        if time.monotonic() - _ultima_gravacao[0] >= cls.INTERVALO_GRAVACAO:
+            cls.gravar_pendentes()
+
+    @classmethod
+    def gravar_pendentes(cls):
+        """
+        Soma os contadores acumulados no processo às linhas do banco.
+
+        Falhas são apenas registradas: a instrumentação nunca interrompe
+        a requisição que está usando o cache.
+        """
+        with _lock_pendentes:
+            pendentes = dict(_pendentes)
+            _pendentes.clear()
+            _ultima_gravacao[0] = time.monotonic()
+
+        if not pendentes:
+            return
+
+        try:
+            with transaction.atomic():
+                # Cria as linhas que faltam (prefixos novos) sem disputar com
+                # outros processos; os contadores são somados no UPDATE
+                cls.objects.bulk_create(
+                    [cls(prefixo=prefixo) for prefixo in pendentes],
+                    ignore_conflicts=True,
+                )
+                for prefixo, contadores in pendentes.items():
+                    cls.objects.filter(prefixo=prefixo).update(
+                        hits=F("hits") + contadores["hits"],
+                        misses=F("misses") + contadores["misses"],
+                        recalculos=F("recalculos") + contadores["recalculos"],
+                        tempo_recalculo_total=F("tempo_recalculo_total")
+                        + contadores["tempo_recalculo_total"],
+                        tempo_recalculo_max=Greatest(
+                            "tempo_recalculo_max",
+                            models.Value(contadores["tempo_recalculo_max"]),
+                        ),
+                        bytes_total=F("bytes_total") + contadores["bytes_total"],
+                        bytes_max=Greatest(
+                            "bytes_max", models.Value(contadores["bytes_max"])
+                        ),
+                        data_atualizacao=timezone.now(),
+                    )
+        except Exception as e:
+            print(f"❌ Erro ao gravar estatísticas de cache: {e}")
+
+    @classmethod
+    def zerar(cls):
+        """Descarta os contadores (do processo e do banco)."""
+        with _lock_pendentes:
+            _pendentes.clear()
+            _ultima_gravacao[0] = time.monotonic()
+        cls.objects.all().delete()
@@ -116,3 +116,18 @@ class ActiveManager(models.Manager):
     def get_queryset(self):
         """Retorna apenas registros ativos."""
         return super().get_queryset().filter(ativo=True)
+
+
+class ConfiguracaoSiteQuerySet(models.QuerySet):
+    """
+    QuerySet da ConfiguracaoSite.
+
+    update() em massa não dispara post_save: a nova versão da configuração
+    cacheada é publicada aqui (ver ConfiguracaoSite.publicar_config).
+    """
+
+    def update(self, **kwargs):
+        atualizadas = super().update(**kwargs)
+        if atualizadas:
+            self.model.publicar_config()
+        return atualizadas
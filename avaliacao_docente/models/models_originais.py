@@ -1,33 +1,43 @@
+import copy
+import threading
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxLengthValidator
 
 # Imports das abstrações
 from .base import BaseModel
 from .mixins import TimestampMixin, SoftDeleteMixin
-from .managers import SoftDeleteManager
+from .managers import ConfiguracaoSiteQuerySet, SoftDeleteManager
+
+
+def ids_usuarios_admin():
+    """
+    Subquery com os IDs dos usuários que has_role(user, "admin") considera admin.
+
+    Mesmo critério do django-role-permissions: membros do grupo "admin" e,
+    com ROLEPERMISSIONS_SUPERUSER_SUPERPOWERS ativo (padrão), superusuários.
+    Avaliada pelo banco dentro da query principal, sem carregar usuários.
+    """
+    from django.conf import settings
+
+    filtro = models.Q(groups__name="admin")
+    if getattr(settings, "ROLEPERMISSIONS_SUPERUSER_SUPERPOWERS", True):
+        filtro |= models.Q(is_superuser=True)
+
+    return User.objects.filter(filtro).values("id")
 
 
 class PerfilProfessorManager(models.Manager):
     """Manager customizado para excluir usuários admin e inativos"""
 
     def get_queryset(self):
-        from rolepermissions.checkers import has_role
-
-        # Obter IDs de admins de forma lazy
-        try:
-            admin_ids = [
-                user.id for user in User.objects.all() if has_role(user, "admin")
-            ]
-        except Exception:
-            # Se houver erro (tabelas não existem), retorna queryset vazio de exclusão
-            admin_ids = []
-
         return (
             super()
             .get_queryset()
-            .exclude(user__id__in=admin_ids)
+            .exclude(user__id__in=ids_usuarios_admin())
             .filter(user__is_active=True)
         )
 
@@ -40,21 +50,10 @@ class PerfilAlunoManager(models.Manager):
     """Manager customizado para excluir usuários admin e inativos"""
 
     def get_queryset(self):
-        from rolepermissions.checkers import has_role
-
-        # Obter IDs de admins de forma lazy
-        try:
-            admin_ids = [
-                user.id for user in User.objects.all() if has_role(user, "admin")
-            ]
-        except Exception:
-            # Se houver erro (tabelas não existem), retorna queryset vazio de exclusão
-            admin_ids = []
-
         return (
             super()
             .get_queryset()
-            .exclude(user__id__in=admin_ids)
+            .exclude(user__id__in=ids_usuarios_admin())
             .filter(user__is_active=True)
         )
 
@@ -248,17 +247,57 @@ class Turma(BaseModel, TimestampMixin, SoftDeleteMixin):
     def __str__(self):
         return f"{self.codigo_turma} - {self.disciplina.disciplina_nome}"
 
+    def matriculas_aptas(self):
+        """
+        Matrículas ativas de alunos que podem avaliar (exclui admins).
+
+        A exclusão é feita pelo banco (subquery), sem consultar os papéis
+        aluno por aluno.
+        """
+        return self.matriculas.filter(status="ativa").exclude(
+            aluno__user_id__in=ids_usuarios_admin()
+        )
+
     def count_alunos_matriculados(self):
         """
         Conta apenas alunos matriculados (exclui admins)
         """
-        from rolepermissions.checkers import has_role
+        return self.matriculas_aptas().count()
 
-        count = 0
-        for matricula in self.matriculas.filter(status="ativa"):
-            if not has_role(matricula.aluno.user, "admin"):
-                count += 1
-        return count
+    @classmethod
+    def contar_alunos_aptos_por_turma(cls, turma_ids):
+        """
+        Conta, em uma única query, os alunos aptos de várias turmas.
+
+        Returns:
+            dict turma_id -> quantidade de alunos aptos (turmas sem alunos
+            aptos não aparecem no dict)
+        """
+        return dict(
+            MatriculaTurma.objects.filter(turma_id__in=list(turma_ids), status="ativa")
+            .exclude(aluno__user_id__in=ids_usuarios_admin())
+            .values("turma_id")
+            .annotate(total=models.Count("id"))
+            .values_list("turma_id", "total")
+            .order_by()
+        )
+
+    @classmethod
+    def contar_matriculas_ativas_por_turma(cls, turma_ids):
+        """
+        Conta, em uma única query, as matrículas ativas de várias turmas
+        (sem excluir administradores, como nos relatórios de avaliações).
+
+        Returns:
+            dict turma_id -> quantidade de matrículas ativas
+        """
+        return dict(
+            MatriculaTurma.objects.filter(turma_id__in=list(turma_ids), status="ativa")
+            .values("turma_id")
+            .annotate(total=models.Count("id"))
+            .values_list("turma_id", "total")
+            .order_by()
+        )
 
 
 class MatriculaTurma(BaseModel, TimestampMixin, SoftDeleteMixin):
@@ -562,14 +601,13 @@ class CicloAvaliacao(BaseModel, TimestampMixin, SoftDeleteMixin):
 
     def total_avaliacoes_previstas(self):
         """Calcula quantas avaliações deveriam ser feitas"""
-        total = 0
-        for avaliacao in self.avaliacoes.all():
-            total += avaliacao.turma.count_alunos_matriculados()
-        return total
+        turma_ids = list(self.avaliacoes.values_list("turma_id", flat=True))
+        alunos_por_turma = Turma.contar_alunos_aptos_por_turma(set(turma_ids))
+        return sum(alunos_por_turma.get(turma_id, 0) for turma_id in turma_ids)
 
     def total_avaliacoes_respondidas(self):
         """Conta quantas avaliações foram efetivamente respondidas"""
-        return self.avaliacoes.filter(respostas__isnull=False).distinct().count()
+        return self.avaliacoes.filter(submissoes__isnull=False).distinct().count()
 
     def percentual_participacao(self):
         """Calcula o percentual de participação na avaliação"""
@@ -607,6 +645,10 @@ class AvaliacaoDocente(BaseModel, TimestampMixin, SoftDeleteMixin):
 
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default="pendente")
 
+    # Alunos ainda não avisados da nova avaliação (o e-mail é enviado pelo
+    # comando enviar_lembretes_ciclos)
+    notificacao_pendente = models.BooleanField(default=False)
+
     # Managers
     objects = SoftDeleteManager()
     all_objects = models.Manager()
@@ -622,21 +664,22 @@ class AvaliacaoDocente(BaseModel, TimestampMixin, SoftDeleteMixin):
 
     def total_respostas(self):
         """Conta o total de alunos que responderam esta avaliação"""
-        return self.respostas.values("aluno").distinct().count()
+        return self.submissoes.count()
 
     def alunos_aptos(self):
         """Retorna alunos matriculados na turma que podem avaliar"""
-        from rolepermissions.checkers import has_role
+        return [
+            matricula.aluno
+            for matricula in self.turma.matriculas_aptas().select_related("aluno__user")
+        ]
 
-        alunos_matriculados = []
-        for matricula in self.turma.matriculas.filter(status="ativa"):
-            if not has_role(matricula.aluno.user, "admin"):
-                alunos_matriculados.append(matricula.aluno)
-        return alunos_matriculados
+    def total_alunos_aptos(self):
+        """Conta os alunos aptos sem carregá-los (uma única query)"""
+        return self.turma.count_alunos_matriculados()
 
     def percentual_participacao(self):
         """Calcula percentual de participação nesta avaliação específica"""
-        total_alunos = len(self.alunos_aptos())
+        total_alunos = self.total_alunos_aptos()
         if total_alunos == 0:
             return 0
 
@@ -734,6 +777,20 @@ class AvaliacaoDocente(BaseModel, TimestampMixin, SoftDeleteMixin):
             None se não houver respostas
         """
         contagens = self.get_contagem_opcoes_por_pergunta(pergunta)
+        return self._resumir_contagens_opcoes(contagens)
+
+    @classmethod
+    def _resumir_contagens_opcoes(cls, contagens):
+        """
+        Aplica a fórmula da planilha sobre um dicionário de contagens por opção.
+
+        Compartilhado entre o cálculo por pergunta e o cálculo agregado em SQL,
+        garantindo que ambos produzam exatamente o mesmo resultado.
+
+        Retorna:
+            dict com 'media', 'total_respondentes', 'contagens' e 'moda'
+            None se não houver respostas
+        """
         total_respondentes = sum(contagens.values())
 
         if total_respondentes == 0:
@@ -741,7 +798,7 @@ class AvaliacaoDocente(BaseModel, TimestampMixin, SoftDeleteMixin):
 
         # Aplicar fórmula: soma ponderada / total
         soma_ponderada = sum(
-            contagens[opcao] * peso for opcao, peso in self.OPCOES_PESOS.items()
+            contagens[opcao] * peso for opcao, peso in cls.OPCOES_PESOS.items()
         )
 
         media = soma_ponderada / total_respondentes
@@ -756,30 +813,74 @@ class AvaliacaoDocente(BaseModel, TimestampMixin, SoftDeleteMixin):
             "moda": moda,
         }
 
-    def calcular_media_geral_questionario_padrao(self):
+    @classmethod
+    def contar_opcoes_por_avaliacao(cls, avaliacao_ids):
         """
-        Calcula a média geral de todas as perguntas do tipo múltipla escolha.
+        Conta as opções do questionário padrão respondidas em várias avaliações.
+
+        Executa um único GROUP BY sobre (avaliação, pergunta, opção); as opções
+        são normalizadas com strip() e apenas as de OPCOES_PESOS são contadas.
+
+        Args:
+            avaliacao_ids: Iterável com IDs de AvaliacaoDocente
 
         Retorna:
-            dict com 'media_geral', 'total_perguntas', 'detalhes_por_pergunta'
-            None se não houver perguntas ou respostas
+            dict avaliacao_id -> {pergunta_id: {'enunciado', 'contagens'}},
+            com perguntas na ordem de exibição (categoria, id)
         """
-        perguntas = self.respostas.values_list("pergunta", flat=True).distinct()
-        perguntas_obj = PerguntaAvaliacao.objects.filter(
-            id__in=perguntas, tipo="multipla_escolha"
+        from django.db.models import Count
+
+        avaliacao_ids = list(avaliacao_ids)
+        if not avaliacao_ids:
+            return {}
+
+        linhas = (
+            RespostaAvaliacao.objects.filter(
+                avaliacao_id__in=avaliacao_ids,
+                pergunta__tipo="multipla_escolha",
+                pergunta__ativo=True,
+            )
+            .values("avaliacao_id", "pergunta_id", "pergunta__enunciado", "valor_texto")
+            .annotate(total=Count("id"))
+            .order_by("avaliacao_id", "pergunta__categoria__ordem", "pergunta_id")
         )
 
-        if not perguntas_obj.exists():
-            return None
+        contagens_por_avaliacao = {}
+        for linha in linhas:
+            perguntas = contagens_por_avaliacao.setdefault(linha["avaliacao_id"], {})
+            pergunta = perguntas.setdefault(
+                linha["pergunta_id"],
+                {
+                    "enunciado": linha["pergunta__enunciado"],
+                    "contagens": {opcao: 0 for opcao in cls.OPCOES_PESOS.keys()},
+                },
+            )
+            opcao = (linha["valor_texto"] or "").strip()
+            if opcao in pergunta["contagens"]:
+                pergunta["contagens"][opcao] += linha["total"]
+
+        return contagens_por_avaliacao
+
+    @classmethod
+    def resumir_perguntas(cls, perguntas):
+        """
+        Consolida as contagens por pergunta na média geral do questionário padrão.
+
+        Args:
+            perguntas: dict pergunta_id -> {'enunciado', 'contagens'}
 
+        Retorna:
+            dict com 'media_geral', 'total_perguntas', 'detalhes_por_pergunta'
+            None se nenhuma pergunta tiver respostas válidas
+        """
         medias_perguntas = []
         detalhes = {}
 
-        for pergunta in perguntas_obj:
-            resultado = self.calcular_media_pergunta(pergunta)
+        for pergunta_id, dados in perguntas.items():
+            resultado = cls._resumir_contagens_opcoes(dados["contagens"])
             if resultado:
                 medias_perguntas.append(resultado["media"])
-                detalhes[pergunta.id] = {"enunciado": pergunta.enunciado, **resultado}
+                detalhes[pergunta_id] = {"enunciado": dados["enunciado"], **resultado}
 
         if not medias_perguntas:
             return None
@@ -792,6 +893,41 @@ class AvaliacaoDocente(BaseModel, TimestampMixin, SoftDeleteMixin):
             "detalhes_por_pergunta": detalhes,
         }
 
+    @classmethod
+    def calcular_medias_questionario_padrao(cls, avaliacao_ids):
+        """
+        Calcula a média geral do questionário padrão para várias avaliações.
+
+        Usa uma única query agregada (ver contar_opcoes_por_avaliacao) em vez de
+        carregar as respostas e contá-las em Python pergunta a pergunta.
+
+        Args:
+            avaliacao_ids: Iterável com IDs de AvaliacaoDocente
+
+        Retorna:
+            dict mapeando avaliacao_id -> resultado no mesmo formato de
+            calcular_media_geral_questionario_padrao (ou None sem dados)
+        """
+        avaliacao_ids = list(avaliacao_ids)
+        contagens = cls.contar_opcoes_por_avaliacao(avaliacao_ids)
+
+        return {
+            avaliacao_id: cls.resumir_perguntas(contagens.get(avaliacao_id, {}))
+            for avaliacao_id in avaliacao_ids
+        }
+
+    def calcular_media_geral_questionario_padrao(self):
+        """
+        Calcula a média geral de todas as perguntas do tipo múltipla escolha.
+
+        Usa uma única query agregada (ver calcular_medias_questionario_padrao).
+
+        Retorna:
+            dict com 'media_geral', 'total_perguntas', 'detalhes_por_pergunta'
+            None se não houver perguntas ou respostas
+        """
+        return self.calcular_medias_questionario_padrao([self.pk]).get(self.pk)
+
     def get_classificacao_media(self, media):
         """
         Retorna classificação textual baseada na média.
@@ -897,6 +1033,11 @@ class RespostaAvaliacao(BaseModel, TimestampMixin, SoftDeleteMixin):
             return self.valor_texto or "Sem resposta"
 
 
+# Cópia da ConfiguracaoSite em memória do processo (ver obter_config)
+_configuracao_local = {}
+_lock_configuracao_local = threading.Lock()
+
+
 class ConfiguracaoSite(models.Model):
     """Modelo para armazenar configurações globais do site. Singleton."""
 
@@ -935,6 +1076,9 @@ class ConfiguracaoSite(models.Model):
         help_text="Número máximo de lembretes que um aluno pode receber por ciclo (padrão: 3)",
     )
 
+    # update() em massa também publica uma nova versão da configuração
+    objects = ConfiguracaoSiteQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         """Garante que apenas uma instância deste modelo exista."""
         if not self.pk and ConfiguracaoSite.objects.exists():
@@ -946,6 +1090,71 @@ class ConfiguracaoSite(models.Model):
 
     @classmethod
     def obter_config(cls):
-        """Obtém a instância de configuração única, criando-a se não existir."""
-        obj, created = cls.objects.get_or_create(pk=1)
-        return obj
+        """
+        Obtém a instância de configuração única, criando-a se não existir.
+
+        Toda leitura confere a versão da configuração (ESCOPO_CONFIGURACAO)
+        e usa a cópia em memória do processo apenas se ela for dessa versão;
+        caso contrário a instância é relida (cache ou banco). O contador é
+        servido pela camada local do cache, então alterações de outros
+        processos são vistas em até LOCAL_VERSION_TIMEOUT segundos. Retorna
+        sempre uma cópia, que pode ser alterada e salva.
+        """
+        from ..cache_versionado import (
+            ESCOPO_CONFIGURACAO,
+            get_cache_key,
+            obter_versao,
+        )
+
+        versao = obter_versao(ESCOPO_CONFIGURACAO)
+        with _lock_configuracao_local:
+            copia = dict(_configuracao_local)
+        if copia and copia["versao"] == versao:
+            return copy.deepcopy(copia["config"])
+
+        chave = get_cache_key("configuracao_site", f"v{versao}")
+        config = cache.get(chave)
+        if config is None:
+            config, created = cls.objects.get_or_create(pk=1)
+            cache.set(chave, config)
+
+        with _lock_configuracao_local:
+            _configuracao_local.update(config=copy.deepcopy(config), versao=versao)
+        return copy.deepcopy(config)
+
+    @classmethod
+    def publicar_config(cls, config=None):
+        """
+        Publica uma nova versão da configuração (chamado ao salvar, excluir
+        ou atualizar via queryset).
+
+        A cópia local é descartada na hora e a versão é trocada após o
+        commit: uma transação desfeita não deixa no cache uma configuração
+        que nunca foi gravada.
+
+        Args:
+            config: Instância salva, ou None quando a configuração foi
+                excluída ou alterada por queryset.update()
+        """
+        from django.db import transaction
+
+        from ..cache_versionado import (
+            ESCOPO_CONFIGURACAO,
+            get_cache_key,
+            incrementar_versao,
+        )
+
+        cls.descartar_copia_local()
+
+        def publicar():
+            versao = incrementar_versao(ESCOPO_CONFIGURACAO)
+            if config is not None:
+                cache.set(get_cache_key("configuracao_site", f"v{versao}"), config)
+
+        transaction.on_commit(publicar)
+
+    @staticmethod
+    def descartar_copia_local():
+        """Descarta a cópia em memória (a próxima leitura confere a versão)."""
+        with _lock_configuracao_local:
+            _configuracao_local.clear()
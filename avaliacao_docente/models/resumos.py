@@ -0,0 +1,654 @@
+"""
+Resumos persistidos dos resultados de cada avaliação e dos KPIs de ciclo.
+
+Os relatórios leem estes resumos em vez de reprocessar todas as linhas de
+RespostaAvaliacao a cada acesso. Cada resumo de avaliação é mantido
+incrementalmente pelos signals de RespostaAvaliacao e pode ser reconstruído
+a qualquer momento com o comando `reconstruir_resumos_avaliacao`.
+
+Os KPIs de ciclo (ResumoCiclo) alimentam o dashboard de gestão. As
+submissões de respostas apenas marcam o snapshot como desatualizado; ele é
+recalculado pelo envio de lembretes, pelo próprio dashboard e pelo comando
+`reconstruir_resumos_ciclos`.
+
+Ao encerrar um ciclo (ou após sua data de fim), os resultados são
+congelados em ResultadoCicloCongelado: os relatórios de ciclos fechados
+passam a ler esse registro imutável em vez dos resumos vivos.
+"""
+
+from django.db import models, transaction
+from django.db.models import Count
+
+from .base import BaseModel
+from .mixins import TimestampMixin
+
+
+class ResumoAvaliacao(BaseModel, TimestampMixin):
+    """
+    Resumo dos resultados de uma AvaliacaoDocente (uma linha por avaliação).
+
+    Armazena as contagens de opções do questionário padrão por pergunta,
+    os totais de respondentes/respostas e a média ponderada já classificada.
+    """
+
+    avaliacao = models.OneToOneField(
+        "AvaliacaoDocente",
+        on_delete=models.CASCADE,
+        related_name="resumo",
+        verbose_name="Avaliação",
+    )
+
+    contagens_por_pergunta = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Contagens por Pergunta",
+        help_text="Mapa pergunta_id -> {opção: quantidade} do questionário padrão",
+    )
+
+    total_respondentes = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Total de Respondentes",
+        help_text="Alunos (ou sessões anônimas) distintos que responderam",
+    )
+
+    total_respostas = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Total de Respostas",
+        help_text="Quantidade de linhas de resposta ativas",
+    )
+
+    media_geral = models.FloatField(
+        null=True, blank=True, verbose_name="Média Geral (questionário padrão)"
+    )
+
+    classificacao = models.CharField(
+        max_length=20, default="Sem dados", verbose_name="Classificação"
+    )
+
+    class Meta:
+        verbose_name = "Resumo de Avaliação"
+        verbose_name_plural = "Resumos de Avaliação"
+
+    def __str__(self):
+        return f"Resumo da avaliação {self.avaliacao_id}"
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def resultado_pergunta(self, pergunta_id):
+        """
+        Retorna o resultado de uma pergunta no formato de
+        AvaliacaoDocente.calcular_media_pergunta (ou None sem respostas).
+        """
+        from .models_originais import AvaliacaoDocente
+
+        contagens = self.contagens_por_pergunta.get(str(pergunta_id))
+        if not contagens:
+            return None
+        return AvaliacaoDocente._resumir_contagens_opcoes(
+            self.ordenar_contagens(contagens)
+        )
+
+    @staticmethod
+    def ordenar_contagens(contagens):
+        """
+        Devolve as contagens na ordem de OPCOES_PESOS.
+
+        JSONB não preserva a ordem das chaves, e a moda usa a primeira
+        opção em caso de empate.
+        """
+        from .models_originais import AvaliacaoDocente
+
+        return {
+            opcao: contagens.get(opcao, 0)
+            for opcao in AvaliacaoDocente.OPCOES_PESOS.keys()
+        }
+
+    def atualizar_media(self):
+        """Recalcula media_geral e classificacao a partir das contagens."""
+        from .models_originais import AvaliacaoDocente
+
+        resultado = AvaliacaoDocente.resumir_perguntas(
+            {
+                pergunta_id: {
+                    "enunciado": "",
+                    "contagens": self.ordenar_contagens(contagens),
+                }
+                for pergunta_id, contagens in self.contagens_por_pergunta.items()
+            }
+        )
+        self.media_geral = resultado["media_geral"] if resultado else None
+        self.classificacao = AvaliacaoDocente.get_classificacao_media(
+            None, self.media_geral
+        )
+
+    @classmethod
+    def obter_mapa(cls, avaliacao_ids):
+        """
+        Retorna dict avaliacao_id -> ResumoAvaliacao.
+
+        Resumos ainda inexistentes (avaliações anteriores à tabela ou sem
+        reconstrução) são calculados em lote e persistidos na hora.
+        """
+        avaliacao_ids = list(avaliacao_ids)
+        resumos = {
+            resumo.avaliacao_id: resumo
+            for resumo in cls.objects.filter(avaliacao_id__in=avaliacao_ids)
+        }
+
+        faltantes = [
+            avaliacao_id
+            for avaliacao_id in avaliacao_ids
+            if avaliacao_id not in resumos
+        ]
+        if faltantes:
+            resumos.update(cls.recalcular(faltantes))
+
+        return resumos
+
+    @classmethod
+    def criar_faltantes(cls, avaliacoes):
+        """
+        Garante que todas as avaliações do queryset possuam resumo.
+
+        Útil antes de agregar diretamente sobre a tabela de resumos
+        (JOIN/GROUP BY), onde resumos ausentes seriam ignorados.
+        """
+        faltantes = list(
+            avaliacoes.filter(resumo__isnull=True).values_list("id", flat=True)
+        )
+        if faltantes:
+            cls.recalcular(faltantes)
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def descartar_por_pergunta(cls, pergunta_id):
+        """
+        Remove os resumos das avaliações que possuem respostas à pergunta.
+
+        Usado quando a pergunta muda (tipo, ativo) ou entra/sai de um
+        questionário: as contagens guardadas deixam de valer e a próxima
+        leitura (obter_mapa / criar_faltantes) recalcula esses resumos.
+
+        Retorna:
+            int: Quantidade de resumos removidos
+        """
+        from .models_originais import RespostaAvaliacao
+
+        removidos, _ = cls.objects.filter(
+            avaliacao_id__in=RespostaAvaliacao.all_objects.filter(
+                pergunta_id=pergunta_id
+            ).values("avaliacao_id")
+        ).delete()
+        return removidos
+
+    @classmethod
+    def recalcular(cls, avaliacao_ids):
+        """
+        Recalcula do zero os resumos das avaliações informadas.
+
+        Usa um número fixo de queries agregadas, independente da quantidade
+        de avaliações ou respostas.
+
+        Retorna:
+            dict avaliacao_id -> ResumoAvaliacao atualizado
+        """
+        from .models_originais import AvaliacaoDocente, RespostaAvaliacao
+
+        avaliacao_ids = list(
+            AvaliacaoDocente.all_objects.filter(id__in=list(avaliacao_ids)).values_list(
+                "id", flat=True
+            )
+        )
+        if not avaliacao_ids:
+            return {}
+
+        respostas = RespostaAvaliacao.objects.filter(avaliacao_id__in=avaliacao_ids)
+
+        total_respostas = dict(
+            respostas.values("avaliacao_id")
+            .annotate(total=Count("id"))
+            .values_list("avaliacao_id", "total")
+            .order_by()
+        )
+        respondentes_alunos = dict(
+            respostas.filter(aluno__isnull=False)
+            .values("avaliacao_id")
+            .annotate(total=Count("aluno_id", distinct=True))
+            .values_list("avaliacao_id", "total")
+            .order_by()
+        )
+        respondentes_anonimos = dict(
+            respostas.filter(aluno__isnull=True)
+            .exclude(session_key="")
+            .values("avaliacao_id")
+            .annotate(total=Count("session_key", distinct=True))
+            .values_list("avaliacao_id", "total")
+            .order_by()
+        )
+        contagens = AvaliacaoDocente.contar_opcoes_por_avaliacao(avaliacao_ids)
+
+        existentes = {
+            resumo.avaliacao_id: resumo
+            for resumo in cls.objects.filter(avaliacao_id__in=avaliacao_ids)
+        }
+        novos = []
+        atualizados = []
+
+        for avaliacao_id in avaliacao_ids:
+            resumo = existentes.get(avaliacao_id) or cls(avaliacao_id=avaliacao_id)
+            resumo.contagens_por_pergunta = {
+                str(pergunta_id): dados["contagens"]
+                for pergunta_id, dados in contagens.get(avaliacao_id, {}).items()
+            }
+            resumo.total_respostas = total_respostas.get(avaliacao_id, 0)
+            resumo.total_respondentes = respondentes_alunos.get(
+                avaliacao_id, 0
+            ) + respondentes_anonimos.get(avaliacao_id, 0)
+            resumo.atualizar_media()
+
+            if resumo.pk:
+                atualizados.append(resumo)
+            else:
+                novos.append(resumo)
+
+        with transaction.atomic():
+            if novos:
+                cls.objects.bulk_create(novos, ignore_conflicts=True)
+            if atualizados:
+                cls.objects.bulk_update(
+                    atualizados,
+                    [
+                        "contagens_por_pergunta",
+                        "total_respostas",
+                        "total_respondentes",
+                        "media_geral",
+                        "classificacao",
+                    ],
+                )
+
+        if novos:
+            # bulk_create com ignore_conflicts não devolve PKs: recarregar
+            existentes.update(
+                {
+                    resumo.avaliacao_id: resumo
+                    for resumo in cls.objects.filter(
+                        avaliacao_id__in=[resumo.avaliacao_id for resumo in novos]
+                    )
+                }
+            )
+        for resumo in atualizados:
+            existentes[resumo.avaliacao_id] = resumo
+
+        return existentes
+
+    @classmethod
+    def _possui_outras_respostas(cls, resposta):
+        """Verifica se o respondente da resposta possui outras respostas ativas."""
+        from .models_originais import RespostaAvaliacao
+
+        outras = RespostaAvaliacao.objects.filter(
+            avaliacao_id=resposta.avaliacao_id
+        ).exclude(pk=resposta.pk)
+
+        if resposta.aluno_id:
+            return outras.filter(aluno_id=resposta.aluno_id).exists()
+        if resposta.session_key:
+            return outras.filter(
+                aluno__isnull=True, session_key=resposta.session_key
+            ).exists()
+        return True  # Sem identificação: não conta como respondente
+
+    @classmethod
+    def _aplicar_delta(cls, resposta, delta):
+        """
+        Aplica +1/-1 de uma resposta ao resumo da sua avaliação.
+
+        Retorna False se o resumo ainda não existir (nada é alterado).
+        """
+        from .models_originais import AvaliacaoDocente
+
+        with transaction.atomic():
+            resumo = (
+                cls.objects.select_for_update()
+                .filter(avaliacao_id=resposta.avaliacao_id)
+                .first()
+            )
+            if resumo is None:
+                return False
+
+            resumo.total_respostas = max(resumo.total_respostas + delta, 0)
+            if not cls._possui_outras_respostas(resposta):
+                resumo.total_respondentes = max(resumo.total_respondentes + delta, 0)
+
+            pergunta = resposta.pergunta
+            opcao = (resposta.valor_texto or "").strip()
+            if (
+                pergunta.tipo == "multipla_escolha"
+                and pergunta.ativo
+                and opcao in AvaliacaoDocente.OPCOES_PESOS
+            ):
+                contagens = resumo.contagens_por_pergunta.setdefault(
+                    str(pergunta.id),
+                    {opcao: 0 for opcao in AvaliacaoDocente.OPCOES_PESOS.keys()},
+                )
+                contagens[opcao] = max(contagens.get(opcao, 0) + delta, 0)
+                if not any(contagens.values()):
+                    del resumo.contagens_por_pergunta[str(pergunta.id)]
+                resumo.atualizar_media()
+
+            resumo.save(skip_validation=True)
+            return True
+
+    @classmethod
+    def registrar_resposta(cls, resposta, created):
+        """
+        Atualiza o resumo após salvar uma resposta.
+
+        Criações ativas são aplicadas de forma incremental; edições (inclusive
+        soft delete) recalculam o resumo da avaliação inteira.
+        """
+        if created and resposta.ativo:
+            if cls._aplicar_delta(resposta, +1):
+                return
+        cls.recalcular([resposta.avaliacao_id])
+
+    @classmethod
+    def registrar_envio(cls, avaliacao_id, respostas):
+        """
+        Soma ao resumo as respostas de um envio completo, gravadas em lote
+        (bulk_create não dispara os signals de RespostaAvaliacao).
+
+        As respostas pertencem a um único respondente novo. Se o resumo
+        ainda não existir, a avaliação é recalculada.
+        """
+        from .models_originais import AvaliacaoDocente, PerguntaAvaliacao
+
+        perguntas_multipla_escolha = set(
+            PerguntaAvaliacao.objects.filter(
+                id__in=[resposta.pergunta_id for resposta in respostas],
+                tipo="multipla_escolha",
+                ativo=True,
+            ).values_list("id", flat=True)
+        )
+
+        with transaction.atomic():
+            resumo = (
+                cls.objects.select_for_update()
+                .filter(avaliacao_id=avaliacao_id)
+                .first()
+            )
+            if resumo is None:
+                cls.recalcular([avaliacao_id])
+                return
+
+            resumo.total_respostas += len(respostas)
+            resumo.total_respondentes += 1
+            for resposta in respostas:
+                opcao = (resposta.valor_texto or "").strip()
+                if (
+                    resposta.pergunta_id in perguntas_multipla_escolha
+                    and opcao in AvaliacaoDocente.OPCOES_PESOS
+                ):
+                    contagens = resumo.contagens_por_pergunta.setdefault(
+                        str(resposta.pergunta_id),
+                        {opcao: 0 for opcao in AvaliacaoDocente.OPCOES_PESOS.keys()},
+                    )
+                    contagens[opcao] = contagens.get(opcao, 0) + 1
+            resumo.atualizar_media()
+
+            resumo.save(skip_validation=True)
+
+    @classmethod
+    def remover_resposta(cls, resposta):
+        """
+        Atualiza o resumo após a exclusão física de uma resposta.
+
+        Não cria resumos: se ele não existir (ou a avaliação estiver sendo
+        excluída em cascata) a próxima leitura o reconstrói.
+        """
+        if resposta.ativo:
+            cls._aplicar_delta(resposta, -1)
+
+
+class ResumoCiclo(BaseModel, TimestampMixin):
+    """
+    Snapshot dos KPIs de um CicloAvaliacao (uma linha por ciclo).
+
+    Guarda as contagens e taxas de services.calcular_kpis_ciclo para que o
+    dashboard de gestão filtre, ordene e pagine os ciclos no banco. O limiar
+    e o status de saúde dependem da configuração e do relógio, por isso são
+    calculados na leitura (como_kpis / classificar_saude).
+    """
+
+    ciclo = models.OneToOneField(
+        "CicloAvaliacao",
+        on_delete=models.CASCADE,
+        related_name="resumo_kpis",
+        verbose_name="Ciclo de Avaliação",
+    )
+
+    total_turmas = models.PositiveIntegerField(default=0)
+    total_alunos_aptos = models.PositiveIntegerField(default=0)
+    total_respondentes = models.PositiveIntegerField(default=0)
+    taxa_media_resposta = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=0,
+        verbose_name="Taxa Média de Resposta (%)",
+    )
+
+    jobs_total = models.PositiveIntegerField(default=0)
+    jobs_pendentes = models.PositiveIntegerField(default=0)
+    jobs_em_execucao = models.PositiveIntegerField(default=0)
+    jobs_completos = models.PositiveIntegerField(default=0)
+    jobs_pausados = models.PositiveIntegerField(default=0)
+    jobs_com_erro = models.PositiveIntegerField(default=0)
+    ultimo_envio_em = models.DateTimeField(null=True, blank=True)
+    proximo_envio_em = models.DateTimeField(null=True, blank=True)
+
+    # Marcado pelas submissões de respostas; limpo no recálculo
+    desatualizado = models.BooleanField(default=False, verbose_name="Desatualizado")
+
+    CAMPOS_KPIS = [
+        "total_turmas",
+        "total_alunos_aptos",
+        "total_respondentes",
+        "taxa_media_resposta",
+        "jobs_total",
+        "jobs_pendentes",
+        "jobs_em_execucao",
+        "jobs_completos",
+        "jobs_pausados",
+        "jobs_com_erro",
+        "ultimo_envio_em",
+        "proximo_envio_em",
+    ]
+
+    class Meta:
+        verbose_name = "Resumo de KPIs do Ciclo"
+        verbose_name_plural = "Resumos de KPIs dos Ciclos"
+        indexes = [
+            models.Index(fields=["taxa_media_resposta"], name="idx_resumo_ciclo_taxa"),
+        ]
+
+    def __str__(self):
+        return f"KPIs do ciclo {self.ciclo_id}"
+
+    @staticmethod
+    def classificar_saude(ciclo, taxa_media, jobs_com_erro, limiar, agora):
+        """
+        Status de saúde do ciclo: 'erro' se algum job falhou, 'alerta' se o
+        ciclo ativo está abaixo do limiar a 7 dias ou menos do fim, senão 'ok'.
+        """
+        if jobs_com_erro > 0:
+            return "erro"
+        if taxa_media < limiar and ciclo.ativo:
+            if (ciclo.data_fim - agora).days <= 7:
+                return "alerta"
+        return "ok"
+
+    def como_kpis(self, limiar=None, agora=None):
+        """
+        Retorna os KPIs no formato de services.calcular_kpis_ciclo.
+
+        O limiar (ConfiguracaoSite, se não informado) e o status de saúde são
+        avaliados no momento da leitura.
+        """
+        from django.utils import timezone
+        from .models_originais import ConfiguracaoSite
+
+        if limiar is None:
+            limiar = ConfiguracaoSite.obter_config().limiar_minimo_percentual
+        kpis = {campo: getattr(self, campo) for campo in self.CAMPOS_KPIS}
+        kpis["limiar_configurado"] = limiar
+        kpis["status_saude"] = self.classificar_saude(
+            self.ciclo,
+            self.taxa_media_resposta,
+            self.jobs_com_erro,
+            limiar,
+            agora or timezone.now(),
+        )
+        return kpis
+
+    def aplicar_kpis(self, kpis):
+        """Copia um dict de KPIs (calcular_kpis_ciclo) para os campos."""
+        from decimal import Decimal
+
+        for campo in self.CAMPOS_KPIS:
+            valor = kpis[campo]
+            if campo == "taxa_media_resposta":
+                valor = Decimal(valor).quantize(Decimal("0.01"))
+            setattr(self, campo, valor)
+
+
+class ResultadoCicloCongelado(BaseModel, TimestampMixin):
+    """
+    Resultados imutáveis de um CicloAvaliacao fechado (uma linha por ciclo).
+
+    Guarda, no momento do encerramento, os agregados por avaliação (totais,
+    média, contagens por pergunta com enunciado, respostas agrupadas por
+    valor e comentários) e as métricas por professor. É descartado quando o
+    ciclo é reativado.
+    """
+
+    ciclo = models.OneToOneField(
+        "CicloAvaliacao",
+        on_delete=models.CASCADE,
+        related_name="resultado_congelado",
+        verbose_name="Ciclo de Avaliação",
+    )
+
+    avaliacoes = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Resultados por Avaliação",
+        help_text=(
+            "Mapa avaliacao_id -> totais, média, classificação e lista "
+            "ordenada de perguntas ({id, enunciado, contagens})"
+        ),
+    )
+
+    professores = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Métricas por Professor",
+        help_text="Mapa professor_id -> métricas do professor no ciclo",
+    )
+
+    class Meta:
+        verbose_name = "Resultado Congelado de Ciclo"
+        verbose_name_plural = "Resultados Congelados de Ciclos"
+
+    def __str__(self):
+        return f"Resultados congelados do ciclo {self.ciclo_id}"
+
+    def possui_avaliacao(self, avaliacao_id):
+        """Indica se a avaliação fazia parte do ciclo no congelamento."""
+        return str(avaliacao_id) in self.avaliacoes
+
+    def resumo_avaliacao(self, avaliacao_id):
+        """
+        Retorna um ResumoAvaliacao (não salvo) com os dados congelados.
+
+        O objeto também expõe total_alunos_aptos e total_matriculas_ativas
+        do momento do encerramento.
+        """
+        dados = self.avaliacoes[str(avaliacao_id)]
+        resumo = ResumoAvaliacao(
+            avaliacao_id=int(avaliacao_id),
+            contagens_por_pergunta={
+                str(pergunta["id"]): pergunta["contagens"]
+                for pergunta in dados["perguntas"]
+            },
+            total_respondentes=dados["total_respondentes"],
+            total_respostas=dados["total_respostas"],
+            media_geral=dados["media_geral"],
+            classificacao=dados["classificacao"],
+        )
+        resumo.total_alunos_aptos = dados["total_alunos_aptos"]
+        resumo.total_matriculas_ativas = dados["total_matriculas_ativas"]
+        return resumo
+
+    def resultado_questionario(self, avaliacao_id):
+        """
+        Retorna o resultado congelado no formato de
+        AvaliacaoDocente.calcular_media_geral_questionario_padrao.
+        """
+        from .models_originais import AvaliacaoDocente
+
+        perguntas = self.avaliacoes[str(avaliacao_id)]["perguntas"]
+        return AvaliacaoDocente.resumir_perguntas(
+            {
+                pergunta["id"]: {
+                    "enunciado": pergunta["enunciado"],
+                    "contagens": ResumoAvaliacao.ordenar_contagens(
+                        pergunta["contagens"]
+                    ),
+                }
+                for pergunta in perguntas
+            }
+        )
+
+    def respostas_avaliacao(self, avaliacao_id):
+        """
+        Respostas congeladas da avaliação agrupadas por pergunta e valor
+        (formato de services.contar_respostas_por_valor, sem avaliacao_id).
+
+        Retorna None se a avaliação não fazia parte do ciclo ou se o
+        congelamento é anterior ao registro dessas linhas.
+        """
+        dados = self.avaliacoes.get(str(avaliacao_id))
+        if dados is None or "respostas" not in dados:
+            return None
+        return dados["respostas"]
+
+    def comentarios_avaliacao(self, avaliacao_id):
+        """
+        Comentários congelados da avaliação como RespostaAvaliacao (não
+        salvas) com valor_texto e data_resposta, ou None como em
+        respostas_avaliacao.
+        """
+        from django.utils.dateparse import parse_datetime
+        from .models_originais import RespostaAvaliacao
+
+        dados = self.avaliacoes.get(str(avaliacao_id))
+        if dados is None or "comentarios" not in dados:
+            return None
+        return [
+            RespostaAvaliacao(
+                avaliacao_id=int(avaliacao_id),
+                valor_texto=comentario["valor_texto"],
+                data_resposta=parse_datetime(comentario["data_resposta"]),
+            )
+            for comentario in dados["comentarios"]
+        ]
+
+    def metricas_professor(self, professor_id):
+        """Métricas congeladas do professor (None se não avaliado no ciclo)."""
+        metricas = self.professores.get(str(professor_id))
+        return dict(metricas) if metricas is not None else None
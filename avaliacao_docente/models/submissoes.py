@@ -0,0 +1,218 @@
+"""
+Registro de envio (submissão) das avaliações.
+
+Cada linha representa um respondente de uma avaliação: um aluno ou, para
+respostas anônimas sem aluno, uma sessão. Contagens de respondentes e
+verificações de "este aluno já respondeu?" consultam esta tabela em vez
+de aplicar DISTINCT sobre todas as linhas de RespostaAvaliacao.
+
+A tabela é gravada por `responder_avaliacao`, mantida pelos signals de
+RespostaAvaliacao e pode ser reconstruída com o comando
+`reconstruir_submissoes_avaliacao`.
+"""
+
+from django.db import models, transaction
+from django.db.models import Count, Q
+
+from .base import BaseModel
+from .mixins import TimestampMixin
+
+
+class SubmissaoAvaliacao(BaseModel, TimestampMixin):
+    """
+    Cabeçalho de envio: uma linha por (avaliação, aluno) ou
+    (avaliação, sessão anônima).
+    """
+
+    avaliacao = models.ForeignKey(
+        "AvaliacaoDocente",
+        on_delete=models.CASCADE,
+        related_name="submissoes",
+        verbose_name="Avaliação",
+    )
+
+    aluno = models.ForeignKey(
+        "PerfilAluno",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="submissoes",
+        verbose_name="Aluno",
+    )
+
+    session_key = models.CharField(
+        max_length=40,
+        blank=True,
+        verbose_name="Sessão",
+        help_text="Identifica o respondente anônimo quando não há aluno",
+    )
+
+    class Meta:
+        verbose_name = "Submissão de Avaliação"
+        verbose_name_plural = "Submissões de Avaliação"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["avaliacao", "aluno"],
+                condition=Q(aluno__isnull=False),
+                name="uniq_submissao_avaliacao_aluno",
+            ),
+            models.UniqueConstraint(
+                fields=["avaliacao", "session_key"],
+                condition=Q(aluno__isnull=True),
+                name="uniq_submissao_avaliacao_sessao",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["aluno", "avaliacao"], name="idx_submissao_aluno"),
+        ]
+
+    def __str__(self):
+        respondente = self.aluno_id or f"sessão {self.session_key[:8]}"
+        return f"Submissão da avaliação {self.avaliacao_id} ({respondente})"
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def aluno_respondeu(cls, avaliacao, aluno):
+        """Verifica se o aluno já enviou respostas para a avaliação."""
+        return cls.objects.filter(avaliacao=avaliacao, aluno=aluno).exists()
+
+    @classmethod
+    def contar_por_avaliacao(cls, avaliacao_ids):
+        """
+        Conta os respondentes de várias avaliações em uma única query.
+
+        Retorna:
+            dict avaliacao_id -> total de respondentes (alunos + sessões)
+        """
+        return dict(
+            cls.objects.filter(avaliacao_id__in=list(avaliacao_ids))
+            .values("avaliacao_id")
+            .annotate(total=Count("id"))
+            .values_list("avaliacao_id", "total")
+            .order_by()
+        )
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def registrar(cls, avaliacao, aluno=None, session_key=""):
+        """
+        Registra o envio de um respondente (idempotente).
+
+        Respostas sem aluno e sem sessão não identificam respondente e
+        não geram submissão.
+        """
+        if aluno is None and not session_key:
+            return
+
+        cls.objects.bulk_create(
+            [
+                cls(
+                    avaliacao_id=getattr(avaliacao, "pk", avaliacao),
+                    aluno_id=getattr(aluno, "pk", aluno),
+                    session_key="" if aluno is not None else session_key,
+                )
+            ],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def _filtro_respondente(cls, resposta):
+        """Filtro que identifica o respondente de uma resposta."""
+        if resposta.aluno_id:
+            return Q(aluno_id=resposta.aluno_id)
+        return Q(aluno__isnull=True, session_key=resposta.session_key)
+
+    @classmethod
+    def registrar_resposta(cls, resposta):
+        """
+        Mantém a submissão coerente após salvar uma resposta.
+
+        Respostas ativas garantem a submissão; uma resposta desativada
+        (soft delete) remove a submissão se o respondente ficou sem
+        respostas ativas.
+        """
+        if resposta.ativo:
+            cls.registrar(
+                resposta.avaliacao_id, resposta.aluno_id, resposta.session_key
+            )
+        else:
+            cls.remover_resposta(resposta)
+
+    @classmethod
+    def remover_resposta(cls, resposta):
+        """Remove a submissão se o respondente não possuir outras respostas ativas."""
+        from .models_originais import RespostaAvaliacao
+
+        if not resposta.aluno_id and not resposta.session_key:
+            return
+
+        filtro = cls._filtro_respondente(resposta)
+        possui_outras = (
+            RespostaAvaliacao.objects.filter(avaliacao_id=resposta.avaliacao_id)
+            .filter(filtro)
+            .exclude(pk=resposta.pk)
+            .exists()
+        )
+        if not possui_outras:
+            cls.objects.filter(avaliacao_id=resposta.avaliacao_id).filter(
+                filtro
+            ).delete()
+
+    @classmethod
+    def reconstruir(cls, avaliacao_ids):
+        """
+        Reconstrói as submissões das avaliações a partir das respostas ativas.
+
+        Insere as submissões faltantes e remove as que não possuem mais
+        respostas, com um número fixo de queries por lote.
+
+        Retorna:
+            tuple (criadas, removidas)
+        """
+        from .models_originais import RespostaAvaliacao
+
+        avaliacao_ids = list(avaliacao_ids)
+        respostas = RespostaAvaliacao.objects.filter(avaliacao_id__in=avaliacao_ids)
+
+        esperadas = {
+            (avaliacao_id, aluno_id, "")
+            for avaliacao_id, aluno_id in respostas.filter(aluno__isnull=False)
+            .values_list("avaliacao_id", "aluno_id")
+            .distinct()
+            .order_by()
+        } | {
+            (avaliacao_id, None, session_key)
+            for avaliacao_id, session_key in respostas.filter(aluno__isnull=True)
+            .exclude(session_key="")
+            .values_list("avaliacao_id", "session_key")
+            .distinct()
+            .order_by()
+        }
+
+        existentes = {
+            (avaliacao_id, aluno_id, session_key): pk
+            for pk, avaliacao_id, aluno_id, session_key in cls.objects.filter(
+                avaliacao_id__in=avaliacao_ids
+            ).values_list("pk", "avaliacao_id", "aluno_id", "session_key")
+        }
+
+        novas = [
+            cls(avaliacao_id=avaliacao_id, aluno_id=aluno_id, session_key=session_key)
+            for avaliacao_id, aluno_id, session_key in esperadas
+            if (avaliacao_id, aluno_id, session_key) not in existentes
+        ]
+        obsoletas = [pk for chave, pk in existentes.items() if chave not in esperadas]
+
+        with transaction.atomic():
+            if novas:
+                cls.objects.bulk_create(novas, ignore_conflicts=True)
+            if obsoletas:
+                cls.objects.filter(pk__in=obsoletas).delete()
+
+        return len(novas), len(obsoletas)
@@ -0,0 +1,179 @@
+"""
+Questionário compilado.
+
+Estrutura imutável com as perguntas de um questionário já ordenadas, com
+tipo, opções e obrigatoriedade. É montada com uma única consulta e fica no
+cache por questionario_id, de modo que exibir ou processar o formulário de
+resposta (e os relatórios) não consulta pergunta por pergunta.
+
+Invalidação: a chave embute a versão global (incrementada pelos signals
+quando perguntas, vínculos ou categorias mudam) e a versão do próprio
+questionário (incrementada pelas edições em editar_questionario_perguntas).
+"""
+
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from .cache_versionado import (
+    ESCOPO_GLOBAL,
+    ESCOPO_QUESTIONARIO,
+    get_cache_key,
+    incrementar_versao,
+    obter_versoes,
+    registrar_estatistica_cache,
+)
+
+# O questionário muda raramente: as edições trocam a versão da chave
+TIMEOUT_QUESTIONARIO_COMPILADO = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class PerguntaCompilada:
+    """Pergunta de um questionário compilado (somente leitura)."""
+
+    id: int
+    ordem: int
+    enunciado: str
+    tipo: str
+    tipo_display: str
+    obrigatoria: bool
+    categoria_nome: str
+    opcoes: tuple
+
+    def get_tipo_display(self):
+        return self.tipo_display
+
+
+@dataclass(frozen=True)
+class QuestionarioCompilado:
+    """Perguntas de um questionário na ordem do questionário."""
+
+    questionario_id: int
+    perguntas: tuple
+
+    def __iter__(self):
+        return iter(self.perguntas)
+
+    def __len__(self):
+        return len(self.perguntas)
+
+    def pergunta(self, pergunta_id):
+        """Retorna a pergunta pelo id, ou None se não pertence ao questionário."""
+        for pergunta in self.perguntas:
+            if pergunta.id == pergunta_id:
+                return pergunta
+        return None
+
+
+def compilar_questionario(questionario_id):
+    """
+    Monta o questionário compilado a partir do banco (uma consulta).
+
+    Args:
+        questionario_id: ID do QuestionarioAvaliacao
+
+    Returns:
+        QuestionarioCompilado
+    """
+    from .models import QuestionarioPergunta
+
+    vinculos = (
+        QuestionarioPergunta.objects.filter(questionario_id=questionario_id)
+        .select_related("pergunta__categoria")
+        .order_by("ordem_no_questionario")
+    )
+
+    perguntas = []
+    for vinculo in vinculos:
+        pergunta = vinculo.pergunta
+        perguntas.append(
+            PerguntaCompilada(
+                id=pergunta.id,
+                ordem=vinculo.ordem_no_questionario,
+                enunciado=pergunta.enunciado,
+                tipo=pergunta.tipo,
+                tipo_display=pergunta.get_tipo_display(),
+                obrigatoria=pergunta.obrigatoria,
+                categoria_nome=pergunta.categoria.nome if pergunta.categoria else "",
+                opcoes=tuple(pergunta.opcoes_multipla_escolha or ()),
+            )
+        )
+
+    return QuestionarioCompilado(
+        questionario_id=questionario_id, perguntas=tuple(perguntas)
+    )
+
+
+def _chaves_cache_questionarios(questionario_ids):
+    """Chaves versionadas (global + questionário) de vários questionários."""
+    escopos = [(ESCOPO_GLOBAL, "")] + [
+        (ESCOPO_QUESTIONARIO, questionario_id) for questionario_id in questionario_ids
+    ]
+    versao_global, *versoes = obter_versoes(escopos)
+    return {
+        questionario_id: get_cache_key(
+            "questionario_compilado", questionario_id, f"v{versao_global}.{versao}"
+        )
+        for questionario_id, versao in zip(questionario_ids, versoes)
+    }
+
+
+def obter_questionarios_compilados(questionario_ids):
+    """
+    Retorna os questionários compilados de vários questionários, com uma
+    leitura de versões e uma leitura de cache (relatórios com muitas
+    avaliações).
+
+    Args:
+        questionario_ids: IDs de QuestionarioAvaliacao
+
+    Returns:
+        dict {questionario_id: QuestionarioCompilado}
+    """
+    questionario_ids = sorted(set(questionario_ids) - {None})
+    if not questionario_ids:
+        return {}
+
+    chaves = _chaves_cache_questionarios(questionario_ids)
+    cacheados = cache.get_many(chaves.values())
+
+    questionarios = {}
+    novos = {}
+    for questionario_id, chave in chaves.items():
+        questionario = cacheados.get(chave)
+        if questionario is None:
+            inicio = time.time()
+            questionario = compilar_questionario(questionario_id)
+            registrar_estatistica_cache(
+                "questionario_compilado",
+                misses=1,
+                duracao=time.time() - inicio,
+                valor=questionario,
+            )
+            novos[chave] = questionario
+        questionarios[questionario_id] = questionario
+
+    registrar_estatistica_cache("questionario_compilado", hits=len(cacheados))
+    if novos:
+        cache.set_many(novos, TIMEOUT_QUESTIONARIO_COMPILADO)
+    return questionarios
+
+
+def obter_questionario_compilado(questionario_id):
+    """
+    Retorna o questionário compilado (do cache, ou compilado e cacheado).
+
+    Args:
+        questionario_id: ID do QuestionarioAvaliacao
+
+    Returns:
+        QuestionarioCompilado
+    """
+    return obter_questionarios_compilados([questionario_id])[questionario_id]
+
+
+def invalidar_questionario_compilado(questionario_id):
+    """Descarta o questionário compilado após editar suas perguntas."""
+    return incrementar_versao(ESCOPO_QUESTIONARIO, questionario_id)
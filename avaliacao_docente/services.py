@@ -5,16 +5,29 @@ Este módulo centraliza lógicas de negócio reutilizáveis para relatórios
 e dashboards, mantendo as views limpas e focadas em apresentação.
 """
 
-from django.db.models import Q, Prefetch, Count, Min, Max
-from django.core.cache import cache
-import hashlib
-
+from django.db.models import Q, Count, Min, Max, Sum
+
+from .cache_versionado import (
+    ESCOPO_CADASTROS,
+    ESCOPO_CICLO,
+    ESCOPO_GLOBAL,
+    ESCOPO_PROFESSOR,
+    ESCOPO_RELATORIOS,
+    chave_versionada,
+    get_cache_key,
+    obter_ou_calcular,
+    obter_versoes,
+)
 from .models import (
     PerfilProfessor,
     AvaliacaoDocente,
     RespostaAvaliacao,
     Curso,
     JobLembreteCicloTurma,
+    Turma,
+    ResumoAvaliacao,
+    SubmissaoAvaliacao,
+    ResultadoCicloCongelado,
 )
 
 
@@ -23,29 +36,93 @@ from .models import (
 # ============================================================================
 
 
-def get_cache_key(prefix, *args):
+def chave_cache_metricas_professor(professor_id, ciclo_id=None):
+    """
+    Chave versionada das métricas de um professor (geral ou de um ciclo).
+
+    Depende das versões global, do professor e (se houver) do ciclo.
     """
-    Gera chave de cache única baseada nos argumentos.
+    return chave_versionada(
+        "metricas_prof",
+        professor_id,
+        ciclo_id or "all",
+        professor_id=professor_id,
+        ciclo_id=ciclo_id,
+    )
+
+
+def chave_cache_historico_professor(professor_id, ciclo_id):
+    """Chave versionada do histórico de um professor em um ciclo."""
+    return chave_versionada(
+        "historico_prof_ciclo",
+        professor_id,
+        ciclo_id,
+        professor_id=professor_id,
+        ciclo_id=ciclo_id,
+    )
+
+
+def _id_filtro(valor):
+    """Converte o id vindo de um filtro (query string) em int, ou None."""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def etag_relatorio(nome, parametros, usuario, professor_id=None, ciclo_id=None):
+    """
+    Impressão digital (ETag) dos dados de um relatório.
+
+    Combina o relatório, os filtros da query string e o usuário (com suas
+    roles) com os carimbos de versão dos dados exibidos: global e cadastros
+    sempre; professor e/ou ciclo quando o relatório está restrito a eles e,
+    sem restrição, o carimbo de qualquer alteração (relatorios). Enquanto
+    nada disso mudar, a ETag se repete e a view pode responder 304 sem
+    recalcular nem renderizar.
 
     Args:
-        prefix: Prefixo identificador do tipo de cache
-        *args: Argumentos variáveis para compor a chave
+        nome: Identificador do relatório
+        parametros: QueryDict da requisição (request.GET)
+        usuario: Usuário da requisição
+        professor_id: Professor a que o relatório está restrito (opcional)
+        ciclo_id: Ciclo a que o relatório está restrito (opcional)
 
     Returns:
-        str: Hash SHA256 da chave (evita chaves muito longas e é seguro)
+        str: ETag (sem aspas)
     """
-    key_parts = [str(arg) for arg in args if arg is not None]
-    key_string = f"{prefix}:{'_'.join(key_parts)}"
-    # Usar SHA256 ao invés de MD5 por questões de segurança
-    return hashlib.sha256(key_string.encode()).hexdigest()
+    from .utils import obter_roles_usuario
+
+    professor_id = _id_filtro(professor_id)
+    ciclo_id = _id_filtro(ciclo_id)
+
+    escopos = [(ESCOPO_GLOBAL, ""), (ESCOPO_CADASTROS, "")]
+    if professor_id is not None:
+        escopos.append((ESCOPO_PROFESSOR, professor_id))
+    if ciclo_id is not None:
+        escopos.append((ESCOPO_CICLO, ciclo_id))
+    if professor_id is None and ciclo_id is None:
+        escopos.append((ESCOPO_RELATORIOS, ""))
+
+    filtros = sorted((chave, tuple(valores)) for chave, valores in parametros.lists())
+    return get_cache_key(
+        f"etag_{nome}",
+        usuario.pk,
+        usuario.is_superuser,
+        sorted(obter_roles_usuario(usuario)),
+        filtros,
+        *obter_versoes(escopos),
+    )
 
 
 def calcular_metricas_professor_cached(professor, ciclo=None):
     """
     Versão com cache da função calcular_metricas_professor.
 
-    Cache de 15 minutos, invalidado automaticamente quando há novas respostas
-    através de signals (ver signals.py).
+    Cache de 15 minutos com chave versionada: os signals (ver signals.py)
+    incrementam as versões do professor/ciclo quando há novas respostas,
+    matrículas ou alterações de questionário. O recálculo é protegido contra
+    stampede (ver cache_versionado.obter_ou_calcular).
 
     Args:
         professor: Instância de PerfilProfessor
@@ -54,28 +131,27 @@ def calcular_metricas_professor_cached(professor, ciclo=None):
     Returns:
         dict: Métricas do professor (mesmo retorno de calcular_metricas_professor)
     """
-    # Gerar chave de cache
-    cache_key = get_cache_key(
-        "metricas_prof", professor.id, ciclo.id if ciclo else "all"
-    )
-
-    # Tentar buscar do cache
-    metricas = cache.get(cache_key)
+    ciclo_id = ciclo.id if ciclo else None
 
-    if metricas is None:
-        # Calcular métricas (função original)
-        metricas = calcular_metricas_professor(professor, ciclo)
+    # Gerar chave de cache (com as versões atuais do professor/ciclo)
+    cache_key = chave_cache_metricas_professor(professor.id, ciclo_id)
 
-        # Cachear por 15 minutos
-        cache.set(cache_key, metricas, 60 * 15)
-
-    return metricas
+    # Buscar do cache ou calcular (função original), cacheando por 15 minutos
+    return obter_ou_calcular(
+        cache_key,
+        lambda: calcular_metricas_professor(professor, ciclo),
+        60 * 15,
+        prefixo="metricas_prof",
+    )
 
 
 def obter_historico_professor_por_ciclo_cached(professor, ciclo):
     """
     Versão com cache que retorna histórico de um professor em um ciclo específico.
 
+    Cache de 15 minutos com chave versionada e proteção contra stampede
+    (ver calcular_metricas_professor_cached).
+
     Args:
         professor: Instância de PerfilProfessor
         ciclo: Instância de CicloAvaliacao
@@ -83,89 +159,175 @@ def obter_historico_professor_por_ciclo_cached(professor, ciclo):
     Returns:
         dict: Histórico do professor no ciclo (métricas + avaliações detalhadas)
     """
-    cache_key = get_cache_key("historico_prof_ciclo", professor.id, ciclo.id)
+    cache_key = chave_cache_historico_professor(professor.id, ciclo.id)
+
+    return obter_ou_calcular(
+        cache_key,
+        lambda: calcular_historico_professor_ciclo(professor, ciclo),
+        60 * 15,
+        prefixo="historico_prof_ciclo",
+    )
 
-    historico = cache.get(cache_key)
 
-    if historico is None:
-        # Calcular métricas deste ciclo
-        metricas_ciclo = calcular_metricas_professor(professor, ciclo)
+def obter_historicos_professor_ciclos_cached(professor, ciclos):
+    """
+    Históricos (com cache) de um professor em vários ciclos.
 
-        # Buscar avaliações deste ciclo
-        avaliacoes = (
-            AvaliacaoDocente.objects.filter(professor=professor, ciclo=ciclo)
-            .select_related("turma", "disciplina", "turma__disciplina__curso")
-            .prefetch_related(
-                Prefetch(
-                    "respostas",
-                    queryset=RespostaAvaliacao.objects.select_related("pergunta"),
-                )
-            )
+    Cada ciclo continua com a sua chave versionada; se algum não estiver em
+    cache, os históricos de todos os ciclos informados são calculados juntos
+    (calcular_historicos_professor_ciclos), com um número fixo de queries.
+
+    Returns:
+        dict ciclo_id -> histórico (formato de calcular_historico_professor_ciclo)
+    """
+    ciclos = list(ciclos)
+    lote = {}
+
+    def calcular(ciclo):
+        if not lote:
+            lote.update(calcular_historicos_professor_ciclos(professor, ciclos))
+        return lote[ciclo.id]
+
+    return {
+        ciclo.id: obter_ou_calcular(
+            chave_cache_historico_professor(professor.id, ciclo.id),
+            lambda ciclo=ciclo: calcular(ciclo),
+            60 * 15,
+            prefixo="historico_prof_ciclo",
         )
+        for ciclo in ciclos
+    }
 
-        avaliacoes_info = []
-        for avaliacao in avaliacoes:
-            resultado = avaliacao.calcular_media_geral_questionario_padrao()
 
-            # Calcular respondentes únicos
-            # Estratégia: usar aluno se disponível, senão usar session_key
-            respostas_com_aluno = (
-                avaliacao.respostas.filter(aluno__isnull=False)
-                .values("aluno")
-                .distinct()
-            )
+def calcular_historico_professor_ciclo(professor, ciclo):
+    """
+    Monta o histórico de um professor em um ciclo (sem cache).
 
-            respostas_sem_aluno = (
-                avaliacao.respostas.filter(aluno__isnull=True)
-                .exclude(session_key="")
-                .values("session_key")
-                .distinct()
-            )
+    Returns:
+        dict: Histórico do professor no ciclo (métricas + avaliações detalhadas)
+    """
+    return calcular_historicos_professor_ciclos(professor, [ciclo])[ciclo.id]
 
-            total_respondentes = (
-                respostas_com_aluno.count() + respostas_sem_aluno.count()
-            )
 
-            # Total de respostas individuais (para análise técnica)
-            total_respostas = avaliacao.respostas.count()
+def calcular_historicos_professor_ciclos(professor, ciclos):
+    """
+    Monta os históricos de um professor em vários ciclos (sem cache).
 
-            # Alunos aptos (matriculados ativos)
-            alunos_aptos = avaliacao.alunos_aptos()
-            total_alunos_aptos = len(alunos_aptos)
+    Usa um número fixo de queries, independente da quantidade de ciclos e
+    de avaliações: avaliações do professor, resumos (congelados nos ciclos
+    fechados), alunos aptos por turma e respondentes distintos por ciclo.
+    As métricas de cada ciclo são as mesmas de calcular_metricas_professor.
 
-            avaliacoes_info.append(
-                {
-                    "avaliacao": avaliacao,
-                    "turma": avaliacao.turma,
-                    "disciplina": avaliacao.disciplina,
-                    "curso": (
-                        avaliacao.turma.disciplina.curso
-                        if avaliacao.turma.disciplina
-                        else None
-                    ),
-                    "total_respondentes": total_respondentes,  # ✅ Contagem correta
-                    "total_alunos_aptos": total_alunos_aptos,  # ✅ Nome claro
-                    "total_respostas": total_respostas,  # Para referência técnica
-                    "media": resultado["media_geral"] if resultado else None,
-                    "classificacao": (
-                        AvaliacaoDocente.get_classificacao_media(
-                            None, resultado["media_geral"]
-                        )
-                        if resultado
-                        else "Sem dados"
-                    ),
-                }
-            )
+    Args:
+        professor: Instância de PerfilProfessor
+        ciclos: Iterável de CicloAvaliacao
 
-        historico = {
+    Returns:
+        dict ciclo_id -> dict com ciclo, metricas e avaliacoes
+    """
+    ciclos = list(ciclos)
+    historicos = {
+        ciclo.id: {
             "ciclo": ciclo,
-            "metricas": metricas_ciclo,
-            "avaliacoes": avaliacoes_info,
+            "metricas": _metricas_professor_vazias(),
+            "avaliacoes": [],
         }
+        for ciclo in ciclos
+    }
+    if not ciclos:
+        return historicos
+
+    avaliacoes = list(
+        AvaliacaoDocente.objects.filter(
+            professor=professor, ciclo_id__in=list(historicos)
+        ).select_related("turma", "disciplina", "turma__disciplina__curso", "ciclo")
+    )
+
+    # Resumos persistidos (ou congelados, se o ciclo estiver fechado)
+    resumos = obter_resumos_avaliacoes(avaliacoes)
+
+    medias_por_ciclo = {}
+    for avaliacao in avaliacoes:
+        resumo = resumos[avaliacao.id]
+        historico = historicos[avaliacao.ciclo_id]
+        historico["avaliacoes"].append(
+            {
+                "avaliacao": avaliacao,
+                "turma": avaliacao.turma,
+                "disciplina": avaliacao.disciplina,
+                "curso": (
+                    avaliacao.turma.disciplina.curso
+                    if avaliacao.turma.disciplina
+                    else None
+                ),
+                # Respondentes únicos (aluno ou session_key)
+                "total_respondentes": resumo.total_respondentes,
+                # Alunos aptos (matriculados ativos)
+                "total_alunos_aptos": resumo.total_alunos_aptos,
+                "total_respostas": resumo.total_respostas,  # Referência técnica
+                "media": resumo.media_geral,
+                "classificacao": resumo.classificacao,
+            }
+        )
+
+        metricas = historico["metricas"]
+        metricas["total_avaliacoes"] += 1
+        metricas["total_alunos_aptos"] += resumo.total_alunos_aptos
+        if resumo.total_respostas:
+            metricas["avaliacoes_respondidas"] += 1
+            if resumo.media_geral is not None:
+                medias_por_ciclo.setdefault(avaliacao.ciclo_id, []).append(
+                    resumo.media_geral
+                )
 
-        cache.set(cache_key, historico, 60 * 15)
+    # Ciclos fechados: métricas congeladas no encerramento
+    congelados = {
+        resultado.ciclo_id: resultado
+        for resultado in ResultadoCicloCongelado.objects.filter(
+            ciclo_id__in=[ciclo.id for ciclo in ciclos if ciclo_fechado(ciclo)]
+        )
+    }
 
-    return historico
+    # Respondentes únicos por ciclo (um aluno conta uma vez entre turmas)
+    respondentes_por_ciclo = dict(
+        SubmissaoAvaliacao.objects.filter(
+            avaliacao__professor=professor,
+            avaliacao__ciclo_id__in=[
+                ciclo_id for ciclo_id in historicos if ciclo_id not in congelados
+            ],
+            avaliacao__ativo=True,
+            aluno__isnull=False,
+        )
+        .values("avaliacao__ciclo_id")
+        .annotate(total=Count("aluno_id", distinct=True))
+        .values_list("avaliacao__ciclo_id", "total")
+        .order_by()
+    )
+
+    for ciclo_id, historico in historicos.items():
+        if ciclo_id in congelados:
+            historico["metricas"] = (
+                congelados[ciclo_id].metricas_professor(professor.id)
+                or _metricas_professor_vazias()
+            )
+            continue
+
+        metricas = historico["metricas"]
+        total_respondentes = respondentes_por_ciclo.get(ciclo_id, 0)
+        metricas["total_respondentes"] = total_respondentes
+        metricas["taxa_resposta"] = (
+            round((total_respondentes / metricas["total_alunos_aptos"]) * 100, 2)
+            if metricas["total_alunos_aptos"] > 0
+            else 0.0
+        )
+        medias = medias_por_ciclo.get(ciclo_id)
+        if medias:
+            metricas["media_ciclo"] = round(sum(medias) / len(medias), 4)
+            metricas["classificacao_ciclo"] = AvaliacaoDocente.get_classificacao_media(
+                None, metricas["media_ciclo"]
+            )
+
+    return historicos
 
 
 # ============================================================================
@@ -177,6 +339,9 @@ def calcular_metricas_professor(professor, ciclo=None):
     """
     Calcula métricas consolidadas de um professor (OTIMIZADO).
 
+    Delega para calcular_metricas_professores, garantindo que a listagem
+    em lote e o cálculo individual produzam exatamente o mesmo resultado.
+
     Args:
         professor: Instância de PerfilProfessor
         ciclo: Instância de CicloAvaliacao (opcional, filtra por ciclo específico)
@@ -191,88 +356,122 @@ def calcular_metricas_professor(professor, ciclo=None):
             - classificacao_ciclo: str (Excelente, Bom, Regular, etc)
             - total_avaliacoes: int (avaliações criadas, com ou sem resposta)
     """
-    # Filtrar avaliações do professor
-    avaliacoes_qs = AvaliacaoDocente.objects.filter(professor=professor)
+    return calcular_metricas_professores([professor], ciclo)[professor.id]
 
-    if ciclo:
-        avaliacoes_qs = avaliacoes_qs.filter(ciclo=ciclo)
 
-    # Usar aggregação para contar avaliações
-    total_avaliacoes = avaliacoes_qs.count()
+def _metricas_professor_vazias():
+    """Métricas de um professor sem avaliações no escopo consultado."""
+    return {
+        "avaliacoes_respondidas": 0,
+        "total_respondentes": 0,
+        "total_alunos_aptos": 0,
+        "taxa_resposta": 0.0,
+        "media_ciclo": None,
+        "classificacao_ciclo": "Sem dados",
+        "total_avaliacoes": 0,
+    }
 
-    if total_avaliacoes == 0:
+
+def calcular_metricas_professores(professores, ciclo=None):
+    """
+    Calcula as métricas de vários professores de uma só vez.
+
+    Usa um número fixo de queries agregadas (avaliações, resumos,
+    respondentes distintos e alunos aptos por turma), independente da
+    quantidade de professores, avaliações ou respostas. Para ciclos fechados,
+    as métricas vêm dos resultados congelados no encerramento.
+
+    Args:
+        professores: Iterável de PerfilProfessor (ou de IDs)
+        ciclo: Instância de CicloAvaliacao (opcional, filtra por ciclo específico)
+
+    Returns:
+        dict professor_id -> dict no formato de calcular_metricas_professor
+    """
+    professor_ids = [getattr(professor, "id", professor) for professor in professores]
+
+    congelado = obter_resultado_congelado(ciclo)
+    if congelado is not None:
         return {
-            "avaliacoes_respondidas": 0,
-            "total_respondentes": 0,
-            "total_alunos_aptos": 0,
-            "taxa_resposta": 0.0,
-            "media_ciclo": None,
-            "classificacao_ciclo": "Sem dados",
-            "total_avaliacoes": 0,
+            professor_id: congelado.metricas_professor(professor_id)
+            or _metricas_professor_vazias()
+            for professor_id in professor_ids
         }
 
-    # Pré-carregar apenas o necessário
-    avaliacoes = avaliacoes_qs.select_related("turma", "ciclo").prefetch_related(
-        Prefetch(
-            "respostas",
-            queryset=RespostaAvaliacao.objects.select_related("pergunta"),
-        ),
-        "turma__matriculas",
-    )
-
-    avaliacoes_respondidas = 0
-    respondentes_ids = set()
-    total_alunos_aptos = 0
-    medias_avaliacoes = []
+    return _calcular_metricas_professores(professor_ids, ciclo)
 
-    # Loop único para calcular tudo
-    for avaliacao in avaliacoes:
-        respostas = list(avaliacao.respostas.all())
 
-        if respostas:
-            avaliacoes_respondidas += 1
+def _calcular_metricas_professores(professor_ids, ciclo=None):
+    """Métricas calculadas a partir dos resumos vivos (sem resultados congelados)."""
+    metricas = {
+        professor_id: _metricas_professor_vazias() for professor_id in professor_ids
+    }
+    if not professor_ids:
+        return metricas
 
-            # Contar respondentes únicos
-            for resposta in respostas:
-                if resposta.aluno_id:
-                    respondentes_ids.add(resposta.aluno_id)
+    avaliacoes_qs = AvaliacaoDocente.objects.filter(professor_id__in=professor_ids)
+    if ciclo:
+        avaliacoes_qs = avaliacoes_qs.filter(ciclo=ciclo)
 
-            # Calcular média desta avaliação
-            resultado = avaliacao.calcular_media_geral_questionario_padrao()
-            if resultado:
-                medias_avaliacoes.append(resultado["media_geral"])
+    avaliacoes = list(avaliacoes_qs.values_list("id", "professor_id", "turma_id"))
+    if not avaliacoes:
+        return metricas
 
-        # Contar alunos aptos (cache na turma se possível)
-        alunos_aptos = avaliacao.alunos_aptos()
-        total_alunos_aptos += len(alunos_aptos)
+    resumos = ResumoAvaliacao.obter_mapa(
+        avaliacao_id for avaliacao_id, _, _ in avaliacoes
+    )
+    alunos_aptos_por_turma = Turma.contar_alunos_aptos_por_turma(
+        {turma_id for _, _, turma_id in avaliacoes}
+    )
 
-    total_respondentes = len(respondentes_ids)
-    taxa_resposta = (
-        round((total_respondentes / total_alunos_aptos) * 100, 2)
-        if total_alunos_aptos > 0
-        else 0.0
+    # Respondentes únicos por professor (um aluno conta uma vez entre turmas)
+    respondentes_por_professor = dict(
+        SubmissaoAvaliacao.objects.filter(
+            avaliacao__in=avaliacoes_qs, aluno__isnull=False
+        )
+        .values("avaliacao__professor_id")
+        .annotate(total=Count("aluno_id", distinct=True))
+        .values_list("avaliacao__professor_id", "total")
+        .order_by()
     )
 
-    # Calcular média final
-    media_ciclo = None
-    classificacao_ciclo = "Sem dados"
+    medias_por_professor = {}
+    for avaliacao_id, professor_id, turma_id in avaliacoes:
+        resumo = resumos[avaliacao_id]
+        dados = metricas[professor_id]
+        dados["total_avaliacoes"] += 1
+        dados["total_alunos_aptos"] += alunos_aptos_por_turma.get(turma_id, 0)
 
-    if medias_avaliacoes:
-        media_ciclo = round(sum(medias_avaliacoes) / len(medias_avaliacoes), 4)
-        # Usar método estático para classificar
-        classificacao_ciclo = AvaliacaoDocente.get_classificacao_media(
-            None, media_ciclo
+        if resumo.total_respostas:
+            dados["avaliacoes_respondidas"] += 1
+
+            # Média desta avaliação (já calculada no resumo)
+            if resumo.media_geral is not None:
+                medias_por_professor.setdefault(professor_id, []).append(
+                    resumo.media_geral
+                )
+
+    for professor_id, dados in metricas.items():
+        total_respondentes = respondentes_por_professor.get(professor_id, 0)
+        total_alunos_aptos = dados["total_alunos_aptos"]
+        dados["total_respondentes"] = total_respondentes
+        dados["taxa_resposta"] = (
+            round((total_respondentes / total_alunos_aptos) * 100, 2)
+            if total_alunos_aptos > 0
+            else 0.0
         )
 
-    return {
-        "avaliacoes_respondidas": avaliacoes_respondidas,
-        "total_respondentes": total_respondentes,
-        "total_alunos_aptos": total_alunos_aptos,
-        "taxa_resposta": taxa_resposta,
-        "media_ciclo": media_ciclo,
-        "classificacao_ciclo": classificacao_ciclo,
-        "total_avaliacoes": total_avaliacoes,
-    }
+        medias_avaliacoes = medias_por_professor.get(professor_id)
+        if medias_avaliacoes:
+            dados["media_ciclo"] = round(
+                sum(medias_avaliacoes) / len(medias_avaliacoes), 4
+            )
+            # Usar método estático para classificar
+            dados["classificacao_ciclo"] = AvaliacaoDocente.get_classificacao_media(
+                None, dados["media_ciclo"]
+            )
+
+    return metricas
 
 
 def calcular_media_historica_professor(professor, excluir_ciclo=None):
@@ -290,58 +489,112 @@ def calcular_media_historica_professor(professor, excluir_ciclo=None):
             - total_ciclos: int (quantidade de ciclos considerados)
             - total_avaliacoes_historicas: int
     """
-    avaliacoes = AvaliacaoDocente.objects.filter(
-        professor=professor, respostas__isnull=False
-    ).distinct()
+    return calcular_medias_historicas_professores([professor], excluir_ciclo)[
+        professor.id
+    ]
 
-    if excluir_ciclo:
-        avaliacoes = avaliacoes.exclude(ciclo=excluir_ciclo)
 
-    avaliacoes = avaliacoes.select_related(
-        "turma", "disciplina", "ciclo"
-    ).prefetch_related(
-        Prefetch(
-            "respostas",
-            queryset=RespostaAvaliacao.objects.select_related("pergunta"),
-        )
-    )
+def calcular_medias_historicas_professores(professores, excluir_ciclo=None):
+    """
+    Calcula a média histórica de vários professores com uma query agrupada.
 
-    if not avaliacoes.exists():
-        return {
+    Considera as avaliações com respostas de cada professor (exceto as do
+    ciclo excluído). Ciclos fechados já congelados contribuem com os
+    resultados de ResultadoCicloCongelado; os demais com as médias
+    persistidas em ResumoAvaliacao.
+
+    Args:
+        professores: Iterável de PerfilProfessor (ou de IDs)
+        excluir_ciclo: CicloAvaliacao para excluir do cálculo (opcional)
+
+    Returns:
+        dict professor_id -> dict no formato de calcular_media_historica_professor
+    """
+    professor_ids = [getattr(professor, "id", professor) for professor in professores]
+    historicos = {
+        professor_id: {
             "media_historica": None,
             "classificacao_historica": "Sem dados",
             "total_ciclos": 0,
             "total_avaliacoes_historicas": 0,
         }
+        for professor_id in professor_ids
+    }
+    if not professor_ids:
+        return historicos
 
-    medias_avaliacoes = []
-    ciclos_unicos = set()
-
-    for avaliacao in avaliacoes:
-        resultado = avaliacao.calcular_media_geral_questionario_padrao()
-        if resultado:
-            medias_avaliacoes.append(resultado["media_geral"])
-            ciclos_unicos.add(avaliacao.ciclo.id)
+    avaliacoes = AvaliacaoDocente.objects.filter(professor_id__in=professor_ids)
+    if excluir_ciclo:
+        avaliacoes = avaliacoes.exclude(ciclo=excluir_ciclo)
 
-    if not medias_avaliacoes:
-        return {
-            "media_historica": None,
-            "classificacao_historica": "Sem dados",
-            "total_ciclos": len(ciclos_unicos),
-            "total_avaliacoes_historicas": avaliacoes.count(),
-        }
+    # Acumuladores por professor: avaliações respondidas, ciclos com média
+    # e soma/quantidade das médias por avaliação
+    acumulados = {
+        professor_id: {"avaliacoes": 0, "ciclos": 0, "soma": 0.0, "medias": 0}
+        for professor_id in professor_ids
+    }
 
-    media_historica = round(sum(medias_avaliacoes) / len(medias_avaliacoes), 4)
-    classificacao_historica = avaliacoes.first().get_classificacao_media(
-        media_historica
+    # Ciclos fechados: resultados congelados no encerramento
+    congelados = [
+        resultado
+        for resultado in ResultadoCicloCongelado.objects.select_related("ciclo").filter(
+            ciclo_id__in=avaliacoes.values("ciclo_id")
+        )
+        if ciclo_fechado(resultado.ciclo)
+    ]
+    for resultado in congelados:
+        ciclos_com_media = set()
+        for dados in resultado.avaliacoes.values():
+            professor_id = dados["professor_id"]
+            if professor_id not in acumulados or not dados["total_respostas"]:
+                continue
+            acumulado = acumulados[professor_id]
+            acumulado["avaliacoes"] += 1
+            if dados["media_geral"] is not None:
+                acumulado["soma"] += dados["media_geral"]
+                acumulado["medias"] += 1
+                ciclos_com_media.add(professor_id)
+        for professor_id in ciclos_com_media:
+            acumulados[professor_id]["ciclos"] += 1
+
+    # Demais ciclos: resumos vivos
+    avaliacoes = avaliacoes.exclude(
+        ciclo_id__in=[resultado.ciclo_id for resultado in congelados]
     )
+    ResumoAvaliacao.criar_faltantes(avaliacoes)
+
+    com_media = Q(resumo__media_geral__isnull=False)
+    agregados = (
+        avaliacoes.filter(resumo__total_respostas__gt=0)
+        .values("professor_id")
+        .annotate(
+            total_avaliacoes=Count("id"),
+            total_ciclos=Count("ciclo_id", distinct=True, filter=com_media),
+            soma_medias=Sum("resumo__media_geral", filter=com_media),
+            total_medias=Count("id", filter=com_media),
+        )
+        .order_by()
+    )
+    for item in agregados:
+        acumulado = acumulados[item["professor_id"]]
+        acumulado["avaliacoes"] += item["total_avaliacoes"]
+        acumulado["ciclos"] += item["total_ciclos"]
+        acumulado["soma"] += item["soma_medias"] or 0.0
+        acumulado["medias"] += item["total_medias"]
+
+    for professor_id, acumulado in acumulados.items():
+        historico = historicos[professor_id]
+        historico["total_avaliacoes_historicas"] = acumulado["avaliacoes"]
+        historico["total_ciclos"] = acumulado["ciclos"]
+
+        if acumulado["medias"]:
+            media_historica = round(acumulado["soma"] / acumulado["medias"], 4)
+            historico["media_historica"] = media_historica
+            historico["classificacao_historica"] = (
+                AvaliacaoDocente.get_classificacao_media(None, media_historica)
+            )
 
-    return {
-        "media_historica": media_historica,
-        "classificacao_historica": classificacao_historica,
-        "total_ciclos": len(ciclos_unicos),
-        "total_avaliacoes_historicas": avaliacoes.count(),
-    }
+    return historicos
 
 
 def listar_professores_com_metricas(ciclo=None, curso=None, busca=None):
@@ -356,24 +609,9 @@ def listar_professores_com_metricas(ciclo=None, curso=None, busca=None):
     Returns:
         QuerySet de PerfilProfessor com métricas já calculadas (lista de dicts)
     """
-    # Pré-carregar avaliações de todos os professores de uma vez
-    avaliacoes_prefetch = Prefetch(
-        "avaliacoes_recebidas",
-        queryset=AvaliacaoDocente.objects.select_related(
-            "turma", "ciclo"
-        ).prefetch_related(
-            Prefetch(
-                "respostas",
-                queryset=RespostaAvaliacao.objects.select_related("pergunta"),
-            ),
-            "turma__matriculas",
-        ),
-    )
-
     professores = (
         PerfilProfessor.non_admin.all()
         .select_related("user")
-        .prefetch_related(avaliacoes_prefetch)
         .order_by("user__first_name", "user__last_name")
     )
 
@@ -382,7 +620,7 @@ def listar_professores_com_metricas(ciclo=None, curso=None, busca=None):
         professores = professores.filter(
             Q(user__first_name__icontains=busca)
             | Q(user__last_name__icontains=busca)
-            | Q(matricula__icontains=busca)
+            | Q(registro_academico__icontains=busca)
         )
 
     # Filtrar por curso (professores que lecionam disciplinas desse curso)
@@ -414,15 +652,18 @@ def listar_professores_com_metricas(ciclo=None, curso=None, busca=None):
             if curso_nome not in cursos_por_professor[prof_id]:
                 cursos_por_professor[prof_id].append(curso_nome)
 
-    # Calcular métricas para cada professor
+    # Métricas de todos os professores em lote (número fixo de queries)
+    professores = list(professores)
+    metricas_por_professor = calcular_metricas_professores(professores, ciclo)
+    historicos_por_professor = calcular_medias_historicas_professores(
+        professores, excluir_ciclo=ciclo
+    )
+
     professores_com_metricas = []
 
     for professor in professores:
-        # Usar versão com cache para melhor performance
-        metricas_ciclo = calcular_metricas_professor_cached(professor, ciclo)
-        metricas_historico = calcular_media_historica_professor(
-            professor, excluir_ciclo=ciclo
-        )
+        metricas_ciclo = metricas_por_professor[professor.id]
+        metricas_historico = historicos_por_professor[professor.id]
 
         # Obter cursos do cache
         cursos_lista = cursos_por_professor.get(professor.id, [])
@@ -464,62 +705,17 @@ def obter_historico_professor_por_ciclo(professor):
 
     ciclos = CicloAvaliacao.objects.filter(id__in=ciclos_ids).order_by("-data_inicio")
 
+    # Todos os ciclos de uma vez (número fixo de queries)
+    historicos = calcular_historicos_professor_ciclos(professor, ciclos)
+
     historico_ciclos = []
     todas_avaliacoes = []
-
-    for ciclo in ciclos:
-        # Calcular métricas deste ciclo
-        metricas_ciclo = calcular_metricas_professor(professor, ciclo)
-
-        # Buscar avaliações deste ciclo
-        avaliacoes = (
-            AvaliacaoDocente.objects.filter(professor=professor, ciclo=ciclo)
-            .select_related("turma", "disciplina", "turma__disciplina__curso")
-            .prefetch_related(
-                Prefetch(
-                    "respostas",
-                    queryset=RespostaAvaliacao.objects.select_related("pergunta"),
-                )
-            )
-        )
-
-        avaliacoes_info = []
-        for avaliacao in avaliacoes:
-            resultado = avaliacao.calcular_media_geral_questionario_padrao()
-            total_respostas = avaliacao.respostas.count()
-            alunos_aptos = avaliacao.alunos_aptos()
-
-            avaliacoes_info.append(
-                {
-                    "avaliacao": avaliacao,
-                    "turma": avaliacao.turma,
-                    "disciplina": avaliacao.disciplina,
-                    "curso": (
-                        avaliacao.turma.disciplina.curso
-                        if avaliacao.turma.disciplina
-                        else None
-                    ),
-                    "total_respostas": total_respostas,
-                    "total_alunos": len(alunos_aptos),
-                    "media": resultado["media_geral"] if resultado else None,
-                    "classificacao": (
-                        AvaliacaoDocente.get_classificacao_media(
-                            None, resultado["media_geral"]
-                        )
-                        if resultado
-                        else "Sem dados"
-                    ),
-                }
-            )
-
-        historico_ciclos.append(
-            {
-                "ciclo": ciclo,
-                "metricas": metricas_ciclo,
-                "avaliacoes": avaliacoes_info,
-            }
-        )
-
+    for historico in historicos.values():
+        avaliacoes_info = [
+            dict(info, total_alunos=info["total_alunos_aptos"])
+            for info in historico["avaliacoes"]
+        ]
+        historico_ciclos.append(dict(historico, avaliacoes=avaliacoes_info))
         todas_avaliacoes.extend(avaliacoes_info)
 
     # Calcular estatísticas gerais
@@ -586,7 +782,9 @@ def calcular_taxa_resposta_turma(ciclo, turma):
 
     # Contar alunos distintos que responderam alguma avaliação da turma neste ciclo
     respondentes = (
-        RespostaAvaliacao.objects.filter(avaliacao__turma=turma, avaliacao__ciclo=ciclo)
+        SubmissaoAvaliacao.objects.filter(
+            avaliacao__turma=turma, avaliacao__ciclo=ciclo, aluno__isnull=False
+        )
         .values("aluno_id")
         .distinct()
         .count()
@@ -627,10 +825,14 @@ def obter_alunos_pendentes_lembrete(job):
         "aluno_id", flat=True
     )
 
-    # Alunos que já responderam (devem ser excluídos)
+    # Alunos que já responderam (devem ser excluídos). Submissões anônimas
+    # (aluno nulo) ficam de fora: com um NULL na lista o NOT IN nunca é
+    # verdadeiro e todos os alunos sairiam do lembrete
     alunos_que_responderam = (
-        RespostaAvaliacao.objects.filter(
-            avaliacao__turma=job.turma, avaliacao__ciclo=job.ciclo
+        SubmissaoAvaliacao.objects.filter(
+            avaliacao__turma=job.turma,
+            avaliacao__ciclo=job.ciclo,
+            aluno__isnull=False,
         )
         .values_list("aluno_id", flat=True)
         .distinct()
@@ -685,101 +887,220 @@ def calcular_kpis_ciclo(ciclo):
             - limiar_configurado: Decimal (% do ConfiguracaoSite)
             - status_saude: str ('ok', 'alerta', 'erro')
     """
-    from .models import ConfiguracaoSite
-    from decimal import Decimal
+    return calcular_kpis_multiplos_ciclos([ciclo])[ciclo.id]
 
-    # Turmas do ciclo
-    turmas = ciclo.turmas.all()
-    total_turmas = turmas.count()
 
-    # KPIs de resposta por turma
-    total_alunos_aptos = 0
-    total_respondentes = 0
-    taxas_turmas = []
+def calcular_kpis_multiplos_ciclos(ciclos_queryset):
+    """
+    Calcula KPIs para múltiplos ciclos de forma otimizada.
 
-    for turma in turmas:
-        kpis_turma = calcular_taxa_resposta_turma(ciclo, turma)
-        total_alunos_aptos += kpis_turma["alunos_aptos"]
-        total_respondentes += kpis_turma["respondentes"]
-        if kpis_turma["alunos_aptos"] > 0:
-            taxas_turmas.append(kpis_turma["taxa_percentual"])
-
-    # Taxa média ponderada
-    taxa_media = Decimal("0.00")
-    if taxas_turmas:
-        taxa_media = sum(taxas_turmas) / len(taxas_turmas)
-
-    # KPIs de jobs de lembrete
-    jobs = JobLembreteCicloTurma.objects.filter(ciclo=ciclo)
-    jobs_stats = jobs.aggregate(
-        total=Count("id"),
-        pendentes=Count("id", filter=Q(status="pendente")),
-        em_execucao=Count("id", filter=Q(status="em_execucao")),
-        completos=Count("id", filter=Q(status="completo")),
-        pausados=Count("id", filter=Q(status="pausado")),
-        com_erro=Count("id", filter=Q(status="erro")),
-        ultimo_envio=Max("ultima_execucao"),
-        proximo_envio=Min("proximo_envio_em", filter=Q(status="pendente")),
+    Todos os pares (ciclo, turma) são resolvidos com um número fixo de
+    queries agrupadas (turmas, alunos aptos, respondentes e jobs),
+    independente da quantidade de ciclos e turmas.
+
+    Args:
+        ciclos_queryset: QuerySet (ou lista) de CicloAvaliacao
+
+    Returns:
+        dict mapeando ciclo.id -> dict de KPIs (ver calcular_kpis_ciclo)
+    """
+    from .models import CicloAvaliacao, ConfiguracaoSite, MatriculaTurma, ResumoCiclo
+    from decimal import Decimal
+    from django.utils import timezone
+
+    ciclos = list(ciclos_queryset)
+    if not ciclos:
+        return {}
+    ciclo_ids = [ciclo.id for ciclo in ciclos]
+
+    # Turmas (ativas) vinculadas a cada ciclo
+    turmas_por_ciclo = {}
+    for ciclo_id, turma_id in CicloAvaliacao.turmas.through.objects.filter(
+        cicloavaliacao_id__in=ciclo_ids, turma__ativo=True
+    ).values_list("cicloavaliacao_id", "turma_id"):
+        turmas_por_ciclo.setdefault(ciclo_id, []).append(turma_id)
+
+    # Alunos aptos (matrículas ativas) por turma
+    turma_ids = {turma_id for ids in turmas_por_ciclo.values() for turma_id in ids}
+    alunos_aptos_por_turma = dict(
+        MatriculaTurma.objects.filter(turma_id__in=turma_ids, status="ativa")
+        .values("turma_id")
+        .annotate(total=Count("id"))
+        .values_list("turma_id", "total")
+        .order_by()
     )
 
+    # Alunos distintos que responderam, por (ciclo, turma)
+    respondentes_por_par = {
+        (item["avaliacao__ciclo_id"], item["avaliacao__turma_id"]): item["total"]
+        for item in SubmissaoAvaliacao.objects.filter(
+            avaliacao__ciclo_id__in=ciclo_ids, aluno__isnull=False
+        )
+        .values("avaliacao__ciclo_id", "avaliacao__turma_id")
+        .annotate(total=Count("aluno_id", distinct=True))
+        .order_by()
+    }
+
+    # KPIs de jobs de lembrete por ciclo
+    jobs_por_ciclo = {
+        item["ciclo_id"]: item
+        for item in JobLembreteCicloTurma.objects.filter(ciclo_id__in=ciclo_ids)
+        .values("ciclo_id")
+        .annotate(
+            total=Count("id"),
+            pendentes=Count("id", filter=Q(status="pendente")),
+            em_execucao=Count("id", filter=Q(status="em_execucao")),
+            completos=Count("id", filter=Q(status="completo")),
+            pausados=Count("id", filter=Q(status="pausado")),
+            com_erro=Count("id", filter=Q(status="erro")),
+            ultimo_envio=Max("ultima_execucao"),
+            proximo_envio=Min("proximo_envio_em", filter=Q(status="pendente")),
+        )
+        .order_by()
+    }
+
     # Limiar configurado
     config = ConfiguracaoSite.obter_config()
     limiar = config.limiar_minimo_percentual
+    agora = timezone.now()
+
+    resultado = {}
+    for ciclo in ciclos:
+        turmas = turmas_por_ciclo.get(ciclo.id, [])
+
+        # KPIs de resposta por turma (mesmo cálculo de calcular_taxa_resposta_turma)
+        total_alunos_aptos = 0
+        total_respondentes = 0
+        taxas_turmas = []
+        for turma_id in turmas:
+            alunos_aptos = alunos_aptos_por_turma.get(turma_id, 0)
+            if alunos_aptos == 0:
+                continue
+            respondentes = respondentes_por_par.get((ciclo.id, turma_id), 0)
+            total_alunos_aptos += alunos_aptos
+            total_respondentes += respondentes
+            taxas_turmas.append(
+                Decimal(str((respondentes / alunos_aptos) * 100.0)).quantize(
+                    Decimal("0.01")
+                )
+            )
 
-    # Status de saúde
-    status_saude = "ok"
-    if jobs_stats["com_erro"] > 0:
-        status_saude = "erro"
-    elif taxa_media < limiar and ciclo.ativo:
-        from django.utils import timezone
+        # Taxa média ponderada
+        taxa_media = Decimal("0.00")
+        if taxas_turmas:
+            taxa_media = sum(taxas_turmas) / len(taxas_turmas)
 
-        dias_restantes = (ciclo.data_fim - timezone.now()).days
-        if dias_restantes <= 7:  # Alerta se faltam 7 dias ou menos
-            status_saude = "alerta"
+        jobs_stats = jobs_por_ciclo.get(ciclo.id, {})
+        jobs_com_erro = jobs_stats.get("com_erro") or 0
 
-    return {
-        "total_turmas": total_turmas,
-        "total_alunos_aptos": total_alunos_aptos,
-        "total_respondentes": total_respondentes,
-        "taxa_media_resposta": taxa_media,
-        "jobs_total": jobs_stats["total"] or 0,
-        "jobs_pendentes": jobs_stats["pendentes"] or 0,
-        "jobs_em_execucao": jobs_stats["em_execucao"] or 0,
-        "jobs_completos": jobs_stats["completos"] or 0,
-        "jobs_pausados": jobs_stats["pausados"] or 0,
-        "jobs_com_erro": jobs_stats["com_erro"] or 0,
-        "ultimo_envio_em": jobs_stats["ultimo_envio"],
-        "proximo_envio_em": jobs_stats["proximo_envio"],
-        "limiar_configurado": limiar,
-        "status_saude": status_saude,
-    }
+        # Status de saúde
+        status_saude = ResumoCiclo.classificar_saude(
+            ciclo, taxa_media, jobs_com_erro, limiar, agora
+        )
 
+        resultado[ciclo.id] = {
+            "total_turmas": len(turmas),
+            "total_alunos_aptos": total_alunos_aptos,
+            "total_respondentes": total_respondentes,
+            "taxa_media_resposta": taxa_media,
+            "jobs_total": jobs_stats.get("total") or 0,
+            "jobs_pendentes": jobs_stats.get("pendentes") or 0,
+            "jobs_em_execucao": jobs_stats.get("em_execucao") or 0,
+            "jobs_completos": jobs_stats.get("completos") or 0,
+            "jobs_pausados": jobs_stats.get("pausados") or 0,
+            "jobs_com_erro": jobs_com_erro,
+            "ultimo_envio_em": jobs_stats.get("ultimo_envio"),
+            "proximo_envio_em": jobs_stats.get("proximo_envio"),
+            "limiar_configurado": limiar,
+            "status_saude": status_saude,
+        }
 
-def calcular_kpis_multiplos_ciclos(ciclos_queryset):
+    return resultado
+
+
+def atualizar_resumos_ciclos(ciclos):
     """
-    Calcula KPIs para múltiplos ciclos de forma otimizada.
+    Recalcula e persiste o snapshot de KPIs (ResumoCiclo) dos ciclos.
+
+    Usa calcular_kpis_multiplos_ciclos (queries agrupadas) e grava todos os
+    resumos com bulk_create/bulk_update.
 
     Args:
-        ciclos_queryset: QuerySet de CicloAvaliacao
+        ciclos: QuerySet ou lista de CicloAvaliacao
 
     Returns:
-        dict mapeando ciclo.id -> dict de KPIs
+        dict mapeando ciclo.id -> ResumoCiclo atualizado
     """
-    resultado = {}
+    from django.db import transaction
+    from django.utils import timezone
+    from .models import ResumoCiclo
 
-    # Prefetch relacionamentos para otimização
-    ciclos = ciclos_queryset.prefetch_related(
-        "turmas",
-        Prefetch(
-            "jobs_lembrete",
-            queryset=JobLembreteCicloTurma.objects.select_related("turma"),
-        ),
+    ciclos = list(ciclos)
+    # Limpa a marcação antes do cálculo: um envio concorrente volta a marcar
+    ResumoCiclo.objects.filter(
+        ciclo_id__in=[ciclo.id for ciclo in ciclos], desatualizado=True
+    ).update(desatualizado=False)
+
+    kpis_por_ciclo = calcular_kpis_multiplos_ciclos(ciclos)
+    if not kpis_por_ciclo:
+        return {}
+
+    existentes = {
+        resumo.ciclo_id: resumo
+        for resumo in ResumoCiclo.objects.filter(ciclo_id__in=kpis_por_ciclo.keys())
+    }
+    novos = []
+    for ciclo_id, kpis in kpis_por_ciclo.items():
+        resumo = existentes.get(ciclo_id)
+        if resumo is None:
+            resumo = ResumoCiclo(ciclo_id=ciclo_id)
+            novos.append(resumo)
+        else:
+            # bulk_update não aplica auto_now
+            resumo.data_atualizacao = timezone.now()
+        resumo.aplicar_kpis(kpis)
+
+    atualizados = list(existentes.values())
+    with transaction.atomic():
+        if novos:
+            ResumoCiclo.objects.bulk_create(novos, ignore_conflicts=True)
+        if atualizados:
+            ResumoCiclo.objects.bulk_update(
+                atualizados, ResumoCiclo.CAMPOS_KPIS + ["data_atualizacao"]
+            )
+
+    return {
+        resumo.ciclo_id: resumo
+        for resumo in ResumoCiclo.objects.filter(ciclo_id__in=kpis_por_ciclo.keys())
+    }
+
+
+def garantir_resumos_ciclos(ciclos_queryset):
+    """
+    Cria o snapshot de KPIs dos ciclos do queryset que ainda não o possuem
+    (ciclos novos ou anteriores à tabela ResumoCiclo) e recalcula os
+    marcados como desatualizados pelas submissões de respostas.
+    """
+    pendentes = ciclos_queryset.filter(
+        Q(resumo_kpis__isnull=True) | Q(resumo_kpis__desatualizado=True)
     )
+    if pendentes.exists():
+        atualizar_resumos_ciclos(pendentes)
 
-    for ciclo in ciclos:
-        resultado[ciclo.id] = calcular_kpis_ciclo(ciclo)
 
-    return resultado
+def marcar_resumos_ciclos_desatualizados(ciclo_ids):
+    """
+    Marca os snapshots de KPIs dos ciclos para recálculo (ver
+    garantir_resumos_ciclos). Só grava os que ainda não estão marcados.
+
+    Args:
+        ciclo_ids: Ids dos ciclos (lista ou subconsulta com um único campo)
+    """
+    from .models import ResumoCiclo
+
+    ResumoCiclo.objects.filter(ciclo_id__in=ciclo_ids, desatualizado=False).update(
+        desatualizado=True
+    )
 
 
 def obter_ciclos_em_alerta():
@@ -807,11 +1128,820 @@ def obter_ciclos_em_alerta():
         ativo=True, data_fim__lte=limite_alerta, data_fim__gte=hoje
     )
 
-    # Filtrar por taxa e erros
-    ciclos_alerta = []
-    for ciclo in ciclos_ativos:
-        kpis = calcular_kpis_ciclo(ciclo)
-        if kpis["taxa_media_resposta"] < limiar or kpis["jobs_com_erro"] > 0:
-            ciclos_alerta.append(ciclo.id)
+    # Filtrar por taxa e erros (KPIs de todos os ciclos em lote)
+    ciclos_alerta = [
+        ciclo_id
+        for ciclo_id, kpis in calcular_kpis_multiplos_ciclos(ciclos_ativos).items()
+        if kpis["taxa_media_resposta"] < limiar or kpis["jobs_com_erro"] > 0
+    ]
 
     return CicloAvaliacao.objects.filter(id__in=ciclos_alerta).order_by("data_fim")
+
+
+# ============================================================================
+# RESULTADOS CONGELADOS DE CICLOS FECHADOS
+# ============================================================================
+
+
+def ciclo_fechado(ciclo):
+    """Indica se o ciclo foi encerrado manualmente ou já passou da data de fim."""
+    return ciclo.status in ("encerrado", "finalizado")
+
+
+def contar_respostas_por_valor(respostas):
+    """
+    Agrupa respostas por avaliação, pergunta e valor (base dos gráficos do
+    relatório de avaliações e dos resultados congelados).
+
+    Likert e NPS são agrupados por valor_numerico, múltipla escolha por
+    valor_texto e sim/não por valor_boolean; de texto livre apenas a
+    quantidade de respostas é contada (valor None).
+
+    Args:
+        respostas: QuerySet de RespostaAvaliacao
+
+    Returns:
+        list de dicts com avaliacao_id, pergunta_id, enunciado, tipo, valor e
+        qtd, agrupados por tipo de pergunta
+    """
+    consultas = [
+        (
+            respostas.filter(
+                pergunta__tipo__in=["likert", "nps"], valor_numerico__isnull=False
+            ),
+            "valor_numerico",
+        ),
+        (
+            respostas.filter(
+                pergunta__tipo="multipla_escolha", valor_texto__isnull=False
+            ).exclude(valor_texto=""),
+            "valor_texto",
+        ),
+        (
+            respostas.filter(pergunta__tipo="sim_nao", valor_boolean__isnull=False),
+            "valor_boolean",
+        ),
+        (
+            respostas.filter(
+                pergunta__tipo="texto_livre", valor_texto__isnull=False
+            ).exclude(valor_texto=""),
+            None,
+        ),
+    ]
+
+    linhas = []
+    for consulta, campo_valor in consultas:
+        campos = [
+            "avaliacao_id",
+            "pergunta_id",
+            "pergunta__enunciado",
+            "pergunta__tipo",
+        ]
+        if campo_valor:
+            campos.append(campo_valor)
+        for linha in (
+            consulta.values(*campos).annotate(qtd=Count("id")).order_by(*campos)
+        ):
+            linhas.append(
+                {
+                    "avaliacao_id": linha["avaliacao_id"],
+                    "pergunta_id": linha["pergunta_id"],
+                    "enunciado": linha["pergunta__enunciado"],
+                    "tipo": linha["pergunta__tipo"],
+                    "valor": linha[campo_valor] if campo_valor else None,
+                    "qtd": linha["qtd"],
+                }
+            )
+    return linhas
+
+
+def listar_comentarios(avaliacao_ids):
+    """
+    Comentários (respostas de texto livre) das avaliações, em ordem de
+    resposta.
+
+    Returns:
+        dict avaliacao_id -> list de dicts com valor_texto e data_resposta
+    """
+    comentarios = {}
+    for linha in (
+        RespostaAvaliacao.objects.filter(
+            avaliacao_id__in=list(avaliacao_ids),
+            pergunta__tipo="texto_livre",
+            valor_texto__isnull=False,
+        )
+        .exclude(valor_texto="")
+        .values("avaliacao_id", "valor_texto", "data_resposta")
+        .order_by("data_resposta", "id")
+    ):
+        comentarios.setdefault(linha.pop("avaliacao_id"), []).append(linha)
+    return comentarios
+
+
+def congelar_resultados_ciclo(ciclo):
+    """
+    Congela os resultados do ciclo em um ResultadoCicloCongelado.
+
+    Registra, para cada avaliação, os totais, a média, as contagens por
+    pergunta do questionário padrão, as respostas agrupadas por valor
+    (contar_respostas_por_valor) e os comentários e, para cada professor,
+    as métricas do ciclo. Um resultado já congelado é devolvido sem
+    alterações (o registro é imutável).
+
+    Args:
+        ciclo: Instância de CicloAvaliacao
+
+    Returns:
+        ResultadoCicloCongelado
+    """
+    existente = ResultadoCicloCongelado.objects.filter(ciclo=ciclo).first()
+    if existente is not None:
+        return existente
+
+    avaliacoes = list(
+        AvaliacaoDocente.objects.filter(ciclo=ciclo).values_list(
+            "id", "professor_id", "turma_id"
+        )
+    )
+    avaliacao_ids = [avaliacao_id for avaliacao_id, _, _ in avaliacoes]
+    turma_ids = {turma_id for _, _, turma_id in avaliacoes}
+
+    resumos = ResumoAvaliacao.obter_mapa(avaliacao_ids)
+    perguntas = AvaliacaoDocente.contar_opcoes_por_avaliacao(avaliacao_ids)
+    respostas_por_avaliacao = {}
+    for linha in contar_respostas_por_valor(
+        RespostaAvaliacao.objects.filter(avaliacao_id__in=avaliacao_ids)
+    ):
+        respostas_por_avaliacao.setdefault(linha.pop("avaliacao_id"), []).append(linha)
+    comentarios = listar_comentarios(avaliacao_ids)
+    alunos_aptos_por_turma = Turma.contar_alunos_aptos_por_turma(turma_ids)
+    matriculas_por_turma = Turma.contar_matriculas_ativas_por_turma(turma_ids)
+    metricas = _calcular_metricas_professores(
+        {professor_id for _, professor_id, _ in avaliacoes}, ciclo
+    )
+
+    resultados_avaliacoes = {}
+    for avaliacao_id, professor_id, turma_id in avaliacoes:
+        resumo = resumos[avaliacao_id]
+        resultados_avaliacoes[str(avaliacao_id)] = {
+            "professor_id": professor_id,
+            "turma_id": turma_id,
+            "total_respondentes": resumo.total_respondentes,
+            "total_respostas": resumo.total_respostas,
+            "total_alunos_aptos": alunos_aptos_por_turma.get(turma_id, 0),
+            "total_matriculas_ativas": matriculas_por_turma.get(turma_id, 0),
+            "media_geral": resumo.media_geral,
+            "classificacao": resumo.classificacao,
+            "perguntas": [
+                {
+                    "id": pergunta_id,
+                    "enunciado": dados["enunciado"],
+                    "contagens": dados["contagens"],
+                }
+                for pergunta_id, dados in perguntas.get(avaliacao_id, {}).items()
+            ],
+            "respostas": respostas_por_avaliacao.get(avaliacao_id, []),
+            "comentarios": [
+                {
+                    "valor_texto": comentario["valor_texto"],
+                    "data_resposta": comentario["data_resposta"].isoformat(),
+                }
+                for comentario in comentarios.get(avaliacao_id, [])
+            ],
+        }
+
+    resultado, _ = ResultadoCicloCongelado.objects.get_or_create(
+        ciclo=ciclo,
+        defaults={
+            "avaliacoes": resultados_avaliacoes,
+            "professores": {
+                str(professor_id): dados for professor_id, dados in metricas.items()
+            },
+        },
+    )
+    return resultado
+
+
+def obter_resultado_congelado(ciclo):
+    """
+    Retorna os resultados congelados de um ciclo fechado.
+
+    O congelamento é feito ao fechar o ciclo (signal de CicloAvaliacao) ou,
+    para ciclos que passaram da data de fim, por congelar_ciclos_fechados;
+    leituras nunca congelam. Retorna None para ciclos abertos, quando nenhum
+    ciclo é informado ou se o ciclo ainda não foi congelado.
+    """
+    if ciclo is None or not ciclo_fechado(ciclo):
+        return None
+    return ResultadoCicloCongelado.objects.filter(ciclo=ciclo).first()
+
+
+def obter_resultados_congelados(ciclos):
+    """
+    Resultados congelados dos ciclos fechados entre os informados.
+
+    Returns:
+        dict ciclo_id -> ResultadoCicloCongelado (ciclos abertos ou ainda
+        não congelados ficam de fora)
+    """
+    fechados = [ciclo.id for ciclo in ciclos if ciclo_fechado(ciclo)]
+    if not fechados:
+        return {}
+    return {
+        resultado.ciclo_id: resultado
+        for resultado in ResultadoCicloCongelado.objects.filter(ciclo_id__in=fechados)
+    }
+
+
+def congelar_ciclos_fechados():
+    """
+    Congela os ciclos fechados que ainda não têm ResultadoCicloCongelado.
+
+    Cobre os ciclos que passaram da data de fim sem encerramento manual;
+    executado pelos comandos periódicos (enviar_lembretes_ciclos e
+    aquecer_cache_relatorios).
+
+    Returns:
+        int: Quantidade de ciclos congelados
+    """
+    from django.utils import timezone
+    from .models import CicloAvaliacao
+
+    pendentes = CicloAvaliacao.objects.filter(
+        Q(encerrado=True) | Q(data_fim__lt=timezone.now()),
+        resultado_congelado__isnull=True,
+    )
+    total = 0
+    for ciclo in pendentes:
+        congelar_resultados_ciclo(ciclo)
+        total += 1
+    return total
+
+
+def descartar_resultados_congelados(ciclo):
+    """Remove os resultados congelados do ciclo (ex.: ao reativá-lo)."""
+    ResultadoCicloCongelado.objects.filter(ciclo=ciclo).delete()
+
+
+def obter_resumos_avaliacoes(avaliacoes):
+    """
+    Retorna os resumos de várias avaliações, respeitando ciclos fechados.
+
+    Avaliações de ciclos fechados (e já congelados) usam os resultados
+    congelados; as demais usam ResumoAvaliacao. Todo resumo devolvido expõe também
+    total_alunos_aptos e total_matriculas_ativas da turma.
+
+    Args:
+        avaliacoes: Iterável de AvaliacaoDocente (idealmente com ciclo
+            carregado via select_related)
+
+    Returns:
+        dict avaliacao_id -> ResumoAvaliacao
+    """
+    avaliacoes = list(avaliacoes)
+    ciclos_fechados = {
+        avaliacao.ciclo_id for avaliacao in avaliacoes if ciclo_fechado(avaliacao.ciclo)
+    }
+
+    congelados = {
+        resultado.ciclo_id: resultado
+        for resultado in ResultadoCicloCongelado.objects.filter(
+            ciclo_id__in=list(ciclos_fechados)
+        )
+    }
+
+    resumos = {}
+    vivas = []
+    for avaliacao in avaliacoes:
+        congelado = congelados.get(avaliacao.ciclo_id)
+        if congelado is not None and congelado.possui_avaliacao(avaliacao.id):
+            resumos[avaliacao.id] = congelado.resumo_avaliacao(avaliacao.id)
+        else:
+            vivas.append(avaliacao)
+
+    if vivas:
+        resumos_vivos = ResumoAvaliacao.obter_mapa(avaliacao.id for avaliacao in vivas)
+        turma_ids = {avaliacao.turma_id for avaliacao in vivas}
+        alunos_aptos_por_turma = Turma.contar_alunos_aptos_por_turma(turma_ids)
+        matriculas_por_turma = Turma.contar_matriculas_ativas_por_turma(turma_ids)
+
+        for avaliacao in vivas:
+            resumo = resumos_vivos[avaliacao.id]
+            resumo.total_alunos_aptos = alunos_aptos_por_turma.get(
+                avaliacao.turma_id, 0
+            )
+            resumo.total_matriculas_ativas = matriculas_por_turma.get(
+                avaliacao.turma_id, 0
+            )
+            resumos[avaliacao.id] = resumo
+
+    return resumos
+
+
+# ============================================================================
+# PRÉ-AQUECIMENTO DO CACHE DE RELATÓRIOS
+# ============================================================================
+
+
+def listar_tarefas_aquecimento(ciclos):
+    """
+    Lista as tarefas de pré-aquecimento do cache dos ciclos informados.
+
+    Cada tarefa é um par (professor_id, ciclo_id); ciclo_id None representa
+    as métricas gerais ("all") do professor.
+
+    Returns:
+        list de tuplas (professor_id, ciclo_id), sem repetições
+    """
+    pares = sorted(
+        AvaliacaoDocente.objects.filter(ciclo__in=list(ciclos))
+        .values_list("professor_id", "ciclo_id")
+        .distinct()
+        .order_by()
+    )
+    professor_ids = sorted({professor_id for professor_id, _ in pares})
+    return pares + [(professor_id, None) for professor_id in professor_ids]
+
+
+def aquecer_cache_professor(professor_id, ciclo_id=None):
+    """
+    Calcula e grava no cache os resultados de um professor.
+
+    Com ciclo: métricas e histórico do ciclo. Sem ciclo: métricas gerais.
+    """
+    from .models import CicloAvaliacao
+
+    professor = PerfilProfessor.objects.get(id=professor_id)
+    if ciclo_id is None:
+        calcular_metricas_professor_cached(professor)
+        return
+
+    ciclo = CicloAvaliacao.all_objects.get(id=ciclo_id)
+    calcular_metricas_professor_cached(professor, ciclo)
+    obter_historico_professor_por_ciclo_cached(professor, ciclo)
+
+
+def aquecer_resumos_ciclos(ciclos):
+    """
+    Atualiza os KPIs persistidos e congela os resultados de ciclos fechados.
+    """
+    ciclos = list(ciclos)
+    atualizar_resumos_ciclos(ciclos)
+    for ciclo in ciclos:
+        if ciclo_fechado(ciclo):
+            congelar_resultados_ciclo(ciclo)
+
+
+def aquecer_cache_ciclos(ciclos):
+    """
+    Pré-calcula todos os resultados cacheados dos ciclos (no processo atual).
+
+    Returns:
+        int: Quantidade de tarefas de professor executadas
+    """
+    ciclos = list(ciclos)
+    aquecer_resumos_ciclos(ciclos)
+
+    tarefas = listar_tarefas_aquecimento(ciclos)
+    for professor_id, ciclo_id in tarefas:
+        aquecer_cache_professor(professor_id, ciclo_id)
+    return len(tarefas)
+
+
+def aquecer_cache_ciclo_encerrado(ciclo):
+    """
+    Atualiza os resumos do ciclo recém-encerrado após o commit da transação.
+
+    Usado ao encerrar um ciclo. Roda no próprio request (em ambiente
+    serverless uma thread em segundo plano seria interrompida ao fim da
+    resposta), por isso se limita aos registros do ciclo (KPIs e resultados
+    congelados), calculados com um número fixo de consultas. As métricas e
+    os históricos por professor, cujo custo cresce com o número de
+    professores, ficam com o comando aquecer_cache_relatorios (cron).
+    Falhas são apenas registradas: o comando cobre o ciclo na execução
+    seguinte.
+    """
+    from django.db import transaction
+
+    def aquecer():
+        try:
+            aquecer_resumos_ciclos([ciclo])
+        except Exception as e:
+            print(f"❌ Erro ao aquecer cache do ciclo {ciclo.id}: {e}")
+
+    transaction.on_commit(aquecer)
+
+
+# ============================================================================
+# ENVIO DE RESPOSTAS DE AVALIAÇÃO
+# ============================================================================
+
+
+def montar_respostas_envio(avaliacao, aluno, perguntas, dados):
+    """
+    Monta e valida em memória as respostas de um envio do formulário.
+
+    Nenhuma query é feita: a validação dos campos roda sem as chaves
+    estrangeiras (já conhecidas) e sem a checagem de unicidade, garantida
+    pela restrição do banco na gravação.
+
+    Args:
+        avaliacao: AvaliacaoDocente respondida
+        aluno: PerfilAluno respondente
+        perguntas: Perguntas do questionário compilado
+        dados: Dados do formulário (request.POST)
+
+    Returns:
+        tuple (respostas, erros): instâncias não salvas de RespostaAvaliacao
+        e mensagens de erro (vazia se o envio é válido)
+    """
+    from django.core.exceptions import ValidationError
+
+    respostas = []
+    erros = []
+
+    for pergunta in perguntas:
+        valor_resposta = dados.get(f"pergunta_{pergunta.id}")
+
+        if not valor_resposta:
+            if pergunta.obrigatoria:
+                erros.append(f'A pergunta "{pergunta.enunciado}" é obrigatória.')
+            continue
+
+        resposta = RespostaAvaliacao(
+            avaliacao=avaliacao,
+            aluno=aluno,
+            pergunta_id=pergunta.id,
+            # Agora sempre anônima conforme nova regra
+            anonima=True,
+        )
+        if pergunta.tipo in ["likert", "nps"]:
+            try:
+                resposta.valor_numerico = int(valor_resposta)
+            except ValueError:
+                erros.append(
+                    f'Resposta inválida para a pergunta "{pergunta.enunciado}".'
+                )
+                continue
+        elif pergunta.tipo == "sim_nao":
+            resposta.valor_boolean = valor_resposta.lower() == "sim"
+        else:
+            resposta.valor_texto = valor_resposta
+
+        try:
+            resposta.full_clean(
+                exclude=["avaliacao", "aluno", "pergunta"],
+                validate_unique=False,
+                validate_constraints=False,
+            )
+        except ValidationError as e:
+            erros.extend(
+                f'"{pergunta.enunciado}": {mensagem}' for mensagem in e.messages
+            )
+            continue
+
+        respostas.append(resposta)
+
+    return respostas, erros
+
+
+def registrar_envio_avaliacao(avaliacao, aluno, respostas):
+    """
+    Grava em uma transação as respostas de um envio já validado.
+
+    As respostas entram com um único INSERT (criar_em_lote), que não
+    dispara os post_save de RespostaAvaliacao: submissão e resumo são
+    mantidos aqui; o cache é invalidado uma única vez, no commit, pelo
+    sinal do lote, que também marca o snapshot de KPIs do ciclo como
+    desatualizado (sem recálculo no request).
+
+    Args:
+        avaliacao: AvaliacaoDocente respondida
+        aluno: PerfilAluno respondente (ainda sem respostas na avaliação)
+        respostas: Instâncias validadas (ver montar_respostas_envio)
+
+    Raises:
+        IntegrityError: o aluno já possui respostas (envio duplicado); nada
+            é gravado
+    """
+    from django.db import transaction
+
+    if not respostas:
+        return
+
+    with transaction.atomic():
+        # Já validadas em montar_respostas_envio (unicidade fica com o banco)
+        RespostaAvaliacao.criar_em_lote(respostas, validar=False)
+        SubmissaoAvaliacao.registrar(avaliacao, aluno=aluno)
+        ResumoAvaliacao.registrar_envio(avaliacao.id, respostas)
+
+
+# ============================================================================
+# MATRÍCULAS EM MASSA
+# ============================================================================
+
+
+def processar_matriculas_em_lote(acao, turma_ids, aluno_ids, reativar=True):
+    """
+    Matricula ou desmatricula alunos em uma ou mais turmas com operações por
+    conjunto, em vez de get_or_create/save por aluno.
+
+    - matricular: insere as matrículas que faltam (um INSERT, ignorando
+      conflitos) e reativa as existentes que não estão ativas (um UPDATE)
+    - desmatricular: cancela as matrículas ativas (um UPDATE)
+
+    Matrículas excluídas logicamente (soft delete) não são recriadas nem
+    reativadas: ao matricular, contam como erro.
+
+    Args:
+        acao: "matricular" ou "desmatricular"
+        turma_ids: Ids das turmas
+        aluno_ids: Ids dos PerfilAluno
+        reativar: Ao matricular, reativa as matrículas canceladas/trancadas;
+            False apenas cria as que faltam (como get_or_create)
+
+    Returns:
+        tuple (sucesso, erros): quantidade de pares (aluno, turma) alterados
+        e de pares que não puderam ser processados
+    """
+    from django.db import transaction
+    from .models import MatriculaTurma
+
+    if acao not in ("matricular", "desmatricular"):
+        raise ValueError(f"Ação de matrícula inválida: {acao}")
+
+    turma_ids = set(turma_ids)
+    aluno_ids = set(aluno_ids)
+    if not turma_ids or not aluno_ids:
+        return 0, 0
+
+    with transaction.atomic():
+        existentes = {
+            (matricula.turma_id, matricula.aluno_id): matricula
+            for matricula in MatriculaTurma.all_objects.select_for_update().filter(
+                turma_id__in=turma_ids, aluno_id__in=aluno_ids
+            )
+        }
+
+        if acao == "matricular":
+            novas = [
+                MatriculaTurma(turma_id=turma_id, aluno_id=aluno_id, status="ativa")
+                for turma_id in turma_ids
+                for aluno_id in aluno_ids
+                if (turma_id, aluno_id) not in existentes
+            ]
+            reativadas = [
+                matricula
+                for matricula in existentes.values()
+                if reativar and matricula.ativo and matricula.status != "ativa"
+            ]
+            for matricula in reativadas:
+                matricula.status = "ativa"
+
+            MatriculaTurma.criar_em_lote(novas, ignore_conflicts=True)
+            MatriculaTurma.atualizar_em_lote(reativadas, ["status"])
+            excluidas = sum(1 for m in existentes.values() if not m.ativo)
+            return len(novas) + len(reativadas), excluidas
+
+        canceladas = [
+            matricula
+            for matricula in existentes.values()
+            if matricula.ativo and matricula.status == "ativa"
+        ]
+        for matricula in canceladas:
+            matricula.status = "cancelada"
+
+        MatriculaTurma.atualizar_em_lote(canceladas, ["status"])
+        return len(canceladas), 0
+
+
+# ============================================================================
+# VÍNCULO DE TURMAS A CICLOS
+# ============================================================================
+
+
+def criar_avaliacoes_turmas(ciclo, turma_ids):
+    """
+    Cria as avaliações que faltam para as turmas de um ciclo em uma única
+    passada: turmas e avaliações existentes (inclusive excluídas) são
+    carregadas com uma consulta cada e as novas entram com um INSERT.
+
+    Args:
+        ciclo: CicloAvaliacao
+        turma_ids: Ids das turmas vinculadas ao ciclo
+
+    Returns:
+        list das AvaliacaoDocente criadas
+    """
+    turma_ids = set(turma_ids)
+    if not turma_ids:
+        return []
+
+    turmas = Turma.objects.select_related("disciplina").filter(id__in=turma_ids)
+    existentes = set(
+        AvaliacaoDocente.all_objects.filter(
+            ciclo=ciclo, turma_id__in=turma_ids
+        ).values_list("turma_id", "professor_id", "disciplina_id")
+    )
+
+    novas = []
+    encontradas = set()
+    for turma in turmas:
+        encontradas.add(turma.id)
+        disciplina = turma.disciplina
+        if disciplina.professor_id is None:
+            print(
+                f"Erro ao criar avaliação para turma {turma.id}: "
+                f"disciplina {disciplina.disciplina_nome} sem professor"
+            )
+            continue
+        if (turma.id, disciplina.professor_id, disciplina.id) in existentes:
+            continue
+        novas.append(
+            AvaliacaoDocente(
+                ciclo=ciclo,
+                turma=turma,
+                professor_id=disciplina.professor_id,
+                disciplina=disciplina,
+                status="pendente",
+            )
+        )
+
+    for turma_id in turma_ids - encontradas:
+        print(f"Turma com ID {turma_id} não encontrada")
+
+    # Chaves já conferidas acima; uma avaliação gravada por outra transação
+    # nesse meio tempo é ignorada pelo banco, sem quebrar a transação do
+    # chamador (ex.: m2m do admin)
+    AvaliacaoDocente.criar_em_lote(novas, validar=False, ignore_conflicts=True)
+    if not novas:
+        return []
+
+    # bulk_create com ignore_conflicts não devolve PKs: recarregar
+    chaves = {
+        (avaliacao.turma_id, avaliacao.professor_id, avaliacao.disciplina_id)
+        for avaliacao in novas
+    }
+    criadas = [
+        avaliacao
+        for avaliacao in AvaliacaoDocente.objects.filter(
+            ciclo=ciclo, turma_id__in={turma_id for turma_id, _, _ in chaves}
+        )
+        if (avaliacao.turma_id, avaliacao.professor_id, avaliacao.disciplina_id)
+        in chaves
+    ]
+    print(f"{len(criadas)} avaliação(ões) criada(s) para o ciclo {ciclo.nome}")
+    return criadas
+
+
+def criar_jobs_lembrete_turmas(ciclo, turma_ids, proximo_envio):
+    """
+    Cria os JobLembreteCicloTurma que faltam para as turmas de um ciclo
+    com um único INSERT (jobs existentes são mantidos).
+
+    Args:
+        ciclo: CicloAvaliacao
+        turma_ids: Ids das turmas vinculadas ao ciclo
+        proximo_envio: Data/hora do primeiro disparo de lembretes
+
+    Returns:
+        list dos jobs criados
+    """
+    turma_ids = set(turma_ids)
+    if not turma_ids:
+        return []
+
+    existentes = set(
+        JobLembreteCicloTurma.objects.filter(
+            ciclo=ciclo, turma_id__in=turma_ids
+        ).values_list("turma_id", flat=True)
+    )
+    encontradas = set(
+        Turma.objects.filter(id__in=turma_ids).values_list("id", flat=True)
+    )
+    for turma_id in turma_ids - encontradas:
+        print(f"❌ Turma com ID {turma_id} não encontrada")
+
+    jobs = JobLembreteCicloTurma.criar_em_lote(
+        [
+            JobLembreteCicloTurma(
+                ciclo=ciclo,
+                turma_id=turma_id,
+                status="pendente",
+                proximo_envio_em=proximo_envio,
+            )
+            for turma_id in sorted(encontradas - existentes)
+        ],
+        validar=False,
+        ignore_conflicts=True,
+    )
+    if jobs:
+        print(f"✅ {len(jobs)} job(s) de lembrete criado(s): {ciclo.nome}")
+    return jobs
+
+
+def notificar_avaliacoes_criadas(avaliacao_ids):
+    """
+    Envia o e-mail de nova avaliação aos alunos com matrícula ativa nas
+    turmas das avaliações. Avaliações e matrículas são carregadas com uma
+    consulta cada; falhas de envio são registradas e contadas.
+
+    Returns:
+        dict avaliacao_id -> (e-mails enviados, falhas de envio)
+    """
+    from .models import MatriculaTurma
+    from .utils import enviar_email_notificacao_avaliacao
+
+    avaliacoes = list(
+        AvaliacaoDocente.objects.filter(id__in=avaliacao_ids).select_related(
+            "turma__disciplina", "professor__user"
+        )
+    )
+    alunos_por_turma = {}
+    for matricula in MatriculaTurma.objects.filter(
+        turma_id__in={avaliacao.turma_id for avaliacao in avaliacoes},
+        status="ativa",
+    ).select_related("aluno__user"):
+        alunos_por_turma.setdefault(matricula.turma_id, []).append(matricula.aluno.user)
+
+    resultados = {}
+    for avaliacao in avaliacoes:
+        alunos = alunos_por_turma.get(avaliacao.turma_id, [])
+        print(
+            f"Notificando {len(alunos)} alunos da turma {avaliacao.turma.codigo_turma}..."
+        )
+        enviados = falhas = 0
+        for aluno in alunos:
+            try:
+                enviar_email_notificacao_avaliacao(aluno, avaliacao)
+                enviados += 1
+            except Exception as e:
+                falhas += 1
+                print(f"ERRO ao enviar e-mail para {aluno.email}: {e}")
+        resultados[avaliacao.id] = (enviados, falhas)
+    return resultados
+
+
+def agendar_notificacao_avaliacoes(avaliacoes):
+    """
+    Marca as avaliações para que os alunos sejam notificados.
+
+    Usado ao vincular turmas a um ciclo: a requisição (admin ou
+    formulário) não espera o envio dos e-mails, que fica com o comando
+    enviar_lembretes_ciclos, como os lembretes (ver
+    enviar_notificacoes_pendentes). A marcação é gravada na mesma transação
+    e não se perde quando o processo termina junto com a resposta.
+    """
+    avaliacao_ids = [avaliacao.id for avaliacao in avaliacoes]
+    if not avaliacao_ids:
+        return
+
+    AvaliacaoDocente.all_objects.filter(id__in=avaliacao_ids).update(
+        notificacao_pendente=True
+    )
+
+
+def enviar_notificacoes_pendentes():
+    """
+    Envia os e-mails das avaliações marcadas por agendar_notificacao_avaliacoes.
+
+    Cada avaliação é tratada em sua própria transação: a linha é reservada
+    (select_for_update com skip_locked, para que execuções simultâneas do
+    comando não a notifiquem duas vezes) e a marcação só é desfeita depois
+    do envio. Uma falha no meio do processo mantém a avaliação pendente;
+    se nenhum e-mail dela sair (ex.: servidor de e-mail indisponível), ela
+    também fica para a próxima execução.
+
+    Returns:
+        int: Quantidade de e-mails enviados
+    """
+    from django.db import transaction
+
+    pendentes = list(
+        AvaliacaoDocente.objects.filter(notificacao_pendente=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    total_enviados = 0
+    for avaliacao_id in pendentes:
+        with transaction.atomic():
+            reservada = list(
+                AvaliacaoDocente.objects.select_for_update(skip_locked=True)
+                .filter(id=avaliacao_id, notificacao_pendente=True)
+                .values_list("id", flat=True)
+            )
+            if not reservada:
+                continue
+
+            enviados, falhas = notificar_avaliacoes_criadas([avaliacao_id]).get(
+                avaliacao_id, (0, 0)
+            )
+            total_enviados += enviados
+            if falhas and not enviados:
+                continue
+
+            AvaliacaoDocente.all_objects.filter(id=avaliacao_id).update(
+                notificacao_pendente=False
+            )
+    return total_enviados
@@ -1,22 +1,40 @@
+from django.core.signals import request_finished
 from django.db.models.signals import post_save, m2m_changed, post_delete
 from django.dispatch import receiver
-from django.apps import apps
 from django.utils import timezone
 from django.conf import settings
 from django.core.mail import send_mass_mail
-from django.core.cache import cache
 from datetime import timedelta
-import hashlib
+
+from django.contrib.auth.models import User
 
 from .models import (
+    CategoriaPergunta,
     CicloAvaliacao,
+    Curso,
+    EstatisticaCache,
+    Disciplina,
+    PerfilProfessor,
+    Turma,
     AvaliacaoDocente,
     JobLembreteCicloTurma,
     ConfiguracaoSite,
     LembreteAvaliacao,
     RespostaAvaliacao,
+    ResumoAvaliacao,
+    SubmissaoAvaliacao,
+    MatriculaTurma,
+    QuestionarioPergunta,
+    PerguntaAvaliacao,
+)
+from .models.base import lote_salvo
+from .cache_versionado import (
+    invalidar_cache_avaliacoes,
+    invalidar_cache_avaliacoes_ao_confirmar,
+    invalidar_cache_cadastros,
+    invalidar_cache_ciclos,
+    invalidar_cache_global,
 )
-from .utils import enviar_email_notificacao_avaliacao
 
 
 @receiver(m2m_changed, sender=CicloAvaliacao.turmas.through)
@@ -25,49 +43,20 @@ def criar_avaliacoes_automaticamente(sender, instance, action, pk_set, **kwargs)
     Signal para criar automaticamente as avaliações e notificar alunos.
     """
     if action == "post_add":
-        Turma = apps.get_model("avaliacao_docente", "Turma")
+        from .services import agendar_notificacao_avaliacoes, criar_avaliacoes_turmas
 
-        for turma_id in pk_set:
-            try:
-                turma = Turma.objects.get(id=turma_id)
-
-                # Usa all_objects para evitar erro de integridade se já existir uma avaliação deletada
-                avaliacao, created = AvaliacaoDocente.all_objects.get_or_create(
-                    ciclo=instance,
-                    turma=turma,
-                    professor=turma.disciplina.professor,
-                    disciplina=turma.disciplina,
-                    defaults={"status": "pendente"},
-                )
+        try:
+            # Uma passada para todas as turmas (considera também avaliações
+            # deletadas, evitando erro de integridade)
+            avaliacoes = criar_avaliacoes_turmas(instance, pk_set)
 
-                if created:
-                    print(f"Avaliação criada: {avaliacao}")
-
-                    # Se a notificação estiver ativa no ciclo, enviar e-mails
-                    if instance.enviar_lembrete_email:
-                        # Buscar todos os alunos com matrícula ativa na turma
-                        matriculas = turma.matriculas.filter(
-                            status="ativa"
-                        ).select_related("aluno__user")
-                        print(
-                            f"Notificando {matriculas.count()} alunos da turma {turma.codigo_turma}..."
-                        )
-                        for matricula in matriculas:
-                            try:
-                                enviar_email_notificacao_avaliacao(
-                                    matricula.aluno.user, avaliacao
-                                )
-                            except Exception as e:
-                                print(
-                                    f"ERRO ao enviar e-mail para {matricula.aluno.user.email}: {e}"
-                                )
-
-            except Turma.DoesNotExist:
-                print(f"Turma com ID {turma_id} não encontrada")
-                continue
-            except Exception as e:
-                print(f"Erro ao criar avaliação para turma {turma_id}: {e}")
-                continue
+            # Se a notificação estiver ativa no ciclo, os e-mails ficam
+            # pendentes para o comando enviar_lembretes_ciclos
+            if instance.enviar_lembrete_email:
+                agendar_notificacao_avaliacoes(avaliacoes)
+
+        except Exception as e:
+            print(f"Erro ao criar avaliações do ciclo {instance.nome}: {e}")
     elif action == "post_remove":
         # Quando turmas são removidas do ciclo, remover avaliações sem respostas associadas
         for turma_id in pk_set:
@@ -101,27 +90,13 @@ def criar_avaliacoes_pos_save(sender, instance, created, **kwargs):
     if hasattr(instance, "encerrado") and instance.encerrado:
         return
 
-    # Verificar se existem turmas sem avaliações
-    from django.db import transaction
-
-    with transaction.atomic():
-        for turma in instance.turmas.all():
-            # Verificar se já existe uma avaliação para esta turma neste ciclo (inclusive deletadas)
-            if not AvaliacaoDocente.all_objects.filter(
-                ciclo=instance,
-                turma=turma,
-                professor=turma.disciplina.professor,
-                disciplina=turma.disciplina,
-            ).exists():
-                # Criar a avaliação
-                avaliacao = AvaliacaoDocente.objects.create(
-                    ciclo=instance,
-                    turma=turma,
-                    professor=turma.disciplina.professor,
-                    disciplina=turma.disciplina,
-                    status="pendente",
-                )
-                print(f"Avaliação criada via post_save: {avaliacao}")
+    # Criar avaliações para turmas que ainda não têm (inclusive deletadas)
+    from .services import criar_avaliacoes_turmas
+
+    try:
+        criar_avaliacoes_turmas(instance, instance.turmas.values_list("id", flat=True))
+    except Exception as e:
+        print(f"Erro ao criar avaliações do ciclo {instance.nome} via post_save: {e}")
 
 
 @receiver(m2m_changed, sender=CicloAvaliacao.turmas.through)
@@ -131,7 +106,8 @@ def criar_jobs_lembrete_para_turmas(sender, instance, action, pk_set, **kwargs):
     Garante que cada turma tenha um job de controle de lembretes.
     """
     if action == "post_add":
-        Turma = apps.get_model("avaliacao_docente", "Turma")
+        from .services import criar_jobs_lembrete_turmas
+
         config = ConfiguracaoSite.obter_config()
 
         # Calcular o próximo envio baseado na frequência configurada
@@ -139,35 +115,11 @@ def criar_jobs_lembrete_para_turmas(sender, instance, action, pk_set, **kwargs):
             hours=config.frequencia_lembrete_horas
         )
 
-        for turma_id in pk_set:
-            try:
-                turma = Turma.objects.get(id=turma_id)
-
-                # Criar ou atualizar job de lembrete para esta turma/ciclo
-                job, created = JobLembreteCicloTurma.objects.get_or_create(
-                    ciclo=instance,
-                    turma=turma,
-                    defaults={
-                        "status": "pendente",
-                        "proximo_envio_em": proximo_envio,
-                    },
-                )
-
-                if created:
-                    print(
-                        f"✅ Job de lembrete criado: {instance.nome} - {turma.codigo_turma}"
-                    )
-                else:
-                    print(
-                        f"ℹ️ Job de lembrete já existe: {instance.nome} - {turma.codigo_turma}"
-                    )
-
-            except Turma.DoesNotExist:
-                print(f"❌ Turma com ID {turma_id} não encontrada")
-                continue
-            except Exception as e:
-                print(f"❌ Erro ao criar job de lembrete para turma {turma_id}: {e}")
-                continue
+        try:
+            # Cria de uma vez os jobs que faltam (os existentes são mantidos)
+            criar_jobs_lembrete_turmas(instance, pk_set, proximo_envio)
+        except Exception as e:
+            print(f"❌ Erro ao criar jobs de lembrete do ciclo {instance.nome}: {e}")
 
     elif action == "post_remove":
         # Quando turmas são removidas do ciclo, pausar os jobs correspondentes
@@ -270,59 +222,404 @@ Equipe de Avaliação Docente
 # ============================================================================
 
 
-def get_cache_key_local(prefix, *args):
+@receiver(post_save, sender=RespostaAvaliacao)
+def invalidar_cache_metricas_professor(sender, instance, **kwargs):
+    """
+    Invalida cache de métricas quando aluno responde avaliação.
+    Garante que dados exibidos nos relatórios estejam sempre atualizados.
+
+    A invalidação (versões do professor e do ciclo da avaliação) fica para o
+    commit e é feita uma única vez para todas as respostas da transação.
+    """
+    try:
+        invalidar_cache_avaliacoes_ao_confirmar([instance.avaliacao_id])
+
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após resposta de avaliação: {e}")
+
+
+@receiver(post_delete, sender=RespostaAvaliacao)
+def invalidar_cache_ao_deletar_resposta(sender, instance, **kwargs):
+    """
+    Invalida cache quando resposta é deletada.
+    Usa a mesma lógica de invalidação do post_save.
+    """
+    invalidar_cache_metricas_professor(sender, instance, **kwargs)
+
+
+@receiver(lote_salvo, sender=RespostaAvaliacao)
+def invalidar_cache_ao_salvar_lote_respostas(sender, objetos, **kwargs):
+    """
+    Invalida, no commit, o cache das avaliações de respostas gravadas em
+    lote (criar_em_lote/atualizar_em_lote).
+    """
+    try:
+        invalidar_cache_avaliacoes_ao_confirmar(
+            {resposta.avaliacao_id for resposta in objetos}
+        )
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após gravar respostas em lote: {e}")
+
+
+@receiver(post_save, sender=AvaliacaoDocente)
+@receiver(post_delete, sender=AvaliacaoDocente)
+def invalidar_cache_ao_alterar_avaliacao(sender, instance, **kwargs):
+    """
+    Invalida o cache do professor e do ciclo quando uma avaliação é criada,
+    alterada (inclusive soft delete) ou excluída.
+    """
+    try:
+        invalidar_cache_avaliacoes([(instance.professor_id, instance.ciclo_id)])
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após alterar avaliação: {e}")
+
+
+@receiver(lote_salvo, sender=AvaliacaoDocente)
+def invalidar_cache_ao_salvar_lote_avaliacoes(sender, objetos, **kwargs):
+    """
+    Invalida, uma vez por escopo, o cache dos professores e ciclos de
+    avaliações gravadas em lote (criar_em_lote/atualizar_em_lote).
+    """
+    try:
+        invalidar_cache_avaliacoes(
+            (avaliacao.professor_id, avaliacao.ciclo_id) for avaliacao in objetos
+        )
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após gravar avaliações em lote: {e}")
+
+
+@receiver(post_save, sender=MatriculaTurma)
+@receiver(post_delete, sender=MatriculaTurma)
+def invalidar_cache_ao_alterar_matricula(sender, instance, **kwargs):
+    """
+    Invalida o cache das avaliações da turma quando uma matrícula muda
+    (alunos aptos e taxas de resposta dependem das matrículas ativas).
+    """
+    try:
+        invalidar_cache_avaliacoes(
+            AvaliacaoDocente.all_objects.filter(turma_id=instance.turma_id)
+            .values_list("professor_id", "ciclo_id")
+            .distinct()
+            .order_by()
+        )
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após alterar matrícula: {e}")
+
+
+@receiver(lote_salvo, sender=MatriculaTurma)
+def invalidar_cache_ao_salvar_lote_matriculas(sender, objetos, **kwargs):
+    """
+    Invalida, com uma consulta, o cache das avaliações das turmas de
+    matrículas gravadas em lote (matrículas em massa).
     """
-    Gera chave de cache (replica função de services.py para evitar import circular).
+    try:
+        invalidar_cache_avaliacoes(
+            AvaliacaoDocente.all_objects.filter(
+                turma_id__in={matricula.turma_id for matricula in objetos}
+            )
+            .values_list("professor_id", "ciclo_id")
+            .distinct()
+            .order_by()
+        )
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após gravar matrículas em lote: {e}")
 
-    Args:
-        prefix: Prefixo identificador do tipo de cache
-        *args: Argumentos variáveis para compor a chave
 
-    Returns:
-        str: Hash SHA256 da chave (seguro e evita colisões)
+@receiver(post_save, sender=CicloAvaliacao)
+def invalidar_cache_ao_alterar_ciclo(sender, instance, created, **kwargs):
     """
-    key_parts = [str(arg) for arg in args if arg is not None]
-    key_string = f"{prefix}:{'_'.join(key_parts)}"
-    return hashlib.sha256(key_string.encode()).hexdigest()
+    Invalida o cache do ciclo quando ele é alterado (datas, encerramento,
+    reativação ou questionário).
+    """
+    if created:
+        return
+
+    try:
+        invalidar_cache_ciclos([instance.id])
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após alterar ciclo {instance.id}: {e}")
+
+
+@receiver(post_save, sender=QuestionarioPergunta)
+@receiver(post_delete, sender=QuestionarioPergunta)
+@receiver(post_save, sender=PerguntaAvaliacao)
+@receiver(post_save, sender=CategoriaPergunta)
+def invalidar_cache_ao_alterar_questionario(sender, instance, **kwargs):
+    """
+    Invalida todo o cache quando perguntas ou questionários mudam: as médias
+    de todos os ciclos que usam o questionário podem ser afetadas (e os
+    questionários compilados exibem o nome da categoria).
+    """
+    try:
+        invalidar_cache_global()
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após alterar questionário: {e}")
+
+
+@receiver(post_save, sender=CicloAvaliacao)
+@receiver(post_delete, sender=CicloAvaliacao)
+@receiver(post_save, sender=PerfilProfessor)
+@receiver(post_delete, sender=PerfilProfessor)
+@receiver(post_save, sender=Curso)
+@receiver(post_delete, sender=Curso)
+@receiver(post_save, sender=Disciplina)
+@receiver(post_delete, sender=Disciplina)
+@receiver(post_save, sender=Turma)
+@receiver(post_delete, sender=Turma)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_cache_ao_alterar_cadastro(sender, instance, **kwargs):
+    """
+    Invalida o que depende dos cadastros exibidos nos relatórios (filtros,
+    nomes de professores, disciplinas e turmas).
+    """
+    # O login só atualiza last_login, que não aparece nos relatórios
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
+
+    try:
+        invalidar_cache_cadastros()
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após alterar cadastro: {e}")
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_cache_ao_alterar_roles(sender, action, **kwargs):
+    """
+    Invalida os cadastros quando roles mudam (admins saem das listas de
+    professores dos relatórios).
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    try:
+        invalidar_cache_cadastros()
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache após alterar roles: {e}")
+
+
+# ============================================================================
+# SIGNALS DE MANUTENÇÃO DOS RESUMOS DE AVALIAÇÃO
+# ============================================================================
 
 
 @receiver(post_save, sender=RespostaAvaliacao)
-def invalidar_cache_metricas_professor(sender, instance, **kwargs):
+def atualizar_resumo_ao_salvar_resposta(sender, instance, created, **kwargs):
     """
-    Invalida cache de métricas quando aluno responde avaliação.
-    Garante que dados exibidos nos relatórios estejam sempre atualizados.
+    Mantém o ResumoAvaliacao da avaliação sincronizado com as respostas.
+
+    Novas respostas são somadas incrementalmente; edições recalculam o resumo.
+    """
+    try:
+        ResumoAvaliacao.registrar_resposta(instance, created)
+    except Exception as e:
+        print(f"❌ Erro ao atualizar resumo da avaliação {instance.avaliacao_id}: {e}")
+
+
+@receiver(post_delete, sender=RespostaAvaliacao)
+def atualizar_resumo_ao_deletar_resposta(sender, instance, **kwargs):
+    """
+    Desconta a resposta excluída do ResumoAvaliacao correspondente.
+    """
+    try:
+        ResumoAvaliacao.remover_resposta(instance)
+    except Exception as e:
+        print(f"❌ Erro ao atualizar resumo da avaliação {instance.avaliacao_id}: {e}")
+
 
-    Invalida:
-    - Métricas do professor no ciclo específico
-    - Métricas gerais do professor
-    - Histórico do professor no ciclo
+@receiver(post_save, sender=PerguntaAvaliacao)
+@receiver(post_save, sender=QuestionarioPergunta)
+@receiver(post_delete, sender=QuestionarioPergunta)
+def descartar_resumos_ao_alterar_pergunta(sender, instance, **kwargs):
     """
+    Descarta os resumos das avaliações com respostas à pergunta alterada
+    (tipo, ativo ou vínculo com o questionário).
+
+    A remoção acontece na mesma transação da alteração; os resumos são
+    recalculados na próxima leitura.
+    """
+    pergunta_id = instance.id if sender is PerguntaAvaliacao else instance.pergunta_id
     try:
-        professor_id = instance.avaliacao.professor.id
-        ciclo_id = instance.avaliacao.ciclo.id
+        ResumoAvaliacao.descartar_por_pergunta(pergunta_id)
+    except Exception as e:
+        print(f"❌ Erro ao descartar resumos da pergunta {pergunta_id}: {e}")
 
-        # Invalidar métricas do ciclo específico
-        cache_key_ciclo = get_cache_key_local("metricas_prof", professor_id, ciclo_id)
-        cache.delete(cache_key_ciclo)
 
-        # Invalidar métricas gerais
-        cache_key_all = get_cache_key_local("metricas_prof", professor_id, "all")
-        cache.delete(cache_key_all)
+# ============================================================================
+# SIGNALS DE MANUTENÇÃO DAS SUBMISSÕES DE AVALIAÇÃO
+# ============================================================================
+
 
-        # Invalidar histórico do ciclo
-        cache_key_historico = get_cache_key_local(
-            "historico_prof_ciclo", professor_id, ciclo_id
+@receiver(post_save, sender=RespostaAvaliacao)
+def atualizar_submissao_ao_salvar_resposta(sender, instance, created, **kwargs):
+    """
+    Garante a SubmissaoAvaliacao do respondente para respostas gravadas fora
+    de `responder_avaliacao` (admin, scripts) e trata o soft delete.
+    """
+    try:
+        SubmissaoAvaliacao.registrar_resposta(instance)
+    except Exception as e:
+        print(
+            f"❌ Erro ao atualizar submissão da avaliação {instance.avaliacao_id}: {e}"
         )
-        cache.delete(cache_key_historico)
 
+
+@receiver(post_delete, sender=RespostaAvaliacao)
+def atualizar_submissao_ao_deletar_resposta(sender, instance, **kwargs):
+    """
+    Remove a SubmissaoAvaliacao quando o respondente fica sem respostas.
+    """
+    try:
+        SubmissaoAvaliacao.remover_resposta(instance)
     except Exception as e:
-        print(f"❌ Erro ao invalidar cache após resposta de avaliação: {e}")
+        print(
+            f"❌ Erro ao atualizar submissão da avaliação {instance.avaliacao_id}: {e}"
+        )
+
+
+# ============================================================================
+# SIGNALS DOS KPIs DE CICLO
+# ============================================================================
+
+
+def _marcar_kpis_ciclos_das_avaliacoes(avaliacao_ids):
+    from .services import marcar_resumos_ciclos_desatualizados
+
+    marcar_resumos_ciclos_desatualizados(
+        AvaliacaoDocente.all_objects.filter(id__in=avaliacao_ids).values("ciclo_id")
+    )
 
 
+def _marcar_kpis_ciclos_das_turmas(turma_ids):
+    from .services import marcar_resumos_ciclos_desatualizados
+
+    marcar_resumos_ciclos_desatualizados(
+        CicloAvaliacao.turmas.through.objects.filter(turma_id__in=turma_ids).values(
+            "cicloavaliacao_id"
+        )
+    )
+
+
+@receiver(post_save, sender=RespostaAvaliacao)
 @receiver(post_delete, sender=RespostaAvaliacao)
-def invalidar_cache_ao_deletar_resposta(sender, instance, **kwargs):
+def marcar_kpis_ciclo_ao_alterar_resposta(sender, instance, **kwargs):
     """
-    Invalida cache quando resposta é deletada.
-    Usa a mesma lógica de invalidação do post_save.
+    Marca o ResumoCiclo como desatualizado quando uma resposta é gravada
+    fora de responder_avaliacao (admin, scripts) ou excluída.
     """
-    invalidar_cache_metricas_professor(sender, instance, **kwargs)
+    try:
+        _marcar_kpis_ciclos_das_avaliacoes([instance.avaliacao_id])
+    except Exception as e:
+        print(f"❌ Erro ao marcar KPIs do ciclo após alterar resposta: {e}")
+
+
+@receiver(lote_salvo, sender=RespostaAvaliacao)
+def marcar_kpis_ciclo_ao_salvar_lote_respostas(sender, objetos, **kwargs):
+    """Marca os ResumoCiclo das respostas gravadas em lote."""
+    try:
+        _marcar_kpis_ciclos_das_avaliacoes(
+            {resposta.avaliacao_id for resposta in objetos}
+        )
+    except Exception as e:
+        print(f"❌ Erro ao marcar KPIs dos ciclos após gravar respostas em lote: {e}")
+
+
+@receiver(post_save, sender=MatriculaTurma)
+@receiver(post_delete, sender=MatriculaTurma)
+def marcar_kpis_ciclo_ao_alterar_matricula(sender, instance, **kwargs):
+    """
+    Marca os ResumoCiclo dos ciclos da turma: alunos aptos e taxas de
+    resposta dependem das matrículas ativas.
+    """
+    try:
+        _marcar_kpis_ciclos_das_turmas([instance.turma_id])
+    except Exception as e:
+        print(f"❌ Erro ao marcar KPIs dos ciclos após alterar matrícula: {e}")
+
+
+@receiver(lote_salvo, sender=MatriculaTurma)
+def marcar_kpis_ciclo_ao_salvar_lote_matriculas(sender, objetos, **kwargs):
+    """
+    Marca os ResumoCiclo das turmas de matrículas gravadas em lote
+    (processar_matriculas_em_lote).
+    """
+    try:
+        _marcar_kpis_ciclos_das_turmas({matricula.turma_id for matricula in objetos})
+    except Exception as e:
+        print(f"❌ Erro ao marcar KPIs dos ciclos após gravar matrículas em lote: {e}")
+
+
+# ============================================================================
+# SIGNALS DOS RESULTADOS CONGELADOS DE CICLOS
+# ============================================================================
+
+
+@receiver(post_save, sender=CicloAvaliacao)
+def sincronizar_resultados_congelados_ciclo(sender, instance, created, **kwargs):
+    """
+    Congela os resultados quando o ciclo é fechado (encerramento manual ou
+    data de fim no passado) e os descarta quando ele volta a ficar aberto
+    (reativação ou data de fim prorrogada).
+    """
+    if created:
+        return
+
+    from .services import (
+        ciclo_fechado,
+        congelar_resultados_ciclo,
+        descartar_resultados_congelados,
+    )
+
+    try:
+        if ciclo_fechado(instance):
+            congelar_resultados_ciclo(instance)
+        else:
+            descartar_resultados_congelados(instance)
+    except Exception as e:
+        print(
+            f"❌ Erro ao sincronizar resultados congelados do ciclo {instance.id}: {e}"
+        )
+
+
+# ============================================================================
+# SIGNALS DA CONFIGURAÇÃO DO SITE
+# ============================================================================
+
+
+@receiver(post_save, sender=ConfiguracaoSite)
+def publicar_configuracao_salva(sender, instance, **kwargs):
+    """
+    Atualiza a configuração cacheada (cópia local e compartilhada) ao salvar.
+    """
+    try:
+        ConfiguracaoSite.publicar_config(instance)
+    except Exception as e:
+        print(f"❌ Erro ao atualizar cache da configuração do site: {e}")
+
+
+@receiver(post_delete, sender=ConfiguracaoSite)
+def publicar_configuracao_excluida(sender, instance, **kwargs):
+    """
+    Invalida a configuração cacheada quando ela é excluída.
+    """
+    try:
+        ConfiguracaoSite.publicar_config(None)
+    except Exception as e:
+        print(f"❌ Erro ao invalidar cache da configuração do site: {e}")
+
+
+# ============================================================================
+# SIGNALS DAS ESTATÍSTICAS DE CACHE
+# ============================================================================
+
+
+@receiver(request_finished)
+def gravar_estatisticas_cache(sender, **kwargs):
+    """
+    Grava periodicamente (fora da requisição) os contadores de uso do
+    cache acumulados no processo.
+    """
+    try:
+        EstatisticaCache.gravar_se_necessario()
+    except Exception as e:
+        print(f"❌ Erro ao gravar estatísticas de cache: {e}")
@@ -1,5 +1,7 @@
 from django import template
-from rolepermissions.checkers import has_role as check_role, has_permission
+from rolepermissions.checkers import has_permission
+
+from ..utils import usuario_tem_role as check_role
 
 register = template.Library()
 
@@ -2,7 +2,7 @@
 Testes unitários para abstrações de models (BaseModel, Mixins, Managers).
 
 Testa funcionalidade de:
-    - BaseModel: __repr__, clean, delete, save
+    - BaseModel: __repr__, clean, delete, save, escrita em lote
     - TimestampMixin: data_criacao, data_atualizacao
     - SoftDeleteMixin: soft_delete, restore, is_deleted
     - SoftDeleteManager: get_queryset, all_with_deleted, deleted_only
@@ -12,7 +12,9 @@ Testa funcionalidade de:
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection, models
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from avaliacao_docente.models import (
@@ -21,7 +23,9 @@ from avaliacao_docente.models import (
     SoftDeleteMixin,
     AuditoriaMixin,
     SoftDeleteManager,
+    CategoriaPergunta,
 )
+from avaliacao_docente.models.base import lote_salvo
 from avaliacao_docente.enums import (
     StatusTurma,
     StatusMatricula,
@@ -424,6 +428,75 @@ class IntegracaoAbstracoesTest(TestCase):
         self.assertTrue(hasattr(turma, "is_deleted"))
 
 
+class EscritaEmLoteTest(TestCase):
+    """Testes de criar_em_lote / atualizar_em_lote do BaseModel"""
+
+    def setUp(self):
+        CategoriaPergunta.objects.create(nome="Didática")
+        self.lotes = []
+        lote_salvo.connect(self.registrar_lote, sender=CategoriaPergunta)
+        self.addCleanup(
+            lote_salvo.disconnect, self.registrar_lote, sender=CategoriaPergunta
+        )
+
+    def registrar_lote(self, sender, objetos, criados, campos, **kwargs):
+        self.lotes.append((len(objetos), criados, campos))
+
+    def test_criar_em_lote_valida_unicidade_com_uma_consulta(self):
+        categorias = [CategoriaPergunta(nome=f"Categoria {i}") for i in range(20)]
+
+        with CaptureQueriesContext(connection) as queries:
+            CategoriaPergunta.criar_em_lote(categorias)
+
+        selects = [q for q in queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(CategoriaPergunta.objects.count(), 21)
+        self.assertEqual(self.lotes, [(20, True, None)])
+
+    def test_lote_invalido_nao_grava_nada(self):
+        categorias = [
+            CategoriaPergunta(nome="Didática"),
+            CategoriaPergunta(nome="Nova"),
+            CategoriaPergunta(nome="Nova"),
+            CategoriaPergunta(nome="Longa", descricao="x" * 301),
+        ]
+
+        with self.assertRaises(ValidationError) as contexto:
+            CategoriaPergunta.criar_em_lote(categorias)
+
+        mensagens = contexto.exception.messages
+        self.assertEqual(
+            [mensagem.split(":")[0] for mensagem in mensagens],
+            ["Linha 1", "Linha 3", "Linha 4"],
+        )
+        self.assertEqual(CategoriaPergunta.objects.count(), 1)
+        self.assertEqual(self.lotes, [])
+
+    def test_atualizar_em_lote_dispara_apenas_sinal_do_lote(self):
+        categoria = CategoriaPergunta.objects.get(nome="Didática")
+        antes = categoria.data_atualizacao
+        categoria.ordem = 5
+        salvos = []
+        post_save.connect(salvos.append, sender=CategoriaPergunta)
+        self.addCleanup(post_save.disconnect, salvos.append, sender=CategoriaPergunta)
+
+        CategoriaPergunta.atualizar_em_lote([categoria], ["ordem"])
+
+        categoria.refresh_from_db()
+        self.assertEqual(categoria.ordem, 5)
+        self.assertGreater(categoria.data_atualizacao, antes)
+        self.assertEqual(salvos, [])
+        self.assertEqual(self.lotes, [(1, False, ["ordem", "data_atualizacao"])])
+
+    def test_atualizacao_ignora_a_propria_linha_na_unicidade(self):
+        categoria = CategoriaPergunta.objects.get(nome="Didática")
+        categoria.nome = "Didática"
+
+        CategoriaPergunta.atualizar_em_lote([categoria], ["nome"])
+
+        self.assertEqual(CategoriaPergunta.objects.count(), 1)
+
+
 class DocumentacaoTest(TestCase):
     """Testes para validar documentação das abstrações"""
 
@@ -0,0 +1,1759 @@
+"""
+Testes dos cálculos agregados (GROUP BY) usados pelos relatórios.
+
+Garante que os caminhos otimizados retornam exatamente os mesmos valores
+que o cálculo original em Python e com número de queries constante.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rolepermissions.roles import assign_role
+
+from .. import views
+from ..cache_versionado import (
+    ESCOPO_GLOBAL,
+    ESCOPO_PROFESSOR,
+    carimbos_dados,
+    incrementar_versao,
+    obter_versao,
+)
+from ..models import (
+    AvaliacaoDocente,
+    CategoriaPergunta,
+    CicloAvaliacao,
+    ConfiguracaoSite,
+    Curso,
+    Disciplina,
+    JobLembreteCicloTurma,
+    MatriculaTurma,
+    PerfilAluno,
+    PerfilProfessor,
+    PerguntaAvaliacao,
+    PeriodoLetivo,
+    QuestionarioAvaliacao,
+    QuestionarioPergunta,
+    RespostaAvaliacao,
+    ResultadoCicloCongelado,
+    ResumoAvaliacao,
+    ResumoCiclo,
+    SubmissaoAvaliacao,
+    Turma,
+)
+from .. import signals
+from ..questionario_compilado import obter_questionario_compilado
+from ..services import (
+    atualizar_resumos_ciclos,
+    calcular_historicos_professor_ciclos,
+    calcular_kpis_ciclo,
+    calcular_kpis_multiplos_ciclos,
+    calcular_media_historica_professor,
+    calcular_medias_historicas_professores,
+    calcular_metricas_professor,
+    calcular_metricas_professor_cached,
+    calcular_metricas_professores,
+    calcular_taxa_resposta_turma,
+    chave_cache_historico_professor,
+    chave_cache_metricas_professor,
+    congelar_resultados_ciclo,
+    criar_avaliacoes_turmas,
+    listar_professores_com_metricas,
+    montar_respostas_envio,
+    obter_alunos_pendentes_lembrete,
+    processar_matriculas_em_lote,
+    registrar_envio_avaliacao,
+)
+
+
+class AgregacaoBaseTestCase(TestCase):
+    """Monta um ciclo com questionário padrão, uma turma e alunos matriculados"""
+
+    TOTAL_ALUNOS = 4
+
+    def setUp(self):
+        # Camadas em memória do processo não são desfeitas junto com o banco
+        cache.clear()
+        ConfiguracaoSite.descartar_copia_local()
+        ConfiguracaoSite.obter_config()
+
+        self.user_admin = User.objects.create_user(
+            username="admin_agreg", password="senha123"
+        )
+        assign_role(self.user_admin, "admin")
+
+        user_prof = User.objects.create_user(
+            username="prof_agreg", first_name="Ana", last_name="Souza"
+        )
+        assign_role(user_prof, "professor")
+        self.professor = PerfilProfessor.objects.create(
+            user=user_prof, registro_academico="PAGREG"
+        )
+
+        self.periodo, _ = PeriodoLetivo.objects.get_or_create(
+            ano=2024, semestre=2, defaults={"nome": "Período 2024.2"}
+        )
+        self.curso = Curso.objects.create(
+            curso_nome="Informática",
+            curso_sigla="INFO",
+            coordenador_curso=self.professor,
+        )
+        self.disciplina = Disciplina.objects.create(
+            disciplina_nome="Banco de Dados",
+            disciplina_sigla="BD",
+            disciplina_tipo="Obrigatória",
+            curso=self.curso,
+            professor=self.professor,
+            periodo_letivo=self.periodo,
+        )
+        self.turma = Turma.objects.create(disciplina=self.disciplina, turno="noturno")
+
+        self.alunos = []
+        for i in range(self.TOTAL_ALUNOS):
+            user = User.objects.create_user(username=f"aluno_agreg_{i}")
+            assign_role(user, "aluno")
+            aluno = PerfilAluno.objects.create(user=user)
+            MatriculaTurma.objects.create(aluno=aluno, turma=self.turma)
+            self.alunos.append(aluno)
+
+        categoria = CategoriaPergunta.objects.create(nome="Didática", ordem=1)
+        self.questionario = QuestionarioAvaliacao.objects.create(
+            titulo="Questionário Padrão", criado_por=self.user_admin
+        )
+        self.perguntas = []
+        for ordem in (1, 2):
+            pergunta = PerguntaAvaliacao.objects.create(
+                enunciado=f"Pergunta {ordem}",
+                tipo="multipla_escolha",
+                categoria=categoria,
+                opcoes_multipla_escolha=list(AvaliacaoDocente.OPCOES_PESOS.keys()),
+            )
+            QuestionarioPergunta.objects.create(
+                questionario=self.questionario,
+                pergunta=pergunta,
+                ordem_no_questionario=ordem,
+            )
+            self.perguntas.append(pergunta)
+
+        self.ciclo = CicloAvaliacao.objects.create(
+            nome="Ciclo Agregação",
+            periodo_letivo=self.periodo,
+            data_inicio=timezone.now() - timedelta(days=1),
+            data_fim=timezone.now() + timedelta(days=10),
+            questionario=self.questionario,
+            criado_por=self.user_admin,
+        )
+        self.avaliacao = AvaliacaoDocente.objects.create(
+            ciclo=self.ciclo,
+            turma=self.turma,
+            professor=self.professor,
+            disciplina=self.disciplina,
+        )
+
+    def criar_professor_avaliado(self, indice, opcoes):
+        """Cria um professor com avaliação própria na mesma turma"""
+        user = User.objects.create_user(username=f"prof_lote_{indice}")
+        assign_role(user, "professor")
+        professor = PerfilProfessor.objects.create(
+            user=user, registro_academico=f"PLOTE{indice}"
+        )
+        disciplina = Disciplina.objects.create(
+            disciplina_nome=f"Disciplina {indice}",
+            disciplina_sigla=f"D{indice}",
+            disciplina_tipo="Obrigatória",
+            curso=self.curso,
+            professor=professor,
+            periodo_letivo=self.periodo,
+        )
+        turma = Turma.objects.create(disciplina=disciplina, turno="noturno")
+        for aluno in self.alunos:
+            MatriculaTurma.objects.create(aluno=aluno, turma=turma)
+        avaliacao = AvaliacaoDocente.objects.create(
+            ciclo=self.ciclo, turma=turma, professor=professor, disciplina=disciplina
+        )
+        self.responder(avaliacao, self.alunos[0], opcoes)
+        return professor
+
+    def criar_ciclo_com_turma(self, indice):
+        """Cria um ciclo extra com turma própria e um respondente"""
+        professor = self.criar_professor_avaliado(indice, ["Bom", "Bom"])
+        avaliacao = AvaliacaoDocente.objects.get(professor=professor)
+        ciclo = CicloAvaliacao.objects.create(
+            nome=f"Ciclo KPI {indice}",
+            periodo_letivo=self.periodo,
+            data_inicio=timezone.now() - timedelta(days=1),
+            data_fim=timezone.now() + timedelta(days=3),
+            questionario=self.questionario,
+            criado_por=self.user_admin,
+        )
+        AvaliacaoDocente.objects.filter(pk=avaliacao.pk).update(ciclo=ciclo)
+        ciclo.turmas.add(avaliacao.turma)
+        return ciclo
+
+    def responder(self, avaliacao, aluno, opcoes):
+        """
+        Registra as respostas de um aluno (uma opção por pergunta) e executa
+        os callbacks de commit (invalidação do cache)
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            for pergunta, opcao in zip(self.perguntas, opcoes):
+                RespostaAvaliacao.objects.create(
+                    avaliacao=avaliacao,
+                    aluno=aluno,
+                    pergunta=pergunta,
+                    valor_texto=opcao,
+                )
+
+
+class MediaQuestionarioPadraoTestCase(AgregacaoBaseTestCase):
+    """Testes de AvaliacaoDocente.calcular_media_geral_questionario_padrao"""
+
+    def test_sem_respostas_retorna_none(self):
+        self.assertIsNone(self.avaliacao.calcular_media_geral_questionario_padrao())
+
+    def test_resultado_igual_ao_calculo_por_pergunta(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Bom"])
+        self.responder(self.avaliacao, self.alunos[1], [" Regular ", "Bom"])
+        self.responder(self.avaliacao, self.alunos[2], ["Não atende", "Opção livre"])
+
+        resultado = self.avaliacao.calcular_media_geral_questionario_padrao()
+
+        esperado_p1 = self.avaliacao.calcular_media_pergunta(self.perguntas[0])
+        esperado_p2 = self.avaliacao.calcular_media_pergunta(self.perguntas[1])
+        self.assertEqual(esperado_p1["media"], 0.5)
+        self.assertEqual(esperado_p2["media"], 0.75)
+
+        self.assertEqual(resultado["total_perguntas"], 2)
+        self.assertEqual(resultado["media_geral"], 0.625)
+        detalhe_p1 = resultado["detalhes_por_pergunta"][self.perguntas[0].id]
+        self.assertEqual(detalhe_p1["enunciado"], "Pergunta 1")
+        for chave in ("media", "total_respondentes", "contagens", "moda"):
+            self.assertEqual(detalhe_p1[chave], esperado_p1[chave])
+            self.assertEqual(
+                resultado["detalhes_por_pergunta"][self.perguntas[1].id][chave],
+                esperado_p2[chave],
+            )
+
+    def test_executa_uma_unica_query(self):
+        for aluno in self.alunos:
+            self.responder(self.avaliacao, aluno, ["Bom", "Excelente"])
+
+        with CaptureQueriesContext(connection) as queries:
+            resultado = self.avaliacao.calcular_media_geral_questionario_padrao()
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(resultado["media_geral"], 0.875)
+
+    def test_calculo_em_lote_por_avaliacao(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Excelente"])
+
+        resultados = AvaliacaoDocente.calcular_medias_questionario_padrao(
+            [self.avaliacao.id, 0]
+        )
+
+        self.assertEqual(resultados[self.avaliacao.id]["media_geral"], 1.0)
+        self.assertIsNone(resultados[0])
+
+
+class ResumoAvaliacaoTestCase(AgregacaoBaseTestCase):
+    """Testes da manutenção incremental de ResumoAvaliacao"""
+
+    def assertResumoIgualRecalculo(self):
+        resumo = ResumoAvaliacao.objects.get(avaliacao=self.avaliacao)
+        incremental = (
+            resumo.contagens_por_pergunta,
+            resumo.total_respondentes,
+            resumo.total_respostas,
+            resumo.media_geral,
+            resumo.classificacao,
+        )
+        recalculado = ResumoAvaliacao.recalcular([self.avaliacao.id])[self.avaliacao.id]
+        self.assertEqual(
+            incremental,
+            (
+                recalculado.contagens_por_pergunta,
+                recalculado.total_respondentes,
+                recalculado.total_respostas,
+                recalculado.media_geral,
+                recalculado.classificacao,
+            ),
+        )
+        return recalculado
+
+    def test_respostas_atualizam_resumo_incrementalmente(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Bom"])
+        self.responder(self.avaliacao, self.alunos[1], ["Regular", "Bom"])
+
+        resumo = self.assertResumoIgualRecalculo()
+
+        self.assertEqual(resumo.total_respondentes, 2)
+        self.assertEqual(resumo.total_respostas, 4)
+        self.assertEqual(resumo.media_geral, 0.75)
+        self.assertEqual(resumo.classificacao, "Bom")
+        esperado = self.avaliacao.calcular_media_geral_questionario_padrao()
+        self.assertEqual(resumo.media_geral, esperado["media_geral"])
+
+    def test_exclusao_e_soft_delete_atualizam_resumo(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Excelente"])
+        self.responder(self.avaliacao, self.alunos[1], ["Não atende", "Não atende"])
+
+        RespostaAvaliacao.objects.filter(aluno=self.alunos[1]).first().hard_delete()
+        resumo = self.assertResumoIgualRecalculo()
+        self.assertEqual(resumo.total_respondentes, 2)
+        self.assertEqual(resumo.total_respostas, 3)
+
+        for resposta in RespostaAvaliacao.objects.filter(aluno=self.alunos[1]):
+            resposta.soft_delete()
+        resumo = ResumoAvaliacao.objects.get(avaliacao=self.avaliacao)
+        self.assertEqual(resumo.total_respondentes, 1)
+        self.assertEqual(resumo.media_geral, 1.0)
+        self.assertEqual(resumo.classificacao, "Excelente")
+
+    def test_obter_mapa_cria_resumos_faltantes(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        ResumoAvaliacao.objects.all().delete()
+
+        resumos = ResumoAvaliacao.obter_mapa([self.avaliacao.id])
+
+        self.assertEqual(resumos[self.avaliacao.id].media_geral, 0.75)
+        self.assertTrue(
+            ResumoAvaliacao.objects.filter(avaliacao=self.avaliacao).exists()
+        )
+
+    def test_alterar_pergunta_descarta_resumos_afetados(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Não atende"])
+        self.assertEqual(
+            ResumoAvaliacao.objects.get(avaliacao=self.avaliacao).media_geral, 0.5
+        )
+
+        pergunta = self.perguntas[1]
+        pergunta.ativo = False
+        pergunta.save()
+
+        self.assertFalse(
+            ResumoAvaliacao.objects.filter(avaliacao=self.avaliacao).exists()
+        )
+        resumo = ResumoAvaliacao.obter_mapa([self.avaliacao.id])[self.avaliacao.id]
+        self.assertEqual(resumo.media_geral, 1.0)
+        self.assertNotIn(str(pergunta.id), resumo.contagens_por_pergunta)
+
+        # Respostas enviadas depois também ignoram a pergunta inativa
+        self.responder(self.avaliacao, self.alunos[1], ["Excelente", "Não atende"])
+        self.assertResumoIgualRecalculo()
+
+    def test_metricas_professor_leem_resumo(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Bom"])
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Bom"])
+
+        metricas = calcular_metricas_professor(self.professor, self.ciclo)
+
+        self.assertEqual(metricas["avaliacoes_respondidas"], 1)
+        self.assertEqual(metricas["total_respondentes"], 2)
+        self.assertEqual(metricas["total_alunos_aptos"], self.TOTAL_ALUNOS)
+        self.assertEqual(metricas["taxa_resposta"], 50.0)
+        self.assertEqual(metricas["media_ciclo"], 0.8125)
+        self.assertEqual(metricas["classificacao_ciclo"], "Bom")
+
+    def test_relatorios_usam_resumo(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Bom"])
+        coordenador = User.objects.create_user(
+            username="coord_agreg", password="senha123"
+        )
+        assign_role(coordenador, "coordenador")
+        self.client.login(username="coord_agreg", password="senha123")
+
+        response = self.client.get(reverse("relatorio_avaliacoes"))
+        self.assertEqual(response.status_code, 200)
+        avaliacao = response.context["avaliacoes"][0]
+        self.assertEqual(avaliacao.respondentes, 1)
+        self.assertEqual(avaliacao.media_geral_padrao, 0.875)
+
+        response = self.client.get(reverse("relatorio_avaliacoes"), {"formato": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("0.875", response.content.decode("utf-8"))
+
+        response = self.client.get(
+            reverse("detalhe_professor_relatorio", args=[self.professor.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["estatisticas_gerais"]["media_geral"], 0.875)
+
+
+class MetricasProfessoresEmLoteTestCase(AgregacaoBaseTestCase):
+    """Testes de calcular_metricas_professores (métricas em lote)"""
+
+    def test_resultado_igual_ao_calculo_individual(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Bom"])
+        outro = self.criar_professor_avaliado(1, ["Regular", "Regular"])
+        sem_avaliacao = PerfilProfessor.objects.create(
+            user=User.objects.create_user(username="prof_sem_avaliacao"),
+            registro_academico="PSEM",
+        )
+
+        metricas = calcular_metricas_professores(
+            [self.professor, outro, sem_avaliacao], self.ciclo
+        )
+
+        for professor in (self.professor, outro, sem_avaliacao):
+            self.assertEqual(
+                metricas[professor.id],
+                calcular_metricas_professor(professor, self.ciclo),
+            )
+        self.assertEqual(metricas[outro.id]["media_ciclo"], 0.5)
+        self.assertEqual(metricas[sem_avaliacao.id]["total_avaliacoes"], 0)
+
+    def test_admin_matriculado_nao_conta_como_apto(self):
+        MatriculaTurma.objects.create(
+            aluno=PerfilAluno.objects.create(user=self.user_admin), turma=self.turma
+        )
+
+        metricas = calcular_metricas_professores([self.professor])[self.professor.id]
+
+        self.assertEqual(metricas["total_alunos_aptos"], self.TOTAL_ALUNOS)
+        self.assertEqual(len(self.avaliacao.alunos_aptos()), self.TOTAL_ALUNOS)
+
+    def test_numero_de_queries_independe_de_professores(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        professores = [self.professor]
+
+        with CaptureQueriesContext(connection) as queries_um:
+            calcular_metricas_professores(professores, self.ciclo)
+
+        for indice in range(3):
+            professores.append(self.criar_professor_avaliado(indice, ["Bom", "Bom"]))
+
+        with CaptureQueriesContext(connection) as queries_varios:
+            metricas = calcular_metricas_professores(professores, self.ciclo)
+
+        self.assertEqual(len(queries_um), len(queries_varios))
+        self.assertEqual(len(metricas), 4)
+
+    def test_listagem_usa_metricas_em_lote(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Excelente"])
+
+        listagem = listar_professores_com_metricas(ciclo=self.ciclo, busca="PAGREG")
+
+        self.assertEqual(len(listagem), 1)
+        self.assertEqual(listagem[0]["professor"], self.professor)
+        self.assertEqual(listagem[0]["media_ciclo"], 1.0)
+        self.assertEqual(listagem[0]["cursos"], "Informática")
+
+
+class MediasHistoricasEmLoteTestCase(AgregacaoBaseTestCase):
+    """Testes de calcular_medias_historicas_professores"""
+
+    def setUp(self):
+        super().setUp()
+        self.ciclo_anterior = CicloAvaliacao.objects.create(
+            nome="Ciclo Anterior",
+            periodo_letivo=self.periodo,
+            data_inicio=timezone.now() - timedelta(days=60),
+            data_fim=timezone.now() - timedelta(days=30),
+            questionario=self.questionario,
+            criado_por=self.user_admin,
+        )
+        self.avaliacao_anterior = AvaliacaoDocente.objects.create(
+            ciclo=self.ciclo_anterior,
+            turma=self.turma,
+            professor=self.professor,
+            disciplina=self.disciplina,
+        )
+
+    def test_media_historica_com_ciclo_excluido(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Excelente"])
+        self.responder(self.avaliacao_anterior, self.alunos[0], ["Regular", "Bom"])
+        outro = self.criar_professor_avaliado(1, ["Bom", "Bom"])
+        ResumoAvaliacao.objects.all().delete()
+
+        historicos = calcular_medias_historicas_professores(
+            [self.professor, outro], excluir_ciclo=self.ciclo
+        )
+
+        self.assertEqual(
+            historicos[self.professor.id],
+            {
+                "media_historica": 0.625,
+                "classificacao_historica": "Regular",
+                "total_ciclos": 1,
+                "total_avaliacoes_historicas": 1,
+            },
+        )
+        self.assertIsNone(historicos[outro.id]["media_historica"])
+        self.assertEqual(historicos[outro.id]["total_avaliacoes_historicas"], 0)
+
+        geral = calcular_media_historica_professor(self.professor)
+        self.assertEqual(geral["media_historica"], 0.8125)
+        self.assertEqual(geral["total_ciclos"], 2)
+        self.assertEqual(geral["total_avaliacoes_historicas"], 2)
+
+    def test_numero_de_queries_independe_de_professores(self):
+        self.responder(self.avaliacao_anterior, self.alunos[0], ["Bom", "Bom"])
+        professores = [self.professor]
+        ResumoAvaliacao.obter_mapa([self.avaliacao.id])
+
+        with CaptureQueriesContext(connection) as queries_um:
+            calcular_medias_historicas_professores(professores)
+
+        for indice in range(3):
+            professores.append(self.criar_professor_avaliado(indice, ["Bom", "Bom"]))
+
+        with CaptureQueriesContext(connection) as queries_varios:
+            historicos = calcular_medias_historicas_professores(professores)
+
+        self.assertEqual(len(queries_um), len(queries_varios))
+        self.assertEqual(historicos[professores[-1].id]["media_historica"], 0.75)
+
+    def test_historicos_por_ciclo_com_as_metricas_do_ciclo(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Bom"])
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Bom"])
+        self.responder(self.avaliacao_anterior, self.alunos[0], ["Regular", "Bom"])
+        congelar_resultados_ciclo(self.ciclo_anterior)
+
+        historicos = calcular_historicos_professor_ciclos(
+            self.professor, [self.ciclo, self.ciclo_anterior]
+        )
+
+        for ciclo in (self.ciclo, self.ciclo_anterior):
+            self.assertEqual(
+                historicos[ciclo.id]["metricas"],
+                calcular_metricas_professor(self.professor, ciclo),
+            )
+        info = historicos[self.ciclo.id]["avaliacoes"][0]
+        self.assertEqual(info["total_respondentes"], 2)
+        self.assertEqual(info["total_alunos_aptos"], self.TOTAL_ALUNOS)
+
+    def test_historicos_em_numero_fixo_de_queries(self):
+        ciclos = [self.ciclo]
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+
+        with CaptureQueriesContext(connection) as queries_um:
+            calcular_historicos_professor_ciclos(self.professor, ciclos)
+
+        for indice in range(3):
+            ciclo = CicloAvaliacao.objects.create(
+                nome=f"Ciclo Histórico {indice}",
+                periodo_letivo=self.periodo,
+                data_inicio=timezone.now() - timedelta(days=1),
+                data_fim=timezone.now() + timedelta(days=5),
+                questionario=self.questionario,
+                criado_por=self.user_admin,
+            )
+            avaliacao = AvaliacaoDocente.objects.create(
+                ciclo=ciclo,
+                turma=self.turma,
+                professor=self.professor,
+                disciplina=self.disciplina,
+            )
+            self.responder(avaliacao, self.alunos[indice], ["Bom", "Bom"])
+            ciclos.append(ciclo)
+
+        with CaptureQueriesContext(connection) as queries_varios:
+            historicos = calcular_historicos_professor_ciclos(self.professor, ciclos)
+
+        self.assertEqual(len(queries_um), len(queries_varios))
+        self.assertEqual(historicos[ciclos[-1].id]["metricas"]["media_ciclo"], 0.75)
+
+
+class SubmissaoAvaliacaoTestCase(AgregacaoBaseTestCase):
+    """Testes do registro de envio (SubmissaoAvaliacao)"""
+
+    def test_respostas_mantem_uma_submissao_por_aluno(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Regular"])
+        RespostaAvaliacao.objects.create(
+            avaliacao=self.avaliacao,
+            pergunta=self.perguntas[0],
+            valor_texto="Bom",
+            session_key="sessao-anonima",
+        )
+
+        self.assertEqual(self.avaliacao.submissoes.count(), 3)
+        self.assertTrue(
+            SubmissaoAvaliacao.aluno_respondeu(self.avaliacao, self.alunos[0])
+        )
+        self.assertEqual(
+            SubmissaoAvaliacao.contar_por_avaliacao([self.avaliacao.id]),
+            {self.avaliacao.id: 3},
+        )
+
+        respostas = list(RespostaAvaliacao.objects.filter(aluno=self.alunos[1]))
+        respostas[0].soft_delete()
+        self.assertTrue(
+            SubmissaoAvaliacao.aluno_respondeu(self.avaliacao, self.alunos[1])
+        )
+        respostas[1].hard_delete()
+        self.assertFalse(
+            SubmissaoAvaliacao.aluno_respondeu(self.avaliacao, self.alunos[1])
+        )
+
+    def test_responder_avaliacao_registra_submissao(self):
+        aluno = self.alunos[0]
+        self.client.force_login(aluno.user)
+        url = reverse("responder_avaliacao", args=[self.avaliacao.id])
+        dados = {f"pergunta_{pergunta.id}": "Bom" for pergunta in self.perguntas}
+
+        response = self.client.post(url, dados)
+
+        self.assertRedirects(
+            response,
+            reverse("visualizar_avaliacao", args=[self.avaliacao.id]),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(SubmissaoAvaliacao.objects.filter(aluno=aluno).count(), 1)
+
+        # Segunda tentativa é bloqueada pela submissão existente
+        self.client.post(url, dados)
+        self.assertEqual(RespostaAvaliacao.objects.filter(aluno=aluno).count(), 2)
+
+    def test_comando_reconstroi_submissoes(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Bom"])
+        SubmissaoAvaliacao.objects.all().delete()
+        SubmissaoAvaliacao.objects.create(
+            avaliacao=self.avaliacao, aluno=self.alunos[2]
+        )
+
+        call_command("reconstruir_submissoes_avaliacao", stdout=StringIO())
+
+        self.assertEqual(
+            set(self.avaliacao.submissoes.values_list("aluno_id", flat=True)),
+            {self.alunos[0].id, self.alunos[1].id},
+        )
+
+    def test_submissao_anonima_nao_bloqueia_lembretes(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        SubmissaoAvaliacao.objects.create(
+            avaliacao=self.avaliacao, session_key="sessao-anonima"
+        )
+        job, _ = JobLembreteCicloTurma.objects.get_or_create(
+            ciclo=self.ciclo, turma=self.turma
+        )
+
+        pendentes = obter_alunos_pendentes_lembrete(job)
+
+        self.assertEqual(
+            set(pendentes.values_list("id", flat=True)),
+            {aluno.id for aluno in self.alunos[1:]},
+        )
+
+    def test_taxa_resposta_turma_usa_submissoes(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+
+        taxa = calcular_taxa_resposta_turma(self.ciclo, self.turma)
+
+        self.assertEqual(taxa["respondentes"], 1)
+        self.assertEqual(taxa["alunos_aptos"], self.TOTAL_ALUNOS)
+
+
+class AlunosAptosTestCase(AgregacaoBaseTestCase):
+    """Testes das contagens de alunos aptos (exclusão de admins no banco)"""
+
+    def setUp(self):
+        super().setUp()
+        superusuario = User.objects.create_superuser(
+            username="super_agreg", email="super@agreg.com", password="senha123"
+        )
+        for user in (self.user_admin, superusuario):
+            MatriculaTurma.objects.create(
+                aluno=PerfilAluno.objects.create(user=user), turma=self.turma
+            )
+        cancelada = MatriculaTurma.objects.first()
+        cancelada.status = "cancelada"
+        cancelada.save()
+        self.total_aptos = self.TOTAL_ALUNOS - 1
+
+    def test_listagem_e_contagem_excluem_admins(self):
+        with self.assertNumQueries(1):
+            alunos = self.avaliacao.alunos_aptos()
+
+        self.assertEqual(len(alunos), self.total_aptos)
+        self.assertNotIn(self.user_admin, [aluno.user for aluno in alunos])
+        self.assertEqual(self.turma.count_alunos_matriculados(), self.total_aptos)
+        self.assertEqual(self.avaliacao.total_alunos_aptos(), self.total_aptos)
+
+    def test_contagem_em_lote_por_turma(self):
+        turma_vazia = Turma.objects.create(disciplina=self.disciplina, turno="matutino")
+
+        with self.assertNumQueries(1):
+            contagens = Turma.contar_alunos_aptos_por_turma(
+                [self.turma.id, turma_vazia.id]
+            )
+
+        self.assertEqual(contagens, {self.turma.id: self.total_aptos})
+
+    def test_total_avaliacoes_previstas_do_ciclo(self):
+        with self.assertNumQueries(2):
+            total = self.ciclo.total_avaliacoes_previstas()
+
+        self.assertEqual(total, self.total_aptos)
+
+
+class KpisCiclosEmLoteTestCase(AgregacaoBaseTestCase):
+    """Testes de calcular_kpis_multiplos_ciclos"""
+
+    def setUp(self):
+        super().setUp()
+        self.ciclo.turmas.add(self.turma)
+
+    def test_kpis_iguais_ao_calculo_por_turma(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Bom"])
+        outro_ciclo = self.criar_ciclo_com_turma(1)
+
+        kpis = calcular_kpis_multiplos_ciclos(
+            CicloAvaliacao.objects.filter(id__in=[self.ciclo.id, outro_ciclo.id])
+        )
+
+        for ciclo in (self.ciclo, outro_ciclo):
+            turmas = list(ciclo.turmas.all())
+            taxas = [calcular_taxa_resposta_turma(ciclo, turma) for turma in turmas]
+            self.assertEqual(kpis[ciclo.id]["total_turmas"], len(turmas))
+            self.assertEqual(
+                kpis[ciclo.id]["total_respondentes"],
+                sum(taxa["respondentes"] for taxa in taxas),
+            )
+            self.assertEqual(
+                kpis[ciclo.id]["taxa_media_resposta"],
+                sum(taxa["taxa_percentual"] for taxa in taxas) / len(taxas),
+            )
+        self.assertEqual(kpis[self.ciclo.id]["total_alunos_aptos"], self.TOTAL_ALUNOS)
+        self.assertEqual(kpis[self.ciclo.id]["taxa_media_resposta"], 50)
+        self.assertEqual(kpis[outro_ciclo.id]["taxa_media_resposta"], 25)
+        self.assertEqual(kpis[self.ciclo.id], calcular_kpis_ciclo(self.ciclo))
+
+    def test_numero_de_queries_independe_de_ciclos(self):
+        with CaptureQueriesContext(connection) as queries_um:
+            calcular_kpis_multiplos_ciclos(CicloAvaliacao.objects.all())
+
+        for indice in range(3):
+            self.criar_ciclo_com_turma(indice)
+
+        with CaptureQueriesContext(connection) as queries_varios:
+            kpis = calcular_kpis_multiplos_ciclos(CicloAvaliacao.objects.all())
+
+        self.assertEqual(len(queries_um), len(queries_varios))
+        self.assertEqual(len(kpis), 4)
+
+
+class ResumoCicloTestCase(AgregacaoBaseTestCase):
+    """Testes do snapshot de KPIs (ResumoCiclo) e do dashboard de gestão"""
+
+    def setUp(self):
+        super().setUp()
+        self.ciclo.turmas.add(self.turma)
+
+    def test_snapshot_igual_aos_kpis_calculados(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+
+        resumo = atualizar_resumos_ciclos([self.ciclo])[self.ciclo.id]
+        kpis = calcular_kpis_ciclo(self.ciclo)
+
+        self.assertEqual(resumo.como_kpis(), kpis)
+        self.assertEqual(resumo.taxa_media_resposta, 25)
+
+    def test_responder_avaliacao_marca_snapshot_desatualizado(self):
+        atualizar_resumos_ciclos([self.ciclo])
+        self.client.force_login(self.alunos[0].user)
+
+        with mock.patch(
+            "avaliacao_docente.services.calcular_kpis_multiplos_ciclos"
+        ) as calculo:
+            self.client.post(
+                reverse("responder_avaliacao", args=[self.avaliacao.id]),
+                {f"pergunta_{pergunta.id}": "Bom" for pergunta in self.perguntas},
+            )
+
+        calculo.assert_not_called()
+        resumo = ResumoCiclo.objects.get(ciclo=self.ciclo)
+        self.assertTrue(resumo.desatualizado)
+        self.assertEqual(resumo.total_respondentes, 0)
+
+        call_command("enviar_lembretes_ciclos", stdout=StringIO())
+
+        resumo.refresh_from_db()
+        self.assertFalse(resumo.desatualizado)
+        self.assertEqual(resumo.total_respondentes, 1)
+
+    def test_respostas_e_matriculas_fora_do_formulario_marcam_snapshot(self):
+        self.ciclo.turmas.add(self.turma)
+
+        def marcado():
+            resumo = ResumoCiclo.objects.get(ciclo=self.ciclo)
+            desatualizado = resumo.desatualizado
+            atualizar_resumos_ciclos([self.ciclo])
+            return desatualizado
+
+        atualizar_resumos_ciclos([self.ciclo])
+
+        # Resposta gravada pelo admin (post_save)
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        self.assertTrue(marcado())
+
+        # Matrícula individual e matrículas em lote
+        MatriculaTurma.objects.filter(
+            aluno=self.alunos[1], turma=self.turma
+        ).get().delete()
+        self.assertTrue(marcado())
+        processar_matriculas_em_lote(
+            "desmatricular", [self.turma.id], [self.alunos[2].id]
+        )
+        self.assertTrue(marcado())
+        self.assertEqual(
+            ResumoCiclo.objects.get(ciclo=self.ciclo).total_alunos_aptos,
+            self.TOTAL_ALUNOS - 2,
+        )
+
+    def test_dashboard_recalcula_snapshot_desatualizado(self):
+        atualizar_resumos_ciclos([self.ciclo])
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        ResumoCiclo.objects.filter(ciclo=self.ciclo).update(desatualizado=True)
+        coordenador = User.objects.create_user(username="coord_desatualizado")
+        assign_role(coordenador, "coordenador")
+        self.client.force_login(coordenador)
+
+        response = self.client.get(reverse("dashboard_gestao_ciclos"))
+
+        item = response.context["page_obj"][0]
+        self.assertEqual(item["kpis"]["total_respondentes"], 1)
+        self.assertFalse(ResumoCiclo.objects.get(ciclo=self.ciclo).desatualizado)
+
+    def test_dashboard_filtra_e_ordena_pelo_snapshot(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        ciclo_sem_respostas = self.criar_ciclo_com_turma(1)
+        RespostaAvaliacao.objects.filter(avaliacao__ciclo=ciclo_sem_respostas).delete()
+        coordenador = User.objects.create_user(username="coord_kpi")
+        assign_role(coordenador, "coordenador")
+        self.client.force_login(coordenador)
+        url = reverse("dashboard_gestao_ciclos")
+
+        response = self.client.get(url, {"limiar": "abaixo"})
+        ciclos = [item["ciclo"] for item in response.context["page_obj"]]
+        self.assertEqual(ciclos, [ciclo_sem_respostas])
+        self.assertTrue(ResumoCiclo.objects.filter(ciclo=self.ciclo).exists())
+
+        response = self.client.get(url, {"limiar": "atingido"})
+        item = response.context["page_obj"][0]
+        self.assertEqual(item["ciclo"], self.ciclo)
+        self.assertEqual(item["kpis"]["taxa_media_resposta"], 25)
+
+        response = self.client.get(url, {"ordenar": "taxa_media_resposta"})
+        ciclos = [item["ciclo"] for item in response.context["page_obj"]]
+        self.assertEqual(ciclos, [ciclo_sem_respostas, self.ciclo])
+
+    def test_status_de_saude_usa_limiar_atual(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        ciclo_proximo_do_fim = self.criar_ciclo_com_turma(1)
+        atualizar_resumos_ciclos(CicloAvaliacao.objects.all())
+        config = ConfiguracaoSite.obter_config()
+        config.limiar_minimo_percentual = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            config.save()
+
+        resumo = ResumoCiclo.objects.get(ciclo=ciclo_proximo_do_fim)
+        self.assertEqual(resumo.como_kpis()["status_saude"], "ok")
+
+        # Mudar o limiar não exige reconstruir o snapshot
+        config.limiar_minimo_percentual = 50
+        with self.captureOnCommitCallbacks(execute=True):
+            config.save()
+        kpis = resumo.como_kpis()
+        self.assertEqual(kpis["status_saude"], "alerta")
+        self.assertEqual(kpis["limiar_configurado"], 50)
+
+        coordenador = User.objects.create_user(username="coord_saude")
+        assign_role(coordenador, "coordenador")
+        self.client.force_login(coordenador)
+        response = self.client.get(
+            reverse("dashboard_gestao_ciclos"), {"ordenar": "status_saude"}
+        )
+        itens = list(response.context["page_obj"])
+        self.assertEqual(
+            [item["ciclo"] for item in itens], [ciclo_proximo_do_fim, self.ciclo]
+        )
+        self.assertEqual(
+            [item["kpis"]["status_saude"] for item in itens], ["alerta", "ok"]
+        )
+
+
+class ResultadoCicloCongeladoTestCase(AgregacaoBaseTestCase):
+    """Testes dos resultados congelados no encerramento do ciclo"""
+
+    def setUp(self):
+        super().setUp()
+        self.responder(self.avaliacao, self.alunos[0], ["Excelente", "Bom"])
+        self.coordenador = User.objects.create_user(username="coord_congelado")
+        assign_role(self.coordenador, "coordenador")
+        self.client.force_login(self.coordenador)
+
+    def encerrar(self):
+        self.client.post(reverse("encerrar_ciclo", args=[self.ciclo.id]))
+        self.ciclo.refresh_from_db()
+
+    def test_resultado_congelado_igual_ao_calculo_vivo(self):
+        metricas = calcular_metricas_professor(self.professor, self.ciclo)
+        resultado = self.avaliacao.calcular_media_geral_questionario_padrao()
+
+        congelado = congelar_resultados_ciclo(self.ciclo)
+
+        self.assertEqual(congelado.metricas_professor(self.professor.id), metricas)
+        self.assertEqual(congelado.resultado_questionario(self.avaliacao.id), resultado)
+        resumo = congelado.resumo_avaliacao(self.avaliacao.id)
+        self.assertEqual(resumo.total_respondentes, 1)
+        self.assertEqual(resumo.total_alunos_aptos, self.TOTAL_ALUNOS)
+        self.assertEqual(resumo.media_geral, 0.875)
+
+    def test_encerrar_ciclo_congela_resultados(self):
+        self.encerrar()
+        self.assertTrue(
+            ResultadoCicloCongelado.objects.filter(ciclo=self.ciclo).exists()
+        )
+
+        # Respostas gravadas após o encerramento não alteram os relatórios
+        self.responder(self.avaliacao, self.alunos[1], ["Não atende", "Não atende"])
+        self.assertEqual(
+            ResumoAvaliacao.objects.get(avaliacao=self.avaliacao).total_respondentes, 2
+        )
+
+        metricas = calcular_metricas_professor(self.professor, self.ciclo)
+        self.assertEqual(metricas["total_respondentes"], 1)
+        self.assertEqual(metricas["media_ciclo"], 0.875)
+
+        response = self.client.get(reverse("relatorio_avaliacoes"))
+        avaliacao = response.context["avaliacoes"][0]
+        self.assertEqual(avaliacao.respondentes, 1)
+        self.assertEqual(avaliacao.media_geral_padrao, 0.875)
+
+        response = self.client.get(
+            reverse("detalhe_calculo_avaliacao", args=[self.avaliacao.id])
+        )
+        self.assertEqual(response.context["dados"]["total_respondentes"], 1)
+        self.assertEqual(response.context["dados"]["media_geral"], 0.875)
+        self.assertEqual(response.context["dados"]["total_respostas"], 2)
+
+    def test_relatorio_de_ciclo_fechado_le_apenas_o_resultado_congelado(self):
+        categoria = self.perguntas[0].categoria
+        likert = PerguntaAvaliacao.objects.create(
+            enunciado="Nota geral", tipo="likert", categoria=categoria
+        )
+        texto = PerguntaAvaliacao.objects.create(
+            enunciado="Comentários", tipo="texto_livre", categoria=categoria
+        )
+        for ordem, pergunta in enumerate((likert, texto), start=3):
+            QuestionarioPergunta.objects.create(
+                questionario=self.questionario,
+                pergunta=pergunta,
+                ordem_no_questionario=ordem,
+            )
+
+        def responder_extras(aluno, nota, comentario):
+            with self.captureOnCommitCallbacks(execute=True):
+                RespostaAvaliacao.objects.create(
+                    avaliacao=self.avaliacao,
+                    aluno=aluno,
+                    pergunta=likert,
+                    valor_numerico=nota,
+                )
+                RespostaAvaliacao.objects.create(
+                    avaliacao=self.avaliacao,
+                    aluno=aluno,
+                    pergunta=texto,
+                    valor_texto=comentario,
+                )
+
+        responder_extras(self.alunos[0], 4, "Ótimas aulas")
+
+        def relatorio():
+            response = self.client.get(reverse("relatorio_avaliacoes"))
+            avaliacao = response.context["avaliacoes"][0]
+            numericas = [
+                stat
+                for stat in avaliacao.pergunta_stats()
+                if stat["tipo"] == "numerico"
+            ]
+            return (
+                response.context["ciclos_graficos_json"],
+                response.context["media_geral"],
+                [
+                    (stat["media"], stat["moda"], stat["respostas_count"])
+                    for stat in numericas
+                ],
+                [comentario.valor_texto for comentario in avaliacao.comentarios],
+            )
+
+        vivo = relatorio()
+        self.encerrar()
+        self.assertEqual(relatorio(), vivo)
+
+        # Respostas gravadas após o encerramento não aparecem no relatório
+        self.responder(self.avaliacao, self.alunos[1], ["Não atende", "Não atende"])
+        responder_extras(self.alunos[1], 1, "Não gostei")
+        with CaptureQueriesContext(connection) as queries:
+            congelado = relatorio()
+
+        self.assertEqual(congelado, vivo)
+        self.assertEqual(congelado[1], 4)
+        self.assertEqual(congelado[3], ["Ótimas aulas"])
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if RespostaAvaliacao._meta.db_table in query["sql"]
+            ]
+        )
+
+    def test_reativar_ciclo_descarta_resultados(self):
+        self.encerrar()
+        self.responder(self.avaliacao, self.alunos[1], ["Não atende", "Não atende"])
+
+        self.client.post(reverse("reativar_ciclo", args=[self.ciclo.id]))
+        self.ciclo.refresh_from_db()
+
+        self.assertFalse(
+            ResultadoCicloCongelado.objects.filter(ciclo=self.ciclo).exists()
+        )
+        metricas = calcular_metricas_professor(self.professor, self.ciclo)
+        self.assertEqual(metricas["total_respondentes"], 2)
+
+    def test_ciclo_finalizado_pela_data_congela_no_comando_periodico(self):
+        metricas = calcular_metricas_professor(self.professor, self.ciclo)
+        CicloAvaliacao.objects.filter(pk=self.ciclo.pk).update(
+            data_fim=timezone.now() - timedelta(minutes=1)
+        )
+        self.ciclo.refresh_from_db()
+
+        # Leituras não congelam: usam os resumos vivos até o congelamento
+        self.assertEqual(
+            calcular_metricas_professor(self.professor, self.ciclo), metricas
+        )
+        self.assertFalse(ResultadoCicloCongelado.objects.exists())
+
+        call_command("enviar_lembretes_ciclos", stdout=StringIO())
+
+        congelado = ResultadoCicloCongelado.objects.get(ciclo=self.ciclo)
+        self.assertEqual(congelado.metricas_professor(self.professor.id), metricas)
+
+    def test_media_historica_usa_resultados_congelados(self):
+        self.encerrar()
+        self.responder(self.avaliacao, self.alunos[1], ["Não atende", "Não atende"])
+
+        historico = calcular_media_historica_professor(self.professor)
+
+        self.assertEqual(historico["media_historica"], 0.875)
+        self.assertEqual(historico["total_ciclos"], 1)
+        self.assertEqual(historico["total_avaliacoes_historicas"], 1)
+
+
+class QuestionarioCompiladoTestCase(AgregacaoBaseTestCase):
+    """Testes do questionário compilado e cacheado"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_compila_perguntas_em_ordem(self):
+        questionario = obter_questionario_compilado(self.questionario.id)
+
+        self.assertEqual(
+            [pergunta.id for pergunta in questionario],
+            [pergunta.id for pergunta in self.perguntas],
+        )
+        primeira = questionario.perguntas[0]
+        self.assertEqual(primeira.ordem, 1)
+        self.assertEqual(primeira.categoria_nome, "Didática")
+        self.assertEqual(primeira.opcoes, tuple(AvaliacaoDocente.OPCOES_PESOS))
+        self.assertTrue(primeira.obrigatoria)
+
+    def test_leitura_cacheada_nao_consulta_banco(self):
+        obter_questionario_compilado(self.questionario.id)
+
+        # Resultado e carimbos de versão vêm da camada local do cache
+        with self.assertNumQueries(0):
+            obter_questionario_compilado(self.questionario.id)
+
+    def test_edicao_do_questionario_invalida_compilado(self):
+        obter_questionario_compilado(self.questionario.id)
+        coordenador = User.objects.create_user(username="coord_quest")
+        assign_role(coordenador, "coordenador")
+        self.client.force_login(coordenador)
+
+        self.client.post(
+            reverse("editar_questionario_perguntas", args=[self.questionario.id]),
+            {"remover_pergunta": "1", "pergunta_id": self.perguntas[0].id},
+        )
+
+        questionario = obter_questionario_compilado(self.questionario.id)
+        self.assertEqual([p.id for p in questionario], [self.perguntas[1].id])
+        self.assertEqual(questionario.perguntas[0].ordem, 1)
+
+    def test_formulario_e_visualizacao_usam_compilado(self):
+        aluno = self.alunos[0]
+        self.client.force_login(aluno.user)
+        url = reverse("responder_avaliacao", args=[self.avaliacao.id])
+
+        response = self.client.get(url)
+        self.assertContains(response, f'name="pergunta_{self.perguntas[1].id}"')
+        self.assertContains(response, "Pergunta 2")
+
+        dados = {f"pergunta_{pergunta.id}": "Bom" for pergunta in self.perguntas}
+        self.client.post(url, dados)
+
+        response = self.client.get(
+            reverse("visualizar_avaliacao", args=[self.avaliacao.id])
+        )
+        self.assertEqual(
+            [r.pergunta_compilada.id for r in response.context["respostas"]],
+            [pergunta.id for pergunta in self.perguntas],
+        )
+
+
+class RelatorioEtagTestCase(AgregacaoBaseTestCase):
+    """Testes das respostas 304 (ETag) dos relatórios"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        coordenador = User.objects.create_user(username="coord_etag")
+        assign_role(coordenador, "coordenador")
+        self.client.force_login(coordenador)
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+
+    def urls(self):
+        return [
+            (reverse("relatorio_avaliacoes"), {}),
+            (reverse("relatorio_avaliacoes"), {"formato": "csv"}),
+            (reverse("relatorio_professores"), {}),
+            (reverse("relatorio_professores"), {"formato": "csv"}),
+            (reverse("detalhe_professor_relatorio", args=[self.professor.id]), {}),
+        ]
+
+    def test_relatorios_sem_alteracao_respondem_304(self):
+        for url, params in self.urls():
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+
+                response = self.client.get(
+                    url, params, HTTP_IF_NONE_MATCH=response["ETag"]
+                )
+                self.assertEqual(response.status_code, 304)
+
+    def test_nova_resposta_muda_etag(self):
+        etags = [self.client.get(url, params)["ETag"] for url, params in self.urls()]
+
+        self.responder(self.avaliacao, self.alunos[1], ["Excelente", "Bom"])
+
+        for (url, params), etag in zip(self.urls(), etags):
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_filtro_por_ciclo_ignora_outros_ciclos(self):
+        outro_ciclo = self.criar_ciclo_com_turma(1)
+        outra_avaliacao = AvaliacaoDocente.objects.get(ciclo=outro_ciclo)
+        url = reverse("relatorio_avaliacoes")
+        params = {"ciclo": self.ciclo.id}
+        etag = self.client.get(url, params)["ETag"]
+
+        self.responder(outra_avaliacao, self.alunos[1], ["Bom", "Bom"])
+
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_sem_permissao_nao_gera_etag(self):
+        self.client.force_login(self.alunos[0].user)
+
+        response = self.client.get(reverse("relatorio_avaliacoes"))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(response.has_header("ETag"))
+
+
+class FragmentosRelatorioTestCase(AgregacaoBaseTestCase):
+    """Testes do cache de fragmentos (cards) dos relatórios"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        coordenador = User.objects.create_user(username="coord_fragmentos")
+        assign_role(coordenador, "coordenador")
+        self.client.force_login(coordenador)
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+
+    def estatisticas_calculadas(self, url):
+        """Renderiza o relatório e conta os cards de avaliação recalculados"""
+        with mock.patch.object(
+            views,
+            "_estatisticas_perguntas_avaliacao",
+            wraps=views._estatisticas_perguntas_avaliacao,
+        ) as estatisticas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return estatisticas.call_count, response
+
+    def test_card_sem_alteracao_e_servido_do_cache(self):
+        url = reverse("relatorio_avaliacoes")
+        calculadas, primeira = self.estatisticas_calculadas(url)
+        self.assertEqual(calculadas, 1)
+
+        calculadas, segunda = self.estatisticas_calculadas(url)
+
+        self.assertEqual(calculadas, 0)
+        self.assertEqual(primeira.content, segunda.content)
+
+    def test_nova_resposta_renderiza_card_novamente(self):
+        url = reverse("relatorio_avaliacoes")
+        self.estatisticas_calculadas(url)
+
+        self.responder(self.avaliacao, self.alunos[1], ["Excelente", "Bom"])
+        calculadas, response = self.estatisticas_calculadas(url)
+
+        self.assertEqual(calculadas, 1)
+        self.assertEqual(response.context["avaliacoes"][0].respondentes, 2)
+
+    def test_carimbo_muda_apenas_para_o_professor_alterado(self):
+        outro = self.criar_professor_avaliado(1, ["Bom", "Bom"])
+        pares = [(self.professor.id, self.ciclo.id), (outro.id, None)]
+        antes = carimbos_dados(pares)
+
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Bom"])
+        depois = carimbos_dados(pares)
+
+        self.assertNotEqual(antes[pares[0]], depois[pares[0]])
+        self.assertEqual(antes[pares[1]], depois[pares[1]])
+
+    def test_detalhe_do_professor_atualiza_card_do_ciclo(self):
+        url = reverse("detalhe_professor_relatorio", args=[self.professor.id])
+        antes = self.client.get(url).context["ciclos"][0]["versao_dados"]
+
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Bom"])
+        response = self.client.get(url)
+
+        self.assertNotEqual(response.context["ciclos"][0]["versao_dados"], antes)
+        self.assertContains(response, "<strong>2</strong> /")
+
+
+class EnvioRespostasTestCase(AgregacaoBaseTestCase):
+    """Testes do envio de respostas em lote (responder_avaliacao)"""
+
+    def setUp(self):
+        super().setUp()
+        self.aluno = self.alunos[0]
+        self.client.force_login(self.aluno.user)
+        self.url = reverse("responder_avaliacao", args=[self.avaliacao.id])
+
+    def dados(self, *opcoes):
+        return {
+            f"pergunta_{pergunta.id}": opcao
+            for pergunta, opcao in zip(self.perguntas, opcoes)
+        }
+
+    def test_envio_mantem_resumo_igual_ao_recalculo(self):
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Regular"])
+
+        self.client.post(self.url, self.dados("Excelente", "Bom"))
+
+        resumo = ResumoAvaliacao.objects.get(avaliacao=self.avaliacao)
+        recalculado = ResumoAvaliacao.recalcular([self.avaliacao.id])[self.avaliacao.id]
+        self.assertEqual(resumo.total_respostas, 4)
+        self.assertEqual(resumo.total_respondentes, 2)
+        self.assertEqual(
+            resumo.contagens_por_pergunta, recalculado.contagens_por_pergunta
+        )
+        self.assertEqual(resumo.media_geral, recalculado.media_geral)
+        self.assertTrue(SubmissaoAvaliacao.aluno_respondeu(self.avaliacao, self.aluno))
+
+    def test_envio_invalida_cache_uma_vez_sem_signals(self):
+        versao = obter_versao(ESCOPO_PROFESSOR, self.professor.id)
+
+        with mock.patch.object(
+            signals, "invalidar_cache_avaliacoes"
+        ) as invalidacao_signal, self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, self.dados("Bom", "Bom"))
+
+        invalidacao_signal.assert_not_called()
+        self.assertGreater(obter_versao(ESCOPO_PROFESSOR, self.professor.id), versao)
+
+    def test_envio_invalido_nao_grava_respostas(self):
+        response = self.client.post(self.url, self.dados("Bom"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(RespostaAvaliacao.objects.filter(aluno=self.aluno).exists())
+        self.assertFalse(SubmissaoAvaliacao.objects.filter(aluno=self.aluno).exists())
+
+    def test_envio_duplicado_e_rejeitado_por_inteiro(self):
+        perguntas = obter_questionario_compilado(self.questionario.id)
+        dados = self.dados("Bom", "Bom")
+        respostas, _ = montar_respostas_envio(
+            self.avaliacao, self.aluno, perguntas, dados
+        )
+        registrar_envio_avaliacao(self.avaliacao, self.aluno, respostas)
+
+        respostas, _ = montar_respostas_envio(
+            self.avaliacao, self.aluno, perguntas, dados
+        )
+        with self.assertRaises(IntegrityError):
+            registrar_envio_avaliacao(self.avaliacao, self.aluno, respostas)
+
+        resumo = ResumoAvaliacao.objects.get(avaliacao=self.avaliacao)
+        self.assertEqual(RespostaAvaliacao.objects.filter(aluno=self.aluno).count(), 2)
+        self.assertEqual(resumo.total_respondentes, 1)
+
+
+class CacheVersionadoTestCase(AgregacaoBaseTestCase):
+    """Testes da invalidação por versão das métricas cacheadas"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_resposta_invalida_metricas_cacheadas(self):
+        metricas = calcular_metricas_professor_cached(self.professor, self.ciclo)
+        self.assertEqual(metricas["total_respondentes"], 0)
+
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+
+        metricas = calcular_metricas_professor_cached(self.professor, self.ciclo)
+        self.assertEqual(metricas["total_respondentes"], 1)
+        metricas = calcular_metricas_professor_cached(self.professor)
+        self.assertEqual(metricas["total_respondentes"], 1)
+
+    def test_matricula_invalida_metricas_cacheadas(self):
+        metricas = calcular_metricas_professor_cached(self.professor, self.ciclo)
+        self.assertEqual(metricas["total_alunos_aptos"], self.TOTAL_ALUNOS)
+
+        user = User.objects.create_user(username="aluno_agreg_novo")
+        aluno = PerfilAluno.objects.create(user=user)
+        MatriculaTurma.objects.create(aluno=aluno, turma=self.turma)
+
+        metricas = calcular_metricas_professor_cached(self.professor, self.ciclo)
+        self.assertEqual(metricas["total_alunos_aptos"], self.TOTAL_ALUNOS + 1)
+
+    def test_invalidacao_restrita_ao_escopo(self):
+        outro_professor = self.criar_professor_avaliado(1, ["Bom", "Bom"])
+        versao_outro = obter_versao(ESCOPO_PROFESSOR, outro_professor.id)
+        versao_global = obter_versao(ESCOPO_GLOBAL)
+
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+
+        self.assertEqual(
+            obter_versao(ESCOPO_PROFESSOR, outro_professor.id), versao_outro
+        )
+        self.assertEqual(obter_versao(ESCOPO_GLOBAL), versao_global)
+
+    def test_incrementos_intercalados_geram_versoes_distintas(self):
+        versao = obter_versao(ESCOPO_PROFESSOR, self.professor.id)
+
+        # Os dois incrementos leem a versão antes de qualquer gravação
+        with mock.patch.object(cache, "get", return_value=versao):
+            primeira = incrementar_versao(ESCOPO_PROFESSOR, self.professor.id)
+            segunda = incrementar_versao(ESCOPO_PROFESSOR, self.professor.id)
+
+        self.assertNotIn(versao, (primeira, segunda))
+        self.assertNotEqual(primeira, segunda)
+        self.assertEqual(obter_versao(ESCOPO_PROFESSOR, self.professor.id), segunda)
+
+    def test_respostas_da_transacao_invalidam_uma_vez_no_commit(self):
+        versao = obter_versao(ESCOPO_PROFESSOR, self.professor.id)
+
+        with mock.patch(
+            "avaliacao_docente.cache_versionado.incrementar_versao",
+            wraps=incrementar_versao,
+        ) as incremento:
+            with self.captureOnCommitCallbacks(execute=True):
+                for aluno in self.alunos[:3]:
+                    for pergunta in self.perguntas:
+                        RespostaAvaliacao.objects.create(
+                            avaliacao=self.avaliacao,
+                            aluno=aluno,
+                            pergunta=pergunta,
+                            valor_texto="Bom",
+                        )
+                incremento.assert_not_called()
+
+        # Professor, ciclo e relatórios: um incremento cada para 6 respostas
+        self.assertEqual(incremento.call_count, 3)
+        self.assertGreater(obter_versao(ESCOPO_PROFESSOR, self.professor.id), versao)
+
+    def test_transacao_desfeita_nao_invalida(self):
+        versao = obter_versao(ESCOPO_PROFESSOR, self.professor.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                RespostaAvaliacao.objects.create(
+                    avaliacao=self.avaliacao,
+                    aluno=self.alunos[0],
+                    pergunta=self.perguntas[0],
+                    valor_texto="Bom",
+                )
+                raise RuntimeError("envio interrompido")
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(obter_versao(ESCOPO_PROFESSOR, self.professor.id), versao)
+
+        self.responder(self.avaliacao, self.alunos[1], ["Bom", "Bom"])
+        self.assertGreater(obter_versao(ESCOPO_PROFESSOR, self.professor.id), versao)
+
+    def test_exclusao_em_massa_invalida_uma_vez_no_commit(self):
+        for aluno in self.alunos[:3]:
+            self.responder(self.avaliacao, aluno, ["Bom", "Bom"])
+
+        with mock.patch(
+            "avaliacao_docente.cache_versionado.incrementar_versao",
+            wraps=incrementar_versao,
+        ) as incremento:
+            with self.captureOnCommitCallbacks(execute=True):
+                RespostaAvaliacao.objects.filter(avaliacao=self.avaliacao).delete()
+
+        self.assertEqual(incremento.call_count, 3)
+
+    def test_alteracao_de_questionario_invalida_tudo(self):
+        versao_global = obter_versao(ESCOPO_GLOBAL)
+
+        QuestionarioPergunta.objects.filter(pergunta=self.perguntas[1]).delete()
+
+        self.assertNotEqual(obter_versao(ESCOPO_GLOBAL), versao_global)
+
+    def test_comando_aquece_cache_dos_ciclos(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        out = StringIO()
+
+        call_command(
+            "aquecer_cache_relatorios", ciclo_id=[self.ciclo.id], workers=1, stdout=out
+        )
+
+        self.assertIn("2/2", out.getvalue())
+        for chave in (
+            chave_cache_metricas_professor(self.professor.id, self.ciclo.id),
+            chave_cache_metricas_professor(self.professor.id),
+            chave_cache_historico_professor(self.professor.id, self.ciclo.id),
+        ):
+            self.assertIsNotNone(cache.get(chave))
+        self.assertTrue(ResumoCiclo.objects.filter(ciclo=self.ciclo).exists())
+
+    def test_encerrar_ciclo_atualiza_apenas_resumos_do_ciclo(self):
+        self.responder(self.avaliacao, self.alunos[0], ["Bom", "Bom"])
+        coordenador = User.objects.create_user(username="coord_cache")
+        assign_role(coordenador, "coordenador")
+        self.client.force_login(coordenador)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("encerrar_ciclo", args=[self.ciclo.id]))
+
+        self.assertTrue(ResumoCiclo.objects.filter(ciclo=self.ciclo).exists())
+        self.assertTrue(
+            ResultadoCicloCongelado.objects.filter(ciclo=self.ciclo).exists()
+        )
+        # O cache por professor fica com o comando aquecer_cache_relatorios
+        self.assertIsNone(
+            cache.get(chave_cache_metricas_professor(self.professor.id, self.ciclo.id))
+        )
+
+
+class MatriculasEmLoteTestCase(AgregacaoBaseTestCase):
+    """Testes das matrículas em massa por conjunto (processar_matriculas_em_lote)"""
+
+    def setUp(self):
+        super().setUp()
+        self.outra_turma = Turma.objects.create(
+            disciplina=self.disciplina, turno="matutino"
+        )
+        self.novos = []
+        for i in range(2):
+            user = User.objects.create_user(username=f"aluno_massa_{i}")
+            self.novos.append(PerfilAluno.objects.create(user=user))
+
+        self.cancelada = MatriculaTurma.objects.get(
+            aluno=self.alunos[0], turma=self.turma
+        )
+        self.cancelada.status = "cancelada"
+        self.cancelada.save()
+        MatriculaTurma.objects.get(aluno=self.alunos[1], turma=self.turma).soft_delete()
+
+    def aluno_ids(self):
+        return [aluno.id for aluno in self.alunos + self.novos]
+
+    def test_matricular_insere_e_reativa_em_varias_turmas(self):
+        with CaptureQueriesContext(connection) as queries:
+            sucesso, erros = processar_matriculas_em_lote(
+                "matricular", [self.turma.id, self.outra_turma.id], self.aluno_ids()
+            )
+
+        # Turma: 2 novas + 1 reativada (a excluída é erro); outra turma: 6 novas
+        self.assertEqual((sucesso, erros), (9, 1))
+        self.cancelada.refresh_from_db()
+        self.assertEqual(self.cancelada.status, "ativa")
+        self.assertEqual(
+            MatriculaTurma.objects.filter(
+                turma=self.outra_turma, status="ativa"
+            ).count(),
+            6,
+        )
+        comandos = [
+            query["sql"].split()[0]
+            for query in queries
+            if MatriculaTurma._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(comandos.count("INSERT"), 1)
+        self.assertEqual(comandos.count("UPDATE"), 1)
+
+    def test_desmatricular_cancela_em_um_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            sucesso, erros = processar_matriculas_em_lote(
+                "desmatricular", [self.turma.id], self.aluno_ids()
+            )
+
+        self.assertEqual((sucesso, erros), (2, 0))
+        self.assertFalse(
+            MatriculaTurma.objects.filter(turma=self.turma, status="ativa").exists()
+        )
+        comandos = [
+            query["sql"].split()[0]
+            for query in queries
+            if MatriculaTurma._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(comandos.count("UPDATE"), 1)
+
+    def test_lote_invalida_cache_das_avaliacoes_da_turma(self):
+        versao = obter_versao(ESCOPO_PROFESSOR, self.professor.id)
+
+        processar_matriculas_em_lote("desmatricular", [self.turma.id], self.aluno_ids())
+
+        self.assertGreater(obter_versao(ESCOPO_PROFESSOR, self.professor.id), versao)
+
+    def test_view_matricula_em_massa_retorna_contagens(self):
+        self.client.force_login(self.user_admin)
+
+        response = self.client.post(
+            reverse("matricular_alunos_massa"),
+            {
+                "acao": "matricular",
+                "turma_id": self.turma.id,
+                "alunos_ids[]": [aluno.user_id for aluno in self.alunos + self.novos],
+            },
+        )
+
+        dados = response.json()
+        self.assertEqual((dados["sucesso_count"], dados["erro_count"]), (3, 1))
+        self.assertEqual(
+            dados["message"], "3 aluno(s) matriculado(s) com sucesso (1 erro(s))"
+        )
+
+    def test_view_matricula_em_massa_valida_ids(self):
+        self.client.force_login(self.user_admin)
+        url = reverse("matricular_alunos_massa")
+        alunos_ids = [aluno.user_id for aluno in self.novos]
+
+        response = self.client.post(
+            url,
+            {
+                "acao": "matricular",
+                "turma_ids[]": [str(self.turma.id), f"0{self.turma.id}"],
+                "alunos_ids[]": alunos_ids,
+            },
+        )
+        self.assertEqual(response.json()["sucesso_count"], 2)
+
+        response = self.client.post(
+            url,
+            {"acao": "matricular", "turma_ids[]": ["abc"], "alunos_ids[]": alunos_ids},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_tela_da_turma_mantem_get_or_create_e_exclusao(self):
+        self.client.force_login(self.user_admin)
+        url = reverse("gerenciar_alunos_turma", args=[self.turma.id])
+
+        self.client.post(
+            url,
+            {
+                "acao": "matricular",
+                "alunos_selecionados": [
+                    aluno.user_id for aluno in [self.alunos[0]] + self.novos
+                ],
+            },
+        )
+        # A matrícula cancelada não é reativada por esta tela
+        self.cancelada.refresh_from_db()
+        self.assertEqual(self.cancelada.status, "cancelada")
+        self.assertEqual(
+            MatriculaTurma.objects.filter(
+                turma=self.turma, aluno__in=self.novos, status="ativa"
+            ).count(),
+            2,
+        )
+
+        self.client.post(
+            url,
+            {
+                "acao": "desmatricular",
+                "alunos_selecionados": [
+                    aluno.user_id for aluno in [self.alunos[0]] + self.novos
+                ],
+            },
+        )
+        self.assertFalse(
+            MatriculaTurma.all_objects.filter(
+                turma=self.turma, aluno__in=[self.alunos[0]] + self.novos
+            ).exists()
+        )
+
+
+class VinculoTurmasCicloTestCase(AgregacaoBaseTestCase):
+    """Testes da criação em lote de avaliações e jobs ao vincular turmas"""
+
+    def setUp(self):
+        super().setUp()
+        self.turmas = []
+        for i in range(5):
+            disciplina = Disciplina.objects.create(
+                disciplina_nome=f"Disciplina Vínculo {i}",
+                disciplina_sigla=f"DV{i}",
+                disciplina_tipo="Obrigatória",
+                curso=self.curso,
+                professor=self.professor,
+                periodo_letivo=self.periodo,
+            )
+            turma = Turma.objects.create(disciplina=disciplina, turno="noturno")
+            MatriculaTurma.objects.create(aluno=self.alunos[i % 2], turma=turma)
+            self.turmas.append(turma)
+
+        self.novo_ciclo = CicloAvaliacao.objects.create(
+            nome="Ciclo Vínculo",
+            periodo_letivo=self.periodo,
+            data_inicio=timezone.now() - timedelta(days=1),
+            data_fim=timezone.now() + timedelta(days=10),
+            questionario=self.questionario,
+            criado_por=self.user_admin,
+            enviar_lembrete_email=False,
+        )
+
+    def inserts(self, queries, model):
+        return [
+            query
+            for query in queries
+            if query["sql"].startswith("INSERT")
+            and model._meta.db_table in query["sql"]
+        ]
+
+    def test_vincular_turmas_cria_avaliacoes_e_jobs_em_lote(self):
+        excluida = AvaliacaoDocente.objects.create(
+            ciclo=self.novo_ciclo,
+            turma=self.turmas[0],
+            professor=self.professor,
+            disciplina=self.turmas[0].disciplina,
+        )
+        excluida.soft_delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.novo_ciclo.turmas.add(*self.turmas)
+
+        self.assertEqual(len(self.inserts(queries, AvaliacaoDocente)), 1)
+        self.assertEqual(len(self.inserts(queries, JobLembreteCicloTurma)), 1)
+        self.assertEqual(
+            AvaliacaoDocente.all_objects.filter(ciclo=self.novo_ciclo).count(), 5
+        )
+        self.assertEqual(
+            JobLembreteCicloTurma.objects.filter(
+                ciclo=self.novo_ciclo, status="pendente"
+            ).count(),
+            5,
+        )
+
+    def test_notificacao_das_novas_avaliacoes_enviada_pelo_comando(self):
+        self.novo_ciclo.enviar_lembrete_email = True
+        self.novo_ciclo.save()
+
+        with mock.patch(
+            "avaliacao_docente.utils.enviar_email_notificacao_avaliacao"
+        ) as envio:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.novo_ciclo.turmas.add(*self.turmas)
+            envio.assert_not_called()
+
+            avaliacoes = AvaliacaoDocente.objects.filter(ciclo=self.novo_ciclo)
+            self.assertEqual(avaliacoes.filter(notificacao_pendente=True).count(), 5)
+
+            call_command("enviar_lembretes_ciclos", stdout=StringIO())
+            # Um aluno matriculado em cada turma
+            self.assertEqual(envio.call_count, 5)
+            self.assertFalse(avaliacoes.filter(notificacao_pendente=True).exists())
+
+            # Uma nova execução não repete os avisos
+            call_command("enviar_lembretes_ciclos", stdout=StringIO())
+            self.assertEqual(envio.call_count, 5)
+
+    def test_avaliacao_gravada_em_paralelo_nao_quebra_transacao(self):
+        criar_em_lote = AvaliacaoDocente.criar_em_lote
+
+        def criar_com_concorrente(novas, **kwargs):
+            # Outra transação grava a mesma chave depois da conferência
+            AvaliacaoDocente.objects.create(
+                ciclo=self.novo_ciclo,
+                turma=self.turmas[0],
+                professor=self.professor,
+                disciplina=self.turmas[0].disciplina,
+            )
+            return criar_em_lote(novas, **kwargs)
+
+        with mock.patch.object(
+            AvaliacaoDocente, "criar_em_lote", side_effect=criar_com_concorrente
+        ):
+            with transaction.atomic():
+                criadas = criar_avaliacoes_turmas(
+                    self.novo_ciclo, [turma.id for turma in self.turmas]
+                )
+                # A transação continua utilizável
+                self.assertEqual(
+                    AvaliacaoDocente.objects.filter(ciclo=self.novo_ciclo).count(), 5
+                )
+
+        self.assertEqual(len(criadas), 5)
+        self.assertTrue(all(avaliacao.pk for avaliacao in criadas))
+
+    def test_falha_no_envio_mantem_notificacao_pendente(self):
+        self.novo_ciclo.enviar_lembrete_email = True
+        self.novo_ciclo.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.novo_ciclo.turmas.add(*self.turmas)
+        avaliacoes = AvaliacaoDocente.objects.filter(ciclo=self.novo_ciclo)
+
+        with mock.patch(
+            "avaliacao_docente.utils.enviar_email_notificacao_avaliacao",
+            side_effect=Exception("SMTP indisponível"),
+        ):
+            call_command("enviar_lembretes_ciclos", stdout=StringIO())
+        self.assertEqual(avaliacoes.filter(notificacao_pendente=True).count(), 5)
+
+        with mock.patch(
+            "avaliacao_docente.utils.enviar_email_notificacao_avaliacao"
+        ) as envio:
+            call_command("enviar_lembretes_ciclos", stdout=StringIO())
+        self.assertEqual(envio.call_count, 5)
+        self.assertFalse(avaliacoes.filter(notificacao_pendente=True).exists())
+
+    @override_settings(CRON_SECRET="segredo-cron")
+    def test_rota_do_cron_exige_segredo_e_envia_notificacoes(self):
+        self.novo_ciclo.enviar_lembrete_email = True
+        self.novo_ciclo.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.novo_ciclo.turmas.add(*self.turmas)
+        url = reverse("enviar_lembretes_ciclos_cron")
+
+        with mock.patch(
+            "avaliacao_docente.utils.enviar_email_notificacao_avaliacao"
+        ) as envio:
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer errado")
+            self.assertEqual(response.status_code, 401)
+            envio.assert_not_called()
+
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer segredo-cron")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(envio.call_count, 5)
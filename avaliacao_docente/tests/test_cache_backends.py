@@ -0,0 +1,294 @@
+"""
+Testes do backend de cache em duas camadas (LRU local + DatabaseCache),
+da proteção contra stampede, da configuração do site cacheada e das
+estatísticas de uso do cache
+"""
+
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..cache_backends import CacheLocalLRU
+from ..models import ConfiguracaoSite, EstatisticaCache
+from .. import cache_versionado
+from ..cache_versionado import (
+    ESCOPO_CICLO,
+    ESCOPO_CONFIGURACAO,
+    incrementar_versao,
+    obter_ou_calcular,
+    obter_versao,
+)
+
+
+class CacheLocalLRUTestCase(TestCase):
+    """Testes da camada LRU local isolada"""
+
+    def test_remove_entrada_menos_usada(self):
+        lru = CacheLocalLRU(max_entradas=2, timeout=60)
+        lru.definir("a", 1)
+        lru.definir("b", 2)
+        lru.obter("a")
+        lru.definir("c", 3)
+
+        self.assertEqual(lru.obter("a"), (True, 1))
+        self.assertEqual(lru.obter("b"), (False, None))
+        self.assertEqual(lru.obter("c"), (True, 3))
+
+    def test_entrada_expira_pelo_timeout_local(self):
+        lru = CacheLocalLRU(max_entradas=10, timeout=60)
+        lru.definir("a", 1, timeout=0.01)
+        time.sleep(0.02)
+
+        self.assertEqual(lru.obter("a"), (False, None))
+
+
+class DatabaseCacheComCamadaLocalTestCase(TestCase):
+    """Testes do backend configurado em settings.CACHES"""
+
+    def setUp(self):
+        cache.clear()
+        cache.zerar_estatisticas()
+
+    def test_leitura_quente_nao_consulta_banco(self):
+        cache.set("chave_quente", {"valor": 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(cache.get("chave_quente"), {"valor": 1})
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cache.estatisticas()["hits_locais"], 1)
+
+    def test_leitura_do_banco_popula_camada_local(self):
+        cache.set("chave_banco", 42)
+        cache._local.limpar()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(cache.get("chave_banco"), 42)
+            self.assertEqual(cache.get("chave_banco"), 42)
+            self.assertIsNone(cache.get("chave_inexistente"))
+
+        self.assertEqual(len(queries), 2)
+        estatisticas = cache.estatisticas()
+        self.assertEqual(estatisticas["hits_compartilhados"], 1)
+        self.assertEqual(estatisticas["hits_locais"], 1)
+        self.assertEqual(estatisticas["misses"], 1)
+
+    def test_valor_devolvido_pode_ser_alterado(self):
+        cache.set("chave_lista", [1, 2])
+        cache.get("chave_lista").append(3)
+
+        self.assertEqual(cache.get("chave_lista"), [1, 2])
+
+    def test_contadores_de_versao_quentes_nao_consultam_banco(self):
+        obter_versao(ESCOPO_CICLO, 1)
+        versao = incrementar_versao(ESCOPO_CICLO, 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(obter_versao(ESCOPO_CICLO, 1), versao)
+
+        self.assertEqual(len(queries), 0)
+
+    def test_versao_de_outro_processo_vista_apos_validade_local(self):
+        versao = obter_versao(ESCOPO_CICLO, 1)
+
+        # Outro processo invalidou o escopo: só o banco tem a nova versão
+        DatabaseCache.set(
+            caches["default"], cache_versionado._chave_versao(ESCOPO_CICLO, 1), 7, None
+        )
+        self.assertEqual(obter_versao(ESCOPO_CICLO, 1), versao)
+
+        agora = time.monotonic()
+        with mock.patch(
+            "avaliacao_docente.cache_backends.time.monotonic",
+            return_value=agora + cache._timeout_versoes,
+        ):
+            self.assertEqual(obter_versao(ESCOPO_CICLO, 1), 7)
+
+
+class ProtecaoStampedeTestCase(TestCase):
+    """Testes de obter_ou_calcular (single-flight, valor antigo e renovação)"""
+
+    def setUp(self):
+        cache.clear()
+        self.calculos = 0
+
+    def calcular(self):
+        self.calculos += 1
+        return self.calculos
+
+    def test_calcula_uma_vez_enquanto_valido(self):
+        self.assertEqual(obter_ou_calcular("stampede", self.calcular, 60), 1)
+        self.assertEqual(obter_ou_calcular("stampede", self.calcular, 60), 1)
+        self.assertEqual(self.calculos, 1)
+
+    def test_entrada_vencida_e_recalculada(self):
+        obter_ou_calcular("stampede", self.calcular, 60)
+        entrada = cache.get("stampede")
+        entrada["expira_em"] = time.time() - 1
+        cache.set("stampede", entrada)
+
+        self.assertEqual(obter_ou_calcular("stampede", self.calcular, 60), 2)
+
+    def test_renovacao_antecipada_perto_do_vencimento(self):
+        obter_ou_calcular("stampede", self.calcular, 60)
+        entrada = cache.get("stampede")
+        entrada["expira_em"] = time.time() + 5
+        entrada["duracao"] = 1
+        cache.set("stampede", entrada)
+
+        # Sorteio alto: antecipação grande, renova antes de vencer
+        with mock.patch.object(cache_versionado.random, "random", return_value=0.9999):
+            self.assertEqual(obter_ou_calcular("stampede", self.calcular, 60), 2)
+
+        # Sorteio zero: sem antecipação, mantém o valor
+        with mock.patch.object(cache_versionado.random, "random", return_value=0.0):
+            self.assertEqual(obter_ou_calcular("stampede", self.calcular, 60), 2)
+
+    def test_lock_ocupado_serve_valor_vencido_da_mesma_chave(self):
+        obter_ou_calcular("stampede", self.calcular, 60)
+        entrada = cache.get("stampede")
+        entrada["expira_em"] = time.time() - 1
+        cache.set("stampede", entrada)
+        cache.add("lock:stampede", 1)
+
+        self.assertEqual(obter_ou_calcular("stampede", self.calcular, 60), 1)
+        self.assertEqual(self.calculos, 1)
+
+    def test_lock_ocupado_nao_serve_versao_invalidada(self):
+        obter_ou_calcular("stampede_v1", self.calcular, 60)
+        cache.add("lock:stampede_v2", 1)
+
+        with mock.patch.object(cache_versionado, "ESPERA_MAXIMA_LOCK", 0.1):
+            valor = obter_ou_calcular("stampede_v2", self.calcular, 60)
+
+        self.assertEqual(valor, 2)
+
+    def test_lock_ocupado_sem_valor_anterior_aguarda_e_calcula(self):
+        cache.add("lock:stampede", 1)
+
+        with mock.patch.object(cache_versionado, "ESPERA_MAXIMA_LOCK", 0.1):
+            self.assertEqual(obter_ou_calcular("stampede", self.calcular, 60), 1)
+
+
+class ConfiguracaoSiteCacheTestCase(TestCase):
+    """Testes da ConfiguracaoSite cacheada (cópia em processo + versão)"""
+
+    def setUp(self):
+        cache.clear()
+        ConfiguracaoSite.descartar_copia_local()
+        self.addCleanup(ConfiguracaoSite.descartar_copia_local)
+
+    def test_leituras_repetidas_nao_consultam_banco(self):
+        ConfiguracaoSite.obter_config()
+
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.assertEqual(ConfiguracaoSite.obter_config().pk, 1)
+
+    def test_salvar_atualiza_copia_local(self):
+        config = ConfiguracaoSite.obter_config()
+        config.frequencia_lembrete_horas = 12
+        with self.captureOnCommitCallbacks(execute=True):
+            config.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ConfiguracaoSite.obter_config().frequencia_lembrete_horas, 12
+            )
+
+    def test_update_em_massa_publica_nova_versao(self):
+        ConfiguracaoSite.obter_config()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ConfiguracaoSite.objects.filter(pk=1).update(max_lembretes_por_aluno=7)
+
+        self.assertEqual(ConfiguracaoSite.obter_config().max_lembretes_por_aluno, 7)
+
+    def test_alteracao_de_outro_processo_e_lida_pela_versao(self):
+        ConfiguracaoSite.obter_config()
+
+        # Outro processo salvou: banco e versão mudam, a cópia local não
+        QuerySet.update(
+            ConfiguracaoSite.objects.filter(pk=1), max_lembretes_por_aluno=7
+        )
+        incrementar_versao(ESCOPO_CONFIGURACAO)
+
+        self.assertEqual(ConfiguracaoSite.obter_config().max_lembretes_por_aluno, 7)
+
+    def test_transacao_desfeita_nao_publica_configuracao(self):
+        config = ConfiguracaoSite.obter_config()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                config.max_lembretes_por_aluno = 9
+                config.save()
+                raise RuntimeError("alteração cancelada")
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(ConfiguracaoSite.obter_config().max_lembretes_por_aluno, 3)
+
+    def test_instancia_devolvida_e_uma_copia(self):
+        ConfiguracaoSite.obter_config().max_lembretes_por_aluno = 99
+
+        self.assertEqual(ConfiguracaoSite.obter_config().max_lembretes_por_aluno, 3)
+
+
+class EstatisticaCacheTestCase(TestCase):
+    """Testes das estatísticas de uso do cache por prefixo"""
+
+    def setUp(self):
+        cache.clear()
+        EstatisticaCache.zerar()
+        self.addCleanup(EstatisticaCache.zerar)
+
+    def test_registra_acertos_faltas_e_recalculos(self):
+        for _ in range(3):
+            obter_ou_calcular(
+                "estatistica", lambda: list(range(100)), 60, prefixo="teste"
+            )
+        EstatisticaCache.gravar_pendentes()
+
+        estatistica = EstatisticaCache.objects.get(prefixo="teste")
+        self.assertEqual((estatistica.hits, estatistica.misses), (2, 1))
+        self.assertEqual(estatistica.recalculos, 1)
+        self.assertEqual(estatistica.taxa_acerto, 66.67)
+        self.assertGreater(estatistica.bytes_max, 100)
+
+    def test_gravacoes_somam_aos_contadores_existentes(self):
+        EstatisticaCache.registrar("teste", misses=1, duracao=0.5, tamanho=10)
+        EstatisticaCache.gravar_pendentes()
+        EstatisticaCache.registrar("teste", hits=4, duracao=0.1, tamanho=30)
+        EstatisticaCache.gravar_pendentes()
+
+        estatistica = EstatisticaCache.objects.get(prefixo="teste")
+        self.assertEqual((estatistica.hits, estatistica.misses), (4, 1))
+        self.assertEqual(estatistica.tempo_recalculo_max, 0.5)
+        self.assertAlmostEqual(estatistica.tempo_recalculo_medio, 0.3)
+        self.assertEqual((estatistica.bytes_medio, estatistica.bytes_max), (20, 30))
+
+    def test_requisicao_grava_apenas_apos_o_intervalo(self):
+        EstatisticaCache.registrar("teste", hits=1)
+        self.client.get("/")
+        self.assertFalse(EstatisticaCache.objects.exists())
+
+        with mock.patch.object(EstatisticaCache, "INTERVALO_GRAVACAO", 0):
+            self.client.get("/")
+        self.assertTrue(EstatisticaCache.objects.filter(prefixo="teste").exists())
+
+    def test_comando_exibe_e_zera_estatisticas(self):
+        EstatisticaCache.registrar("metricas_prof", hits=3, misses=1)
+        saida = StringIO()
+
+        call_command("estatisticas_cache", "--zerar", stdout=saida)
+
+        self.assertIn("metricas_prof", saida.getvalue())
+        self.assertIn("75.0%", saida.getvalue())
+        self.assertFalse(EstatisticaCache.objects.exists())
@@ -19,7 +19,13 @@ from ..models import (
     AvaliacaoDocente,
     RespostaAvaliacao,
 )
-from ..utils import gerenciar_perfil_usuario
+from ..utils import (
+    check_user_permission,
+    gerenciar_perfil_usuario,
+    get_user_role_name,
+    obter_roles_usuario,
+    processar_mudanca_role,
+)
 import datetime
 
 
@@ -80,6 +86,36 @@ class UserRoleTestCase(TestCase):
         self.assertFalse(has_role(self.user, "aluno"))
         self.assertTrue(has_role(self.user, "professor"))
 
+    def test_roles_carregadas_uma_vez_por_usuario(self):
+        """Verificações repetidas reaproveitam as roles resolvidas"""
+        from ..templatetags.user_tags import can_access_admin, get_user_role
+
+        assign_role(self.user, "coordenador")
+
+        with self.assertNumQueries(1):
+            self.assertTrue(check_user_permission(self.user, ["coordenador"]))
+            self.assertEqual(get_user_role(self.user), "Coordenador")
+            self.assertTrue(can_access_admin(self.user))
+            self.assertEqual(get_user_role_name(self.user), "Coordenador")
+
+    def test_processar_mudanca_role_invalida_roles(self):
+        """A mudança de role é refletida no mesmo objeto de usuário"""
+        assign_role(self.user, "aluno")
+        self.assertEqual(obter_roles_usuario(self.user), {"aluno"})
+
+        processar_mudanca_role(self.user, "professor")
+
+        self.assertEqual(obter_roles_usuario(self.user), {"professor"})
+        self.assertFalse(check_user_permission(self.user, ["aluno"]))
+
+    def test_superusuario_tem_todas_as_roles(self):
+        """Mantém o comportamento do django-role-permissions para superusuários"""
+        self.user.is_superuser = True
+
+        with self.assertNumQueries(0):
+            self.assertTrue(check_user_permission(self.user, ["admin"]))
+            self.assertEqual(get_user_role_name(self.user), "Administrador")
+
 
 class PerfilManagementTestCase(TestCase):
     """Testes para gerenciamento automático de perfis"""
@@ -29,6 +29,7 @@ from avaliacao_docente.models import (
 )
 from avaliacao_docente.services import (
     get_cache_key,
+    chave_cache_metricas_professor,
     calcular_metricas_professor_cached,
     obter_historico_professor_por_ciclo_cached,
     listar_professores_com_metricas,
@@ -269,7 +270,7 @@ def test_cache_invalidation():
     metricas_antes = calcular_metricas_professor_cached(professor, ciclo)
 
     # Verificar se está em cache
-    cache_key = get_cache_key("metricas_prof", professor.id, ciclo.id)
+    cache_key = chave_cache_metricas_professor(professor.id, ciclo.id)
     cached = cache.get(cache_key)
 
     if cached:
@@ -282,8 +283,8 @@ def test_cache_invalidation():
     print_info("\nSimulando atualização de resposta (trigger de signal)...")
     resposta.save()  # Isso deve invalidar o cache via signal
 
-    # Verificar se cache foi invalidado
-    cached_apos = cache.get(cache_key)
+    # Verificar se cache foi invalidado (a chave versionada mudou)
+    cached_apos = cache.get(chave_cache_metricas_professor(professor.id, ciclo.id))
 
     if cached_apos is None:
         print_success("✨ Cache invalidado automaticamente pelo signal!")
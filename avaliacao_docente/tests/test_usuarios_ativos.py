@@ -4,6 +4,8 @@ Testes para garantir que usuários desativados não apareçam em seleções
 
 from django.test import TestCase
 from django.contrib.auth.models import User
+from rolepermissions.checkers import has_role
+from rolepermissions.roles import assign_role
 from ..models import PerfilProfessor, PerfilAluno
 from ..forms import CursoForm, GerenciarRoleForm
 
@@ -136,3 +138,35 @@ class UsuariosAtivosTestCase(TestCase):
         # GerenciarRoleForm
         role_form = GerenciarRoleForm()
         self.assertIn(self.user_ativo, role_form.fields["usuario"].queryset)
+
+    def test_managers_excluem_admins_com_o_mesmo_criterio_de_has_role(self):
+        """Testa que admins (grupo ou superusuário) ficam fora de non_admin"""
+        user_admin = User.objects.create_user(username="admin_grupo")
+        assign_role(user_admin, "admin")
+        user_super = User.objects.create_superuser(
+            username="super", email="super@test.com", password="senha123"
+        )
+        user_coord = User.objects.create_user(username="coordenador")
+        assign_role(user_coord, "coordenador")
+
+        perfis = {}
+        for user in (user_admin, user_super, user_coord):
+            perfis[user] = (
+                PerfilProfessor.objects.create(user=user, registro_academico="X"),
+                PerfilAluno.objects.create(user=user),
+            )
+
+        professores = PerfilProfessor.non_admin.all()
+        alunos = PerfilAluno.non_admin.all()
+        for user, (professor, aluno) in perfis.items():
+            esperado_incluido = not has_role(user, "admin")
+            self.assertEqual(professor in professores, esperado_incluido)
+            self.assertEqual(aluno in alunos, esperado_incluido)
+
+    def test_manager_executa_uma_unica_query(self):
+        """Testa que a exclusão de admins é resolvida no banco (sem varrer usuários)"""
+        for i in range(5):
+            User.objects.create_user(username=f"extra_{i}")
+
+        with self.assertNumQueries(1):
+            list(PerfilProfessor.non_admin.all())
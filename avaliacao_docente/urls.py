@@ -219,6 +219,11 @@ urlpatterns = [
         views.encerrar_avaliacao,
         name="encerrar_avaliacao",
     ),
+    path(
+        "cron/enviar-lembretes-ciclos/",
+        views.enviar_lembretes_ciclos_cron,
+        name="enviar_lembretes_ciclos_cron",
+    ),
     path("", IndexView.as_view(), name="inicio"),
     path("perfil/", views.perfil_usuario, name="perfil_usuario"),
 ]
@@ -1,4 +1,70 @@
-from rolepermissions.checkers import has_role
+from django.conf import settings
+from rolepermissions.roles import RolesManager
+
+# Atributo do objeto User onde as roles resolvidas ficam guardadas. Como
+# request.user é instanciado a cada requisição, o conjunto é carregado uma
+# única vez por requisição e reaproveitado por views, templates e utils.
+ATRIBUTO_ROLES_USUARIO = "_roles_resolvidas"
+
+
+def obter_roles_usuario(user):
+    """
+    Retorna o conjunto (frozenset) de nomes de roles do usuário.
+
+    A consulta aos grupos é feita uma única vez por objeto User (usa o
+    prefetch de "groups" quando disponível) e o resultado fica anexado ao
+    próprio objeto. Use invalidar_roles_usuario() após alterar as roles.
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, ATRIBUTO_ROLES_USUARIO, None)
+    if roles is None:
+        nomes_roles = set(RolesManager.get_roles_names())
+        roles = frozenset(
+            grupo.name for grupo in user.groups.all() if grupo.name in nomes_roles
+        )
+        setattr(user, ATRIBUTO_ROLES_USUARIO, roles)
+    return roles
+
+
+def invalidar_roles_usuario(user):
+    """Descarta as roles resolvidas do usuário (recarregadas no próximo uso)."""
+    if user is None:
+        return
+
+    try:
+        delattr(user, ATRIBUTO_ROLES_USUARIO)
+    except AttributeError:
+        pass
+
+    # Um prefetch de "groups" também ficou desatualizado
+    prefetch = getattr(user, "_prefetched_objects_cache", None)
+    if prefetch:
+        prefetch.pop("groups", None)
+
+
+def usuario_tem_role(user, roles):
+    """
+    Equivalente a rolepermissions.checkers.has_role usando as roles
+    resolvidas do usuário (superusuários têm todas as roles, como no
+    django-role-permissions).
+
+    Args:
+        user: Instância do User
+        roles: Nome de uma role ou lista de nomes
+    """
+    if user is None or not user.is_authenticated:
+        return False
+
+    if user.is_superuser and getattr(
+        settings, "ROLEPERMISSIONS_SUPERUSER_SUPERPOWERS", True
+    ):
+        return True
+
+    if isinstance(roles, str):
+        roles = [roles]
+    return not obter_roles_usuario(user).isdisjoint(roles)
 
 
 def check_user_permission(user, roles):
@@ -8,23 +74,20 @@ def check_user_permission(user, roles):
     if not user.is_authenticated:
         return False
 
-    for role in roles:
-        if has_role(user, role):
-            return True
-    return False
+    return usuario_tem_role(user, roles)
 
 
 def get_user_role_name(user):
     """
     Retorna o nome da role do usuário
     """
-    if has_role(user, "admin"):
+    if usuario_tem_role(user, "admin"):
         return "Administrador"
-    elif has_role(user, "coordenador"):
+    elif usuario_tem_role(user, "coordenador"):
         return "Coordenador"
-    elif has_role(user, "professor"):
+    elif usuario_tem_role(user, "professor"):
         return "Professor"
-    elif has_role(user, "aluno"):
+    elif usuario_tem_role(user, "aluno"):
         return "Aluno"
     else:
         return "Sem role"
@@ -148,15 +211,15 @@ def processar_mudanca_role(usuario, nova_role):
         Lista de mensagens informativas sobre mudanças de perfil
     """
     from rolepermissions.roles import assign_role, remove_role
-    from rolepermissions.checkers import has_role
 
     # Remove todas as roles existentes
     for role in ["admin", "coordenador", "professor", "aluno"]:
-        if has_role(usuario, role):
+        if usuario_tem_role(usuario, role):
             remove_role(usuario, role)
 
     # Atribui a nova role
     assign_role(usuario, nova_role)
+    invalidar_roles_usuario(usuario)
 
     # Marcar que a role foi alterada manualmente
     mark_role_manually_changed(usuario)
@@ -4,11 +4,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.edit import FormView
 from django.views.generic import TemplateView
 from django.urls import reverse
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.http import JsonResponse, HttpResponse
+from django.views.decorators.http import condition
 from django.utils import timezone
 import csv
 from datetime import datetime
+from functools import partial
 from .models import (
     PerfilAluno,
     PerfilProfessor,
@@ -22,6 +24,7 @@ from .models import (
     RespostaAvaliacao,
     CicloAvaliacao,
     ConfiguracaoSite,
+    SubmissaoAvaliacao,
 )
 from .models import (
     QuestionarioAvaliacao,
@@ -30,9 +33,9 @@ from .models import (
 )
 from django.contrib.auth.models import User
 from rolepermissions.roles import assign_role, remove_role
-from rolepermissions.checkers import has_role
 from .utils import (
     check_user_permission,
+    usuario_tem_role,
     get_user_role_name,
     mark_role_manually_changed,
     reset_role_manual_flag,
@@ -197,7 +200,7 @@ def gerenciar_usuarios(request):
     filtro_status = request.GET.get("status", "").strip()
 
     # Obter todos os usuários ordenados - Força avaliação do queryset a cada request
-    usuarios_queryset = User.objects.all().order_by(
+    usuarios_queryset = User.objects.prefetch_related("groups").order_by(
         "username", "first_name", "last_name"
     )
 
@@ -382,7 +385,9 @@ def resetar_senha_usuario(request, usuario_id):
                 )
 
             # Não permite resetar senha de admin se não for admin
-            if has_role(usuario, "admin") and not has_role(request.user, "admin"):
+            if usuario_tem_role(usuario, "admin") and not usuario_tem_role(
+                request.user, "admin"
+            ):
                 return JsonResponse(
                     {
                         "error": "Apenas administradores podem resetar senha de outros administradores"
@@ -962,20 +967,26 @@ def gerenciar_alunos_turma(request, turma_id):
 
         if acao and alunos_selecionados:
             try:
-                usuarios = User.objects.filter(id__in=alunos_selecionados)
-                alunos = PerfilAluno.objects.filter(user__in=usuarios)
-
-                sucesso_count = 0
-                for aluno in alunos:
-                    if acao == "matricular":
-                        matricula, created = MatriculaTurma.objects.get_or_create(
-                            aluno=aluno, turma=turma, defaults={"status": "ativa"}
-                        )
-                        if created:
-                            sucesso_count += 1
-                    elif acao == "desmatricular":
-                        MatriculaTurma.objects.filter(aluno=aluno, turma=turma).delete()
-                        sucesso_count += 1
+                from .services import processar_matriculas_em_lote
+
+                aluno_ids = list(
+                    PerfilAluno.objects.filter(
+                        user_id__in=alunos_selecionados
+                    ).values_list("id", flat=True)
+                )
+
+                # Esta tela apenas cria as matrículas que faltam (sem reativar
+                # canceladas) e exclui as matrículas ao desmatricular; o
+                # cancelamento fica com a matrícula em massa (AJAX)
+                if acao == "matricular":
+                    sucesso_count, _ = processar_matriculas_em_lote(
+                        acao, [turma.id], aluno_ids, reativar=False
+                    )
+                elif acao == "desmatricular":
+                    MatriculaTurma.objects.filter(
+                        turma=turma, aluno_id__in=aluno_ids
+                    ).delete()
+                    sucesso_count = len(aluno_ids)
 
                 if acao == "matricular":
                     messages.success(
@@ -1412,48 +1423,39 @@ def matricular_alunos_massa(request):
         return JsonResponse({"error": "Método não permitido"}, status=405)
 
     try:
-        turma_id = request.POST.get("turma_id")
+        from .services import processar_matriculas_em_lote
+
+        # Uma turma (turma_id) ou várias (turma_ids[])
+        turma_ids = request.POST.getlist("turma_ids[]")
+        if request.POST.get("turma_id"):
+            turma_ids.append(request.POST.get("turma_id"))
         acao = request.POST.get("acao")  # 'matricular' ou 'desmatricular'
         alunos_ids = request.POST.getlist("alunos_ids[]")
 
-        if not turma_id or not acao or not alunos_ids:
+        if not turma_ids or not acao or not alunos_ids:
             return JsonResponse({"error": "Dados incompletos"}, status=400)
 
-        turma = get_object_or_404(Turma, id=turma_id)
+        if acao not in ("matricular", "desmatricular"):
+            return JsonResponse({"error": "Ação inválida"}, status=400)
 
-        # Buscar os perfis de aluno pelos IDs dos usuários
-        usuarios = User.objects.filter(id__in=alunos_ids)
-        alunos = PerfilAluno.objects.filter(user__in=usuarios)
+        try:
+            turma_ids = {int(turma_id) for turma_id in turma_ids}
+            alunos_ids = {int(aluno_id) for aluno_id in alunos_ids}
+        except ValueError:
+            return JsonResponse({"error": "Identificador inválido"}, status=400)
 
-        sucesso_count = 0
-        erro_count = 0
+        turmas = Turma.objects.filter(id__in=turma_ids).values_list("id", flat=True)
+        if len(turmas) != len(turma_ids):
+            return JsonResponse({"error": "Turma não encontrada"}, status=404)
 
-        for aluno in alunos:
-            try:
-                if acao == "matricular":
-                    matricula, created = MatriculaTurma.objects.get_or_create(
-                        aluno=aluno, turma=turma, defaults={"status": "ativa"}
-                    )
-                    if created:
-                        sucesso_count += 1
-                    else:
-                        # Se já existe, ativar se estiver inativa
-                        if matricula.status != "ativa":
-                            matricula.status = "ativa"
-                            matricula.save()
-                            sucesso_count += 1
-
-                elif acao == "desmatricular":
-                    matriculas = MatriculaTurma.objects.filter(
-                        aluno=aluno, turma=turma, status="ativa"
-                    )
-                    if matriculas.exists():
-                        matriculas.update(status="cancelada")
-                        sucesso_count += 1
+        # Buscar os perfis de aluno pelos IDs dos usuários
+        aluno_ids = PerfilAluno.objects.filter(user_id__in=alunos_ids).values_list(
+            "id", flat=True
+        )
 
-            except Exception as e:
-                erro_count += 1
-                print(f"Erro ao processar aluno {aluno.user.username}: {e}")
+        sucesso_count, erro_count = processar_matriculas_em_lote(
+            acao, turmas, aluno_ids
+        )
 
         if acao == "matricular":
             message = f"{sucesso_count} aluno(s) matriculado(s) com sucesso"
@@ -1513,8 +1515,7 @@ def listar_avaliacoes(request):
                 turma_id__in=turmas_aluno,
                 status__in=["pendente", "em_andamento"],
             )
-            .exclude(respostas__aluno=request.user.perfil_aluno)
-            .distinct()
+            .exclude(submissoes__aluno=request.user.perfil_aluno)
             .order_by("-data_criacao")
         )
 
@@ -1591,7 +1592,7 @@ def dashboard_gestao_ciclos(request):
         )
         return redirect("listar_avaliacoes")
 
-    from .services import calcular_kpis_multiplos_ciclos, obter_ciclos_em_alerta
+    from .services import garantir_resumos_ciclos, obter_ciclos_em_alerta
 
     # Filtros da requisição
     filtro_status = request.GET.get(
@@ -1630,31 +1631,58 @@ def dashboard_gestao_ciclos(request):
             turmas__disciplina__curso_id=filtro_curso
         ).distinct()
 
-    # Ordenação
-    ciclos_qs = ciclos_qs.order_by(ordenar_por)
-
-    # Calcular KPIs para todos os ciclos filtrados
-    ciclos_com_kpis = []
-    kpis_dict = calcular_kpis_multiplos_ciclos(ciclos_qs)
-
-    for ciclo in ciclos_qs:
-        kpis = kpis_dict.get(ciclo.id, {})
-
-        # Aplicar filtro de limiar (pós-processamento)
-        if filtro_limiar == "abaixo":
-            if kpis.get("taxa_media_resposta", 0) >= kpis.get("limiar_configurado", 10):
-                continue
-        elif filtro_limiar == "atingido":
-            if kpis.get("taxa_media_resposta", 0) < kpis.get("limiar_configurado", 10):
-                continue
-
-        ciclos_com_kpis.append({"ciclo": ciclo, "kpis": kpis})
+    # KPIs vêm do snapshot persistido (ResumoCiclo); ciclos sem snapshot
+    # têm o resumo calculado agora
+    garantir_resumos_ciclos(ciclos_qs)
+    ciclos_qs = ciclos_qs.select_related("resumo_kpis")
+
+    # Filtro de limiar aplicado no banco
+    limiar = ConfiguracaoSite.obter_config().limiar_minimo_percentual
+    if filtro_limiar == "abaixo":
+        ciclos_qs = ciclos_qs.filter(resumo_kpis__taxa_media_resposta__lt=limiar)
+    elif filtro_limiar == "atingido":
+        ciclos_qs = ciclos_qs.filter(resumo_kpis__taxa_media_resposta__gte=limiar)
+
+    # Ordenação (campos de KPI ordenam pelo snapshot; o status de saúde é
+    # avaliado com o limiar e a data atuais, como em ResumoCiclo.classificar_saude)
+    campo_ordenacao = ordenar_por.lstrip("-")
+    if campo_ordenacao == "status_saude":
+        from datetime import timedelta
+        from django.db.models import Case, CharField, Value, When
+
+        direcao = "-" if ordenar_por.startswith("-") else ""
+        ciclos_qs = ciclos_qs.annotate(
+            saude_atual=Case(
+                When(resumo_kpis__jobs_com_erro__gt=0, then=Value("erro")),
+                When(
+                    ativo=True,
+                    resumo_kpis__taxa_media_resposta__lt=limiar,
+                    data_fim__lt=now + timedelta(days=8),
+                    then=Value("alerta"),
+                ),
+                default=Value("ok"),
+                output_field=CharField(),
+            )
+        ).order_by(f"{direcao}saude_atual", "-data_inicio")
+    elif campo_ordenacao in ("taxa_media_resposta", "jobs_com_erro"):
+        direcao = "-" if ordenar_por.startswith("-") else ""
+        ciclos_qs = ciclos_qs.order_by(
+            f"{direcao}resumo_kpis__{campo_ordenacao}", "-data_inicio"
+        )
+    else:
+        ciclos_qs = ciclos_qs.order_by(ordenar_por)
 
-    # Paginação
-    paginator = Paginator(ciclos_com_kpis, 20)
+    # Paginação no banco: apenas as linhas visíveis são carregadas
+    paginator = Paginator(ciclos_qs, 20)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
+    ciclos_com_kpis = []
+    for ciclo in page_obj.object_list:
+        kpis = ciclo.resumo_kpis.como_kpis(limiar=limiar, agora=now)
+        ciclos_com_kpis.append({"ciclo": ciclo, "kpis": kpis})
+    page_obj.object_list = ciclos_com_kpis
+
     # Estatísticas gerais (cards do topo)
     total_ativos = CicloAvaliacao.objects.filter(encerrado=False).count()
     total_finalizados = CicloAvaliacao.objects.filter(encerrado=True).count()
@@ -1822,6 +1850,8 @@ def editar_questionario_perguntas(request, questionario_id):
         messages.error(request, "Você não tem permissão para editar questionários.")
         return redirect("listar_avaliacoes")
 
+    from .questionario_compilado import invalidar_questionario_compilado
+
     questionario = get_object_or_404(QuestionarioAvaliacao, id=questionario_id)
     categorias = CategoriaPergunta.objects.all()
 
@@ -1849,6 +1879,7 @@ def editar_questionario_perguntas(request, questionario_id):
                     ordem_no_questionario=ordem,
                 )
                 print(f"DEBUG: QuestionarioPergunta criado: {qp}")
+                invalidar_questionario_compilado(questionario.id)
                 messages.success(request, "Pergunta adicionada com sucesso!")
                 return redirect(
                     "editar_questionario_perguntas", questionario_id=questionario.id
@@ -1904,6 +1935,7 @@ def editar_questionario_perguntas(request, questionario_id):
                 )
                 if form.is_valid():
                     pergunta = form.save()
+                    invalidar_questionario_compilado(questionario.id)
                     messages.success(request, "Pergunta atualizada com sucesso!")
                     return redirect(
                         "editar_questionario_perguntas", questionario_id=questionario.id
@@ -1945,6 +1977,7 @@ def editar_questionario_perguntas(request, questionario_id):
             for i, qp in enumerate(perguntas_restantes, 1):
                 qp.ordem_no_questionario = i
                 qp.save()
+            invalidar_questionario_compilado(questionario.id)
             messages.success(request, "Pergunta removida com sucesso!")
             return redirect(
                 "editar_questionario_perguntas", questionario_id=questionario.id
@@ -1964,6 +1997,7 @@ def editar_questionario_perguntas(request, questionario_id):
                 f"DEBUG: Removendo QuestionarioPergunta {qp.id} (pergunta #{qp.pergunta_id} está inativa)"
             )
         qps_com_perguntas_inativas.delete()
+        invalidar_questionario_compilado(questionario.id)
         messages.info(
             request,
             f"✓ {count_orfas} referência(s) a perguntas removidas foram limpas.",
@@ -2046,7 +2080,7 @@ def detalhe_ciclo_avaliacao(request, ciclo_id):
 
     # Contar avaliações que têm pelo menos uma resposta
     avaliacoes_com_respostas = (
-        avaliacoes_docentes.filter(respostas__isnull=False).distinct().count()
+        avaliacoes_docentes.filter(submissoes__isnull=False).distinct().count()
     )
 
     context = {
@@ -2084,11 +2118,7 @@ def responder_avaliacao(request, avaliacao_id):
         return redirect("listar_avaliacoes")
 
     # Verificar se a avaliação já foi respondida
-    respostas_existentes = RespostaAvaliacao.objects.filter(
-        avaliacao=avaliacao, aluno=request.user.perfil_aluno
-    ).exists()
-
-    if respostas_existentes:
+    if SubmissaoAvaliacao.aluno_respondeu(avaliacao, request.user.perfil_aluno):
         messages.warning(request, "Esta avaliação já foi respondida.")
         return redirect("visualizar_avaliacao", avaliacao_id=avaliacao.id)
 
@@ -2104,46 +2134,34 @@ def responder_avaliacao(request, avaliacao_id):
         )
         return redirect("listar_avaliacoes")
 
-    # Pegar perguntas do questionário
-    perguntas_questionario = QuestionarioPergunta.objects.filter(
-        questionario=avaliacao.ciclo.questionario
-    ).order_by("ordem_no_questionario")
+    # Perguntas do questionário (compiladas e cacheadas por questionário)
+    from .questionario_compilado import obter_questionario_compilado
 
-    if request.method == "POST":
-        # Processar respostas
-        respostas_validas = True
-
-        for qp in perguntas_questionario:
-            campo_resposta = f"pergunta_{qp.pergunta.id}"
-            valor_resposta = request.POST.get(campo_resposta)
+    perguntas_questionario = obter_questionario_compilado(
+        avaliacao.ciclo.questionario_id
+    )
 
-            if not valor_resposta and qp.pergunta.obrigatoria:
-                messages.error(
-                    request, f'A pergunta "{qp.pergunta.enunciado}" é obrigatória.'
-                )
-                respostas_validas = False
-                continue
+    if request.method == "POST":
+        from django.db import IntegrityError
 
-            if valor_resposta:
-                # Criar resposta baseada no tipo
-                resposta_data = {
-                    "avaliacao": avaliacao,
-                    "aluno": request.user.perfil_aluno,
-                    "pergunta": qp.pergunta,
-                    # Agora sempre anônima conforme nova regra
-                    "anonima": True,
-                }
+        from .services import montar_respostas_envio, registrar_envio_avaliacao
 
-                if qp.pergunta.tipo in ["likert", "nps"]:
-                    resposta_data["valor_numerico"] = int(valor_resposta)
-                elif qp.pergunta.tipo == "sim_nao":
-                    resposta_data["valor_boolean"] = valor_resposta.lower() == "sim"
-                else:
-                    resposta_data["valor_texto"] = valor_resposta
+        # Validar o envio inteiro em memória antes de gravar qualquer resposta
+        aluno = request.user.perfil_aluno
+        respostas, erros = montar_respostas_envio(
+            avaliacao, aluno, perguntas_questionario, request.POST
+        )
+        for erro in erros:
+            messages.error(request, erro)
 
-                RespostaAvaliacao.objects.create(**resposta_data)
+        if not erros:
+            try:
+                registrar_envio_avaliacao(avaliacao, aluno, respostas)
+            except IntegrityError:
+                # Envio concorrente do mesmo aluno já gravou as respostas
+                messages.warning(request, "Esta avaliação já foi respondida.")
+                return redirect("visualizar_avaliacao", avaliacao_id=avaliacao.id)
 
-        if respostas_validas:
             messages.success(request, "Avaliação respondida com sucesso!")
             return redirect("visualizar_avaliacao", avaliacao_id=avaliacao.id)
 
@@ -2166,9 +2184,9 @@ def visualizar_avaliacao(request, avaliacao_id):
     pode_visualizar = False
     if hasattr(request.user, "perfil_aluno"):
         # Verificar se o aluno está matriculado na turma e se há respostas do aluno para esta avaliação
-        respostas_aluno = RespostaAvaliacao.objects.filter(
-            avaliacao=avaliacao, aluno=request.user.perfil_aluno
-        ).exists()
+        respostas_aluno = SubmissaoAvaliacao.aluno_respondeu(
+            avaliacao, request.user.perfil_aluno
+        )
 
         matricula_ativa = request.user.perfil_aluno.matriculas.filter(
             turma=avaliacao.turma, status="ativa"
@@ -2190,27 +2208,29 @@ def visualizar_avaliacao(request, avaliacao_id):
         )
         return redirect("listar_avaliacoes")
 
+    # Perguntas do questionário (compiladas e cacheadas por questionário)
+    from .questionario_compilado import obter_questionario_compilado
+
+    perguntas = {
+        pergunta.id: pergunta
+        for pergunta in obter_questionario_compilado(avaliacao.ciclo.questionario_id)
+    }
+    ordem_perguntas = {pergunta_id: i for i, pergunta_id in enumerate(perguntas)}
+
     # Pegar respostas
     # Ajuste: alunos só podem visualizar as PRÓPRIAS respostas; demais perfis (professor da avaliação,
     # coordenador, admin) continuam podendo ver o conjunto completo.
+    respostas = RespostaAvaliacao.objects.filter(
+        avaliacao=avaliacao, pergunta_id__in=perguntas
+    ).order_by("id")
     if hasattr(request.user, "perfil_aluno"):
-        respostas = (
-            RespostaAvaliacao.objects.filter(
-                avaliacao=avaliacao, aluno=request.user.perfil_aluno
-            )
-            .select_related("pergunta")
-            .filter(pergunta__questionarios__questionario=avaliacao.ciclo.questionario)
-            .order_by("pergunta__questionarios__ordem_no_questionario")
-            .distinct()
-        )
-    else:
-        respostas = (
-            RespostaAvaliacao.objects.filter(avaliacao=avaliacao)
-            .select_related("pergunta")
-            .filter(pergunta__questionarios__questionario=avaliacao.ciclo.questionario)
-            .order_by("pergunta__questionarios__ordem_no_questionario")
-            .distinct()
-        )
+        respostas = respostas.filter(aluno=request.user.perfil_aluno)
+
+    # Ordem do questionário, com a pergunta compilada anexada a cada resposta
+    respostas = sorted(respostas, key=lambda r: ordem_perguntas[r.pergunta_id])
+    for resposta in respostas:
+        resposta.pergunta_compilada = perguntas[resposta.pergunta_id]
+
     context = {
         "avaliacao": avaliacao,
         "respostas": respostas,
@@ -2219,13 +2239,217 @@ def visualizar_avaliacao(request, avaliacao_id):
     return render(request, "avaliacoes/visualizar_avaliacao.html", context)
 
 
+def _etag_relatorio(request, nome, professor_id=None, ciclo_id=None):
+    """
+    ETag de um relatório (ver services.etag_relatorio) para respostas 304.
+    Sem permissão não há ETag, e a view segue o fluxo normal.
+    """
+    if not check_user_permission(request.user, ["coordenador", "admin"]):
+        return None
+
+    from .services import etag_relatorio
+
+    return etag_relatorio(
+        nome, request.GET, request.user, professor_id=professor_id, ciclo_id=ciclo_id
+    )
+
+
+def _estatisticas_numericas_congeladas(linhas, pergunta_id):
+    """
+    Média, moda e contagem de uma pergunta numérica a partir das respostas
+    congeladas (formato de calcular_estatisticas_respostas).
+    """
+    contagens = {}
+    for linha in linhas:
+        if linha["pergunta_id"] == pergunta_id and linha["tipo"] in ("likert", "nps"):
+            contagens[linha["valor"]] = contagens.get(linha["valor"], 0) + linha["qtd"]
+    if not contagens:
+        return None
+
+    count = sum(contagens.values())
+    return {
+        "media": sum(valor * qtd for valor, qtd in contagens.items()) / count,
+        "moda": max(contagens, key=contagens.get),
+        "count": count,
+    }
+
+
+def _estatisticas_perguntas_avaliacao(
+    avaliacao, resumo, questionario, respostas_congeladas=None
+):
+    """
+    Estatísticas por pergunta de um card do relatório de avaliações.
+
+    Múltipla escolha vem do resumo persistido; perguntas numéricas
+    (likert, nps) vêm das respostas congeladas em ciclos fechados ou são
+    calculadas a partir das respostas.
+    """
+    pergunta_stats = []
+
+    for pergunta in questionario:
+        # Tratamento para perguntas de múltipla escolha (questionário padrão)
+        if pergunta.tipo == "multipla_escolha":
+            resultado = resumo.resultado_pergunta(pergunta.id)
+            if resultado:
+                pergunta_stats.append(
+                    {
+                        "pergunta": pergunta,
+                        "tipo": "multipla_escolha",
+                        "media": resultado["media"],
+                        "moda": resultado.get("moda", "N/A"),
+                        "contagens": resultado["contagens"],
+                        "respostas_count": resultado["total_respondentes"],
+                        "classificacao": avaliacao.get_classificacao_media(
+                            resultado["media"]
+                        ),
+                    }
+                )
+        else:
+            # Tratamento para perguntas numéricas (likert, nps)
+            if respostas_congeladas is not None:
+                stats = _estatisticas_numericas_congeladas(
+                    respostas_congeladas, pergunta.id
+                )
+            else:
+                respostas_pergunta = RespostaAvaliacao.objects.filter(
+                    avaliacao__ciclo=avaliacao.ciclo,
+                    avaliacao__professor=avaliacao.professor,
+                    avaliacao__turma=avaliacao.turma,
+                    pergunta_id=pergunta.id,
+                    valor_numerico__isnull=False,
+                )
+                stats = calcular_estatisticas_respostas(respostas_pergunta)
+            if stats:
+                pergunta_stats.append(
+                    {
+                        "pergunta": pergunta,
+                        "tipo": "numerico",
+                        "media": round(stats["media"], 2),
+                        "moda": stats["moda"],
+                        "respostas_count": stats["count"],
+                    }
+                )
+
+    return pergunta_stats
+
+
+# Ordem dos tipos de pergunta nos gráficos por ciclo
+ORDEM_TIPOS_GRAFICO = {"likert": 0, "nps": 0, "multipla_escolha": 1, "sim_nao": 2}
+
+
+def _linhas_grafico_ciclo(ciclo, congelado, professor_id):
+    """
+    Respostas do ciclo agrupadas por pergunta e valor para os gráficos.
+
+    Ciclos fechados leem o resultado congelado; os demais (e congelamentos
+    anteriores ao registro das respostas agrupadas) consultam as respostas.
+    """
+    from .services import contar_respostas_por_valor
+
+    if congelado is not None:
+        linhas = []
+        for avaliacao_id, dados in congelado.avaliacoes.items():
+            if professor_id and str(dados["professor_id"]) != str(professor_id):
+                continue
+            respostas = congelado.respostas_avaliacao(avaliacao_id)
+            if respostas is None:
+                break
+            linhas.extend(respostas)
+        else:
+            return linhas
+
+    respostas = RespostaAvaliacao.objects.filter(avaliacao__ciclo=ciclo)
+    if professor_id:
+        respostas = respostas.filter(avaliacao__professor_id=professor_id)
+    return contar_respostas_por_valor(respostas)
+
+
+def _perguntas_grafico(linhas):
+    """
+    Monta os dados de gráfico por pergunta (contagens e média das numéricas)
+    a partir das respostas agrupadas de contar_respostas_por_valor.
+    """
+    perguntas_data = {}
+    somas = {}
+
+    for linha in sorted(
+        linhas,
+        key=lambda linha: (
+            ORDEM_TIPOS_GRAFICO.get(linha["tipo"], 3),
+            linha["pergunta_id"],
+        ),
+    ):
+        pid = linha["pergunta_id"]
+        tipo = linha["tipo"]
+        if pid not in perguntas_data:
+            # Inicializa estrutura conforme o tipo
+            if tipo == "likert":
+                contagens = {str(i): 0 for i in range(1, 6)}
+            elif tipo == "nps":
+                contagens = {str(i): 0 for i in range(0, 11)}
+            elif tipo == "sim_nao":
+                contagens = {"Sim": 0, "Não": 0}
+            else:
+                contagens = {}
+            perguntas_data[pid] = {
+                "id": pid,
+                "enunciado": linha["enunciado"],
+                "tipo": tipo,
+                "contagens": contagens,
+                "media": "N/A",
+            }
+
+        if tipo in ("likert", "nps"):
+            chave = str(linha["valor"])
+            soma, total = somas.get(pid, (0, 0))
+            somas[pid] = (soma + linha["valor"] * linha["qtd"], total + linha["qtd"])
+        elif tipo == "multipla_escolha":
+            valor = linha["valor"]
+            chave = valor[:30] + "..." if len(valor) > 30 else valor
+        elif tipo == "sim_nao":
+            chave = "Sim" if linha["valor"] else "Não"
+        else:
+            # Texto livre: apenas contagem
+            chave = "Total de respostas"
+
+        contagens = perguntas_data[pid]["contagens"]
+        contagens[chave] = contagens.get(chave, 0) + linha["qtd"]
+
+    # Médias para perguntas numéricas
+    for pid, (soma, total) in somas.items():
+        perguntas_data[pid]["media"] = round(soma / total, 2)
+
+    return list(perguntas_data.values())
+
+
+def _etag_relatorio_avaliacoes(request):
+    return _etag_relatorio(
+        request,
+        "relatorio_avaliacoes",
+        professor_id=request.GET.get("professor"),
+        ciclo_id=request.GET.get("ciclo"),
+    )
+
+
+def _etag_relatorio_professores(request):
+    # As médias históricas dependem de todos os ciclos, mesmo com filtro
+    return _etag_relatorio(request, "relatorio_professores")
+
+
+def _etag_detalhe_professor_relatorio(request, professor_id):
+    return _etag_relatorio(
+        request, "detalhe_professor_relatorio", professor_id=professor_id
+    )
+
+
 @login_required
+@condition(etag_func=_etag_relatorio_avaliacoes)
 def relatorio_avaliacoes(request):
     """
     View para gerar relatórios de avaliações
     Apenas coordenadores e admins podem acessar
     """
-    from django.db.models import Avg, Count
+    from django.db.models import Count, Sum
     from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
     import json
 
@@ -2245,20 +2469,14 @@ def relatorio_avaliacoes(request):
     search_query = request.GET.get("search", "").strip()
 
     # Buscar avaliações que têm respostas com otimização de queries
-    avaliacoes = (
-        AvaliacaoDocente.objects.filter(respostas__isnull=False)
-        .select_related(
-            "turma__disciplina__periodo_letivo",
-            "turma__disciplina__professor__user",
-            "professor__user",
-            "ciclo__questionario",
-        )
-        .prefetch_related(
-            "respostas",
-            "turma__matriculas",
-            "ciclo__questionario__perguntas__pergunta",
-        )
-        .distinct()
+    # (EXISTS sobre as submissões dispensa o DISTINCT sobre as respostas)
+    avaliacoes = AvaliacaoDocente.objects.filter(
+        Exists(SubmissaoAvaliacao.objects.filter(avaliacao=OuterRef("pk")))
+    ).select_related(
+        "turma__disciplina__periodo_letivo",
+        "turma__disciplina__professor__user",
+        "professor__user",
+        "ciclo__questionario",
     )
 
     if ciclo_selecionado:
@@ -2306,83 +2524,66 @@ def relatorio_avaliacoes(request):
     except EmptyPage:
         avaliacoes_paginadas = paginator.page(paginator.num_pages)
 
+    # Resumos das avaliações da página atual (congelados em ciclos fechados)
+    from .cache_versionado import carimbos_dados
+    from .questionario_compilado import obter_questionarios_compilados
+    from .services import obter_resultados_congelados, obter_resumos_avaliacoes
+
+    resumos = obter_resumos_avaliacoes(avaliacoes_paginadas)
+    # Ciclos fechados: estatísticas, comentários, média e gráficos saem do
+    # resultado congelado, não das respostas
+    congelados = obter_resultados_congelados(
+        ciclos.filter(id__in=avaliacoes.values("ciclo_id"))
+    )
+    questionarios = obter_questionarios_compilados(
+        avaliacao.ciclo.questionario_id for avaliacao in avaliacoes_paginadas
+    )
+    # Versão dos dados de cada card (chave do fragmento no template)
+    carimbos = carimbos_dados(
+        (avaliacao.professor_id, avaliacao.ciclo_id)
+        for avaliacao in avaliacoes_paginadas
+    )
+
     # Calcular dados adicionais para cada avaliação (apenas da página atual)
     avaliacoes_com_stats = []
     for avaliacao in avaliacoes_paginadas:
-        # Contar respondentes únicos
-        respondentes = (
-            RespostaAvaliacao.objects.filter(avaliacao=avaliacao)
-            .values("aluno")
-            .distinct()
-            .count()
-        )
+        resumo = resumos[avaliacao.id]
+        congelado = congelados.get(avaliacao.ciclo_id)
+
+        # Respondentes únicos (do resumo persistido)
+        respondentes = resumo.total_respondentes
 
         # Calcular taxa de resposta
-        total_alunos = avaliacao.turma.matriculas.filter(status="ativa").count()
+        total_alunos = resumo.total_matriculas_ativas
         taxa_resposta = (respondentes / total_alunos * 100) if total_alunos > 0 else 0
 
-        # Calcular estatísticas por pergunta
-        pergunta_stats = []
-        perguntas_questionario = avaliacao.ciclo.questionario.perguntas.all()
-
-        for pergunta_questionario in perguntas_questionario:
-            pergunta = pergunta_questionario.pergunta
-
-            # Tratamento para perguntas de múltipla escolha (questionário padrão)
-            if pergunta.tipo == "multipla_escolha":
-                resultado = avaliacao.calcular_media_pergunta(pergunta)
-                if resultado:
-                    pergunta_stats.append(
-                        {
-                            "pergunta": pergunta,
-                            "tipo": "multipla_escolha",
-                            "media": resultado["media"],
-                            "moda": resultado.get("moda", "N/A"),
-                            "contagens": resultado["contagens"],
-                            "respostas_count": resultado["total_respondentes"],
-                            "classificacao": avaliacao.get_classificacao_media(
-                                resultado["media"]
-                            ),
-                        }
-                    )
-            else:
-                # Tratamento para perguntas numéricas (likert, nps)
-                respostas_pergunta = RespostaAvaliacao.objects.filter(
-                    avaliacao__ciclo=avaliacao.ciclo,
-                    avaliacao__professor=avaliacao.professor,
-                    avaliacao__turma=avaliacao.turma,
-                    pergunta=pergunta,
-                    valor_numerico__isnull=False,
-                )
-
-                stats = calcular_estatisticas_respostas(respostas_pergunta)
-                if stats:
-                    pergunta_stats.append(
-                        {
-                            "pergunta": pergunta,
-                            "tipo": "numerico",
-                            "media": round(stats["media"], 2),
-                            "moda": stats["moda"],
-                            "respostas_count": stats["count"],
-                        }
-                    )
+        # Estatísticas por pergunta: calculadas só quando o card é renderizado
+        # (cards servidos do cache de fragmentos não consultam as respostas)
+        pergunta_stats = partial(
+            _estatisticas_perguntas_avaliacao,
+            avaliacao,
+            resumo,
+            questionarios[avaliacao.ciclo.questionario_id],
+            congelado.respostas_avaliacao(avaliacao.id) if congelado else None,
+        )
 
         # Buscar comentários da avaliação (anônimos)
         # Filtrar apenas perguntas do tipo "texto_livre" para evitar incluir
         # respostas de múltipla escolha ou sim/não que também têm valor_texto
         comentarios = (
-            RespostaAvaliacao.objects.filter(
-                avaliacao=avaliacao,
-                pergunta__tipo="texto_livre",
-                valor_texto__isnull=False,
-                valor_texto__gt="",
-            )
-            .exclude(valor_texto="")
-            .only("valor_texto", "data_resposta")
+            congelado.comentarios_avaliacao(avaliacao.id) if congelado else None
         )
-
-        # Calcular média geral do questionário padrão (se aplicável)
-        media_geral_padrao = avaliacao.calcular_media_geral_questionario_padrao()
+        if comentarios is None:
+            comentarios = (
+                RespostaAvaliacao.objects.filter(
+                    avaliacao=avaliacao,
+                    pergunta__tipo="texto_livre",
+                    valor_texto__isnull=False,
+                    valor_texto__gt="",
+                )
+                .exclude(valor_texto="")
+                .only("valor_texto", "data_resposta")
+            )
 
         # Adicionar dados calculados à avaliação
         avaliacao.respondentes = respondentes
@@ -2390,26 +2591,42 @@ def relatorio_avaliacoes(request):
         avaliacao.taxa_resposta = round(taxa_resposta, 2)
         avaliacao.pergunta_stats = pergunta_stats
         avaliacao.comentarios = comentarios
-        avaliacao.media_geral_padrao = media_geral_padrao
-        if media_geral_padrao:
-            avaliacao.classificacao_geral = avaliacao.get_classificacao_media(
-                media_geral_padrao["media_geral"]
-            )
+        avaliacao.versao_dados = carimbos[(avaliacao.professor_id, avaliacao.ciclo_id)]
+        avaliacao.media_geral_padrao = resumo.media_geral
+        if resumo.media_geral is not None:
+            avaliacao.classificacao_geral = resumo.classificacao
         else:
             avaliacao.classificacao_geral = None
 
         avaliacoes_com_stats.append(avaliacao)
 
-    # Calcular média simples das respostas numéricas
+    # Calcular média simples das respostas numéricas (congeladas nos ciclos
+    # fechados, consultadas nas demais avaliações)
     media_geral = 0
     if total_avaliacoes > 0:
-        respostas_numericas = RespostaAvaliacao.objects.filter(
-            avaliacao__in=avaliacoes, valor_numerico__isnull=False
-        )
-        if respostas_numericas.exists():
-            media_geral = (
-                respostas_numericas.aggregate(media=Avg("valor_numerico"))["media"] or 0
-            )
+        soma = quantidade = 0
+        congeladas = set()
+        for avaliacao_id, ciclo_id in avaliacoes.filter(
+            ciclo_id__in=list(congelados)
+        ).values_list("id", "ciclo_id"):
+            linhas = congelados[ciclo_id].respostas_avaliacao(avaliacao_id)
+            if linhas is None:
+                continue
+            congeladas.add(avaliacao_id)
+            for linha in linhas:
+                if linha["tipo"] in ("likert", "nps"):
+                    soma += linha["valor"] * linha["qtd"]
+                    quantidade += linha["qtd"]
+
+        if len(congeladas) < total_avaliacoes:
+            vivas = RespostaAvaliacao.objects.filter(
+                avaliacao__in=avaliacoes.exclude(id__in=congeladas),
+                valor_numerico__isnull=False,
+            ).aggregate(soma=Sum("valor_numerico"), quantidade=Count("id"))
+            soma += vivas["soma"] or 0
+            quantidade += vivas["quantidade"]
+        if quantidade:
+            media_geral = soma / quantidade
 
     # ================= Geração de dados para gráficos por ciclo =================
 
@@ -2425,145 +2642,19 @@ def relatorio_avaliacoes(request):
         )
 
     for ciclo in ciclos_iter:
-        # Base de todas as respostas dentro do ciclo e filtros de professor se houver
-        respostas_base = RespostaAvaliacao.objects.filter(
-            avaliacao__ciclo=ciclo,
+        # Respostas do ciclo (filtradas pelo professor, se houver) agrupadas
+        # por pergunta e valor
+        linhas = _linhas_grafico_ciclo(
+            ciclo, congelados.get(ciclo.id), professor_selecionado
         )
-        if professor_selecionado:
-            respostas_base = respostas_base.filter(
-                avaliacao__professor_id=professor_selecionado
-            )
-
-        if not respostas_base.exists():
+        if not linhas:
             continue
 
-        # Separar respostas por tipo para processamento específico
-        respostas_numericas = respostas_base.filter(
-            pergunta__tipo__in=["likert", "nps"],
-            valor_numerico__isnull=False,
-        )
-
-        respostas_multipla_escolha = respostas_base.filter(
-            pergunta__tipo="multipla_escolha",
-            valor_texto__isnull=False,
-        ).exclude(valor_texto="")
-
-        respostas_sim_nao = respostas_base.filter(
-            pergunta__tipo="sim_nao",
-            valor_boolean__isnull=False,
-        )
-
-        respostas_texto_livre = respostas_base.filter(
-            pergunta__tipo="texto_livre",
-            valor_texto__isnull=False,
-        ).exclude(valor_texto="")
-
-        # Processar perguntas numéricas (Likert e NPS)
-        contagens_numericas = respostas_numericas.values(
-            "pergunta_id",
-            "pergunta__enunciado",
-            "pergunta__tipo",
-            "valor_numerico",
-        ).annotate(qtd=Count("id"))
-
-        # Processar perguntas de múltipla escolha
-        contagens_multipla = respostas_multipla_escolha.values(
-            "pergunta_id",
-            "pergunta__enunciado",
-            "pergunta__tipo",
-            "valor_texto",
-        ).annotate(qtd=Count("id"))
-
-        # Processar perguntas sim/não
-        contagens_sim_nao = respostas_sim_nao.values(
-            "pergunta_id",
-            "pergunta__enunciado",
-            "pergunta__tipo",
-            "valor_boolean",
-        ).annotate(qtd=Count("id"))
-
-        # Processar perguntas de texto livre (apenas contagem)
-        contagens_texto = respostas_texto_livre.values(
-            "pergunta_id",
-            "pergunta__enunciado",
-            "pergunta__tipo",
-        ).annotate(qtd=Count("id"))
-
-        # Médias para perguntas numéricas
-        medias_numericas = respostas_numericas.values("pergunta_id").annotate(
-            media=Avg("valor_numerico")
-        )
-        medias_map = {m["pergunta_id"]: m["media"] for m in medias_numericas}
-
-        perguntas_data = {}
-
-        # Processar perguntas numéricas (Likert e NPS)
-        for item in contagens_numericas:
-            pid = item["pergunta_id"]
-            if pid not in perguntas_data:
-                # Inicializa estrutura conforme o tipo
-                if item["pergunta__tipo"] == "likert":
-                    escala_default = {str(i): 0 for i in range(1, 6)}
-                else:  # nps
-                    escala_default = {str(i): 0 for i in range(0, 11)}
-                perguntas_data[pid] = {
-                    "id": pid,
-                    "enunciado": item["pergunta__enunciado"],
-                    "tipo": item["pergunta__tipo"],
-                    "contagens": escala_default,
-                    "media": round(medias_map.get(pid) or 0, 2),
-                }
-            perguntas_data[pid]["contagens"][str(item["valor_numerico"])] = item["qtd"]
-
-        # Processar perguntas de múltipla escolha
-        for item in contagens_multipla:
-            pid = item["pergunta_id"]
-            if pid not in perguntas_data:
-                perguntas_data[pid] = {
-                    "id": pid,
-                    "enunciado": item["pergunta__enunciado"],
-                    "tipo": item["pergunta__tipo"],
-                    "contagens": {},
-                    "media": "N/A",
-                }
-            valor = (
-                item["valor_texto"][:30] + "..."
-                if len(item["valor_texto"]) > 30
-                else item["valor_texto"]
-            )
-            perguntas_data[pid]["contagens"][valor] = item["qtd"]
-
-        # Processar perguntas sim/não
-        for item in contagens_sim_nao:
-            pid = item["pergunta_id"]
-            if pid not in perguntas_data:
-                perguntas_data[pid] = {
-                    "id": pid,
-                    "enunciado": item["pergunta__enunciado"],
-                    "tipo": item["pergunta__tipo"],
-                    "contagens": {"Sim": 0, "Não": 0},
-                    "media": "N/A",
-                }
-            valor = "Sim" if item["valor_boolean"] else "Não"
-            perguntas_data[pid]["contagens"][valor] = item["qtd"]
-
-        # Processar perguntas de texto livre
-        for item in contagens_texto:
-            pid = item["pergunta_id"]
-            if pid not in perguntas_data:
-                perguntas_data[pid] = {
-                    "id": pid,
-                    "enunciado": item["pergunta__enunciado"],
-                    "tipo": item["pergunta__tipo"],
-                    "contagens": {"Total de respostas": item["qtd"]},
-                    "media": "N/A",
-                }
-
         ciclos_para_graficos.append(
             {
                 "id": ciclo.id,
                 "nome": ciclo.nome,
-                "perguntas": list(perguntas_data.values()),
+                "perguntas": _perguntas_grafico(linhas),
             }
         )
 
@@ -2645,8 +2736,21 @@ def gerar_csv_avaliacoes(
         ]
     )
 
+    # Resumos de todas as avaliações exportadas (congelados em ciclos fechados)
+    from .services import obter_resumos_avaliacoes
+
+    from .questionario_compilado import obter_questionarios_compilados
+
+    avaliacoes = list(avaliacoes)
+    resumos = obter_resumos_avaliacoes(avaliacoes)
+    questionarios = obter_questionarios_compilados(
+        avaliacao.ciclo.questionario_id for avaliacao in avaliacoes
+    )
+
     # Processar cada avaliação
     for avaliacao in avaliacoes:
+        resumo = resumos[avaliacao.id]
+
         # Dados básicos da avaliação
         disciplina = avaliacao.turma.disciplina.disciplina_nome
         professor = avaliacao.professor.user.get_full_name()
@@ -2654,20 +2758,11 @@ def gerar_csv_avaliacoes(
         periodo = avaliacao.turma.disciplina.periodo_letivo.nome
         ciclo = avaliacao.ciclo.nome
 
-        # Contar respondentes únicos (seguindo a mesma lógica do relatório)
-        respostas_com_aluno = (
-            avaliacao.respostas.filter(aluno__isnull=False).values("aluno").distinct()
-        )
-        respostas_sem_aluno = (
-            avaliacao.respostas.filter(aluno__isnull=True)
-            .exclude(session_key="")
-            .values("session_key")
-            .distinct()
-        )
-        respondentes = respostas_com_aluno.count() + respostas_sem_aluno.count()
+        # Respondentes únicos (aluno ou session_key), mantidos no resumo
+        respondentes = resumo.total_respondentes
 
         # Calcular taxa de resposta
-        total_alunos = avaliacao.turma.matriculas.filter(status="ativa").count()
+        total_alunos = resumo.total_matriculas_ativas
         taxa_resposta = (
             round((respondentes / total_alunos * 100), 2) if total_alunos > 0 else 0
         )
@@ -2688,19 +2783,18 @@ def gerar_csv_avaliacoes(
         if comentarios.count() > 5:
             comentarios_texto += f" | ... (+{comentarios.count() - 5} comentários)"
 
-        # Calcular média geral do questionário padrão
-        media_geral_padrao = avaliacao.calcular_media_geral_questionario_padrao()
-        if media_geral_padrao:
-            media_geral = media_geral_padrao["media_geral"]
-            classificacao_geral = avaliacao.get_classificacao_media(media_geral)
+        # Média geral do questionário padrão (do resumo)
+        if resumo.media_geral is not None:
+            media_geral = resumo.media_geral
+            classificacao_geral = resumo.classificacao
         else:
             media_geral = "N/A"
             classificacao_geral = "N/A"
 
         # Processar estatísticas por pergunta
-        perguntas_questionario = avaliacao.ciclo.questionario.perguntas.all()
+        perguntas_questionario = questionarios[avaliacao.ciclo.questionario_id]
 
-        if not perguntas_questionario.exists():
+        if not perguntas_questionario:
             # Se não há perguntas, escrever linha básica
             writer.writerow(
                 [
@@ -2729,12 +2823,10 @@ def gerar_csv_avaliacoes(
             )
         else:
             # Para cada pergunta do questionário
-            for pergunta_questionario in perguntas_questionario:
-                pergunta = pergunta_questionario.pergunta
-
+            for pergunta in perguntas_questionario:
                 # Tratamento para perguntas de múltipla escolha (questionário padrão)
                 if pergunta.tipo == "multipla_escolha":
-                    resultado = avaliacao.calcular_media_pergunta(pergunta)
+                    resultado = resumo.resultado_pergunta(pergunta.id)
                     if resultado:
                         contagens = resultado["contagens"]
                         writer.writerow(
@@ -2760,18 +2852,14 @@ def gerar_csv_avaliacoes(
                                 contagens.get("Bom", 0),
                                 contagens.get("Excelente", 0),
                                 resultado["total_respondentes"],
-                                (
-                                    comentarios_texto
-                                    if pergunta_questionario.ordem_no_questionario == 1
-                                    else ""
-                                ),
+                                (comentarios_texto if pergunta.ordem == 1 else ""),
                             ]
                         )
                 else:
                     # Tratamento para perguntas numéricas
                     respostas_pergunta = RespostaAvaliacao.objects.filter(
                         avaliacao=avaliacao,
-                        pergunta=pergunta,
+                        pergunta_id=pergunta.id,
                         valor_numerico__isnull=False,
                     )
 
@@ -2800,11 +2888,7 @@ def gerar_csv_avaliacoes(
                                 "N/A",
                                 "N/A",
                                 stats["count"],
-                                (
-                                    comentarios_texto
-                                    if pergunta_questionario.ordem_no_questionario == 1
-                                    else ""
-                                ),
+                                (comentarios_texto if pergunta.ordem == 1 else ""),
                             ]
                         )
 
@@ -2812,6 +2896,7 @@ def gerar_csv_avaliacoes(
 
 
 @login_required
+@condition(etag_func=_etag_relatorio_professores)
 def relatorio_professores(request):
     """
     View para relatório consolidado de professores com métricas de avaliação.
@@ -2916,6 +3001,13 @@ def relatorio_professores(request):
     page_number = request.GET.get("page", 1)
     page_obj = paginator.get_page(page_number)
 
+    # Versão dos dados de cada linha (chave do fragmento no template)
+    from .cache_versionado import carimbos_dados
+
+    carimbos = carimbos_dados((item["professor"].id, None) for item in page_obj)
+    for item in page_obj:
+        item["versao_dados"] = carimbos[(item["professor"].id, None)]
+
     context = {
         "page_obj": page_obj,
         "ciclos": ciclos,
@@ -2930,13 +3022,17 @@ def relatorio_professores(request):
 
 
 @login_required
+@condition(etag_func=_etag_detalhe_professor_relatorio)
 def detalhe_professor_relatorio(request, professor_id):
     """
     View para detalhes de um professor específico com histórico por ciclo.
     Inclui paginação de ciclos (5 por página) e cache para melhor performance.
     Apenas coordenadores e admins podem acessar.
     """
-    from .services import obter_historico_professor_por_ciclo_cached
+    from .services import (
+        obter_historicos_professor_ciclos_cached,
+        obter_resumos_avaliacoes,
+    )
     from .models import CicloAvaliacao, AvaliacaoDocente
     from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 
@@ -2968,10 +3064,17 @@ def detalhe_professor_relatorio(request, professor_id):
         page_obj = paginator.get_page(paginator.num_pages)
 
     # Processar apenas os ciclos da página atual (com cache)
+    from .cache_versionado import carimbos_dados
+
+    carimbos = carimbos_dados((professor.id, ciclo.id) for ciclo in page_obj)
+    # Ciclos sem cache são calculados juntos (número fixo de queries)
+    historicos = obter_historicos_professor_ciclos_cached(professor, page_obj)
     ciclos = []
     for ciclo in page_obj:
-        historico = obter_historico_professor_por_ciclo_cached(professor, ciclo)
+        historico = historicos[ciclo.id]
         if historico and historico.get("avaliacoes"):
+            # Versão dos dados do card (chave do fragmento no template)
+            historico["versao_dados"] = carimbos[(professor.id, ciclo.id)]
             ciclos.append(historico)
 
     # Calcular estatísticas gerais (todos os ciclos)
@@ -2981,15 +3084,16 @@ def detalhe_professor_relatorio(request, professor_id):
 
     total_avaliacoes = todas_avaliacoes.count()
     avaliacoes_com_resposta = (
-        todas_avaliacoes.filter(respostas__isnull=False).distinct().count()
+        todas_avaliacoes.filter(submissoes__isnull=False).distinct().count()
     )
 
-    # Calcular média geral
-    medias = []
-    for avaliacao in todas_avaliacoes:
-        resultado = avaliacao.calcular_media_geral_questionario_padrao()
-        if resultado and resultado.get("media_geral") is not None:
-            medias.append(resultado["media_geral"])
+    # Calcular média geral a partir dos resumos (congelados em ciclos fechados)
+    resumos = obter_resumos_avaliacoes(todas_avaliacoes)
+    medias = [
+        resumo.media_geral
+        for resumo in resumos.values()
+        if resumo.media_geral is not None
+    ]
 
     media_geral = None
     classificacao_geral = "Sem dados"
@@ -3034,36 +3138,37 @@ def detalhe_calculo_avaliacao(request, avaliacao_id):
     avaliacao = get_object_or_404(
         AvaliacaoDocente.objects.select_related(
             "professor__user", "disciplina", "turma", "ciclo"
-        ).prefetch_related("respostas__aluno__user", "respostas__pergunta"),
+        ),
         id=avaliacao_id,
     )
 
-    # Calcular respondentes
-    respostas_com_aluno = (
-        avaliacao.respostas.filter(aluno__isnull=False).values("aluno").distinct()
-    )
+    from .services import obter_resultado_congelado
 
-    respostas_sem_aluno = (
-        avaliacao.respostas.filter(aluno__isnull=True)
-        .exclude(session_key="")
-        .values("session_key")
-        .distinct()
-    )
+    congelado = obter_resultado_congelado(avaliacao.ciclo)
+    if congelado is not None and congelado.possui_avaliacao(avaliacao.id):
+        # Ciclo fechado: usar os resultados congelados no encerramento
+        resumo = congelado.resumo_avaliacao(avaliacao.id)
+        total_respondentes = resumo.total_respondentes
+        total_alunos_aptos = resumo.total_alunos_aptos
+        total_respostas = resumo.total_respostas
+        resultado = congelado.resultado_questionario(avaliacao.id)
+    else:
+        # Calcular respondentes (um registro de submissão por aluno/sessão)
+        total_respondentes = avaliacao.submissoes.count()
 
-    total_respondentes = respostas_com_aluno.count() + respostas_sem_aluno.count()
+        # Alunos aptos
+        total_alunos_aptos = avaliacao.total_alunos_aptos()
 
-    # Alunos aptos
-    alunos_aptos = avaliacao.alunos_aptos()
-    total_alunos_aptos = len(alunos_aptos)
+        total_respostas = avaliacao.respostas.count()
+
+        # Calcular média geral
+        resultado = avaliacao.calcular_media_geral_questionario_padrao()
 
     # Taxa de resposta
     taxa_resposta = (
         (total_respondentes / total_alunos_aptos * 100) if total_alunos_aptos > 0 else 0
     )
 
-    # Calcular média geral
-    resultado = avaliacao.calcular_media_geral_questionario_padrao()
-
     if not resultado:
         messages.warning(
             request,
@@ -3109,7 +3214,7 @@ def detalhe_calculo_avaliacao(request, avaliacao_id):
         "classificacao": classificacao,
         "total_perguntas": resultado["total_perguntas"],
         "detalhes_perguntas": detalhes_perguntas,
-        "total_respostas": avaliacao.respostas.count(),
+        "total_respostas": total_respostas,
         "soma_medias": sum(p["media"] for p in detalhes_perguntas),
     }
 
@@ -3503,7 +3608,7 @@ def minhas_avaliacoes(request):
     # Buscar avaliações que o aluno já respondeu das suas turmas
     avaliacoes_respondidas = (
         AvaliacaoDocente.objects.filter(
-            respostas__aluno=request.user.perfil_aluno,
+            submissoes__aluno=request.user.perfil_aluno,
             turma_id__in=turmas_aluno,  # Apenas das turmas em que o aluno está/esteve matriculado
         )
         .distinct()
@@ -3726,9 +3831,17 @@ def encerrar_ciclo(request, ciclo_id):
         else:
             from django.utils import timezone
 
+            from .services import aquecer_cache_ciclo_encerrado
+
+            # O signal de CicloAvaliacao congela os resultados servidos pelos
+            # relatórios do ciclo fechado
             ciclo.encerrado = True
             ciclo.data_encerramento = timezone.now()
             ciclo.save(update_fields=["encerrado", "data_encerramento"])
+
+            # Atualizar os KPIs do ciclo após o commit (o restante do cache
+            # é aquecido pelo comando aquecer_cache_relatorios)
+            aquecer_cache_ciclo_encerrado(ciclo)
             messages.success(request, f"Ciclo '{ciclo.nome}' encerrado com sucesso.")
         return redirect("detalhe_ciclo_avaliacao", ciclo_id=ciclo.id)
 
@@ -3763,9 +3876,12 @@ def reativar_ciclo(request, ciclo_id):
                     f"Edite as datas se desejar torná-lo 'em andamento'.",
                 )
 
+            from .services import descartar_resultados_congelados
+
             ciclo.encerrado = False
             ciclo.data_encerramento = None
             ciclo.save(update_fields=["encerrado", "data_encerramento"])
+            descartar_resultados_congelados(ciclo)
             messages.success(
                 request,
                 f"Ciclo '{ciclo.nome}' reativado com sucesso! Status atual: {ciclo.status}.",
@@ -3835,7 +3951,7 @@ def exportar_usuarios_csv(request):
     # Buscar usuários com prefetch das roles
     usuarios = (
         User.objects.select_related()
-        .prefetch_related("perfil_professor", "perfil_aluno")
+        .prefetch_related("perfil_professor", "perfil_aluno", "groups")
         .order_by("date_joined")
     )
 
@@ -3847,10 +3963,10 @@ def exportar_usuarios_csv(request):
         elif hasattr(usuario, "perfil_aluno") and usuario.perfil_aluno:
             role_principal = "Aluno"
 
-        # Verificar se é admin ou coordenador usando has_role (já importado no topo)
-        if has_role(usuario, "admin"):
+        # Verificar se é admin ou coordenador (roles já carregadas pelo prefetch)
+        if usuario_tem_role(usuario, "admin"):
             role_principal = "Admin"
-        elif has_role(usuario, "coordenador"):
+        elif usuario_tem_role(usuario, "coordenador"):
             role_principal = "Coordenador"
 
         writer.writerow(
@@ -4157,3 +4273,28 @@ def exportar_periodos_csv(request):
         )
 
     return response
+
+
+def enviar_lembretes_ciclos_cron(request):
+    """
+    Executa o comando enviar_lembretes_ciclos a partir do Vercel Cron
+    (agendado em vercel.json): lembretes, avisos de novas avaliações e
+    manutenção dos resumos dos ciclos.
+
+    Sem servidor próprio não há crontab; o Vercel chama esta rota com o
+    cabeçalho Authorization: Bearer <CRON_SECRET>.
+    """
+    import hmac
+    from io import StringIO
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    segredo = getattr(settings, "CRON_SECRET", "")
+    autorizacao = request.headers.get("Authorization", "")
+    if not segredo or not hmac.compare_digest(autorizacao, f"Bearer {segredo}"):
+        return JsonResponse({"error": "Não autorizado"}, status=401)
+
+    saida = StringIO()
+    call_command("enviar_lembretes_ciclos", stdout=saida)
+    return JsonResponse({"success": True, "saida": saida.getvalue()})
@@ -119,11 +119,15 @@ DATABASES = {
 # https://docs.djangoproject.com/en/5.2/topics/cache/
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        # DatabaseCache com camada LRU local por processo (ver cache_backends.py)
+        "BACKEND": "avaliacao_docente.cache_backends.DatabaseCacheComCamadaLocal",
         "LOCATION": "app_cache_table",
         "TIMEOUT": 900,  # 15 minutos (900 segundos)
         "OPTIONS": {
             "MAX_ENTRIES": 1000,  # Máximo de 1000 entradas no cache
+            "LOCAL_MAX_ENTRIES": 500,  # Entradas na camada local de cada processo
+            "LOCAL_TIMEOUT": 60,  # Tempo máximo (s) de uma entrada na camada local
+            "LOCAL_VERSION_TIMEOUT": 5,  # Defasagem máxima (s) das versões entre processos
         },
     }
 }
@@ -281,6 +285,10 @@ if not DEBUG:
 # Configuração para lidar com headers do Vercel
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
+# Segredo enviado pelo Vercel Cron (Authorization: Bearer <CRON_SECRET>) às
+# rotas /cron/ agendadas em vercel.json; vazio desativa as rotas
+CRON_SECRET = config("CRON_SECRET", default="")
+
 # Configurações de timeout para Vercel (máximo 10 segundos para hobby plan)
 if "VERCEL" in os.environ:
     # Configurações específicas do Vercel